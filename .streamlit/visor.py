@@ -12,14 +12,22 @@ st.title("📋 Historial Financiero Interactivo")
 RUTA_TRANSACCIONES = os.path.join(os.path.dirname(__file__), "..", "transacciones.json")
 RUTA_ALERTAS = os.path.join(os.path.dirname(__file__), "..", "alertas.json")
 
+# Desde la versión 2 del esquema (actions/esquema.py) los registros llegan normalizados:
+# monto float, año entero, mes y categoría en minúsculas
+VERSION_NORMALIZADA = 2
+
 def cargar_datos_json(ruta):
+    """(registros, versión del esquema): una lista suelta es la versión 1."""
     if os.path.exists(ruta):
         with open(ruta, encoding="utf-8") as f:
-            return json.load(f)
-    return []
+            datos = json.load(f)
+        if isinstance(datos, dict):
+            return datos.get("registros", []), int(datos.get("version", 1))
+        return datos, 1
+    return [], VERSION_NORMALIZADA
 
 # ---------- TRANSACCIONES ----------
-transacciones = cargar_datos_json(RUTA_TRANSACCIONES)
+transacciones, version_transacciones = cargar_datos_json(RUTA_TRANSACCIONES)
 df_transacciones = pd.DataFrame(transacciones)
 
 # Normalización para evitar errores
@@ -29,7 +37,7 @@ for campo in campos:
     if campo not in df_transacciones.columns:
         df_transacciones[campo] = None
 
-if not df_transacciones.empty:
+if not df_transacciones.empty and version_transacciones < VERSION_NORMALIZADA:
     df_transacciones["monto"] = (pd.to_numeric(df_transacciones.get("monto", 0).astype(str).str.replace(",", ""), errors="coerce"))
     df_transacciones["fecha"] = df_transacciones.get("fecha", "")
     df_transacciones["categoria"] = df_transacciones.get("categoria", "").fillna("Sin categoría")
@@ -40,10 +48,14 @@ if not df_transacciones.empty:
     df_transacciones["año"] = pd.to_numeric(df_transacciones.get("año", datetime.now().year), errors="coerce").fillna(datetime.now().year).astype(int)
 
 # ---------- ALERTAS ----------
-alertas = cargar_datos_json(RUTA_ALERTAS)
+alertas, version_alertas = cargar_datos_json(RUTA_ALERTAS)
 df_alertas = pd.DataFrame(alertas)
 
-if not df_alertas.empty:
+if not df_alertas.empty and version_alertas >= VERSION_NORMALIZADA:
+    df_alertas["tipo"] = "alerta"
+    df_alertas["medio"] = "N/A"
+    df_alertas["fecha"] = None
+elif not df_alertas.empty:
     df_alertas["tipo"] = "alerta"
     df_alertas["monto"] = pd.to_numeric(df_alertas.get("monto", 0), errors="coerce")
     df_alertas["categoria"] = df_alertas.get("categoria", "").fillna("Sin categoría")
@@ -1,86 +1,31 @@
-from typing import Any, Text, Dict, List
+from typing import Any, Text, Dict, List, Optional
 from rasa_sdk import Action, Tracker
 from rasa_sdk.executor import CollectingDispatcher
 from rasa_sdk.events import EventType
-from transacciones_io import guardar_transaccion, cargar_transacciones
+from transacciones_io import guardar_transaccion_async, obtener_resumenes_async
+from transacciones_io import consultar_async
 from rasa_sdk.events import SlotSet
-from collections import defaultdict
 import json
 import os
-import re
-from datetime import datetime
-from collections import Counter, defaultdict
+from datetime import date, datetime
 from rasa_sdk.types import DomainDict
-from dateparser import parse as parse_fecha_relativa
-from transacciones_io import eliminar_transaccion_logicamente
-from alertas_io import guardar_alerta, eliminar_alerta_logicamente, cargar_alertas, guardar_todas_las_alertas
-import alertas_io
-import calendar
-
-def interpretar_periodo(periodo_raw):
-    hoy = datetime.now()
-
-    if not periodo_raw:
-        return None, None
-
-    texto = periodo_raw.lower().strip()
-
-    if "este mes" in texto:
-        return hoy.strftime("%B"), hoy.year
-    elif "último mes" in texto or "mes pasado" in texto:
-        mes = hoy.month - 1 if hoy.month > 1 else 12
-        año = hoy.year if hoy.month > 1 else hoy.year - 1
-        nombre_mes = calendar.month_name[mes]
-        return nombre_mes, año
-    else:
-        match = re.search(r"([a-záéíóúñ]+)(?:\s+de\s+)?(\d{4})?", texto)
-        if match:
-            return match.group(1), int(match.group(2)) if match.group(2) else hoy.year
-
-    return None, None
-
-def extraer_mes_y_anio(periodo: str):
-    import re
-    from datetime import datetime
-
-    if not periodo:
-        return None, None
-
-    match = re.search(r"([a-záéíóúñ]+)(?:\s+de\s+)?(\d{4})?", periodo.lower())
-    if match:
-        mes = match.group(1).strip().lower()
-        año = int(match.group(2)) if match.group(2) else datetime.now().year
-        return mes, año
-    return None, None
+from alertas_io import desactivar_alertas
+from alertas_io import buscar_alerta_activa_async
+from alertas_io import desactivar_alertas_async, eliminar_alerta_logicamente_async, guardar_alerta_async
+from alertas_io import listar_alertas_activas_async, modificar_alerta_por_id_async, recuperar_alertas_desde_github_async
+from alertas_io import reemplazar_alerta_por_id_async
+from periodos import NUMERO_MES, extraer_periodos, formatear_fecha, interpretar_periodo, nombre_mes, texto_periodo
+from periodos import interpretar_rango, texto_rango
+from arranque import precalentar_en_segundo_plano
+from usuarios import por_usuario
+
+# 🔥 Carga transacciones y alertas en segundo plano una vez que el servidor escucha en su puerto
+precalentar_en_segundo_plano()
 
 def construir_mensaje(*bloques: str) -> str:
     """Concatena bloques separados por doble salto, permitiendo saltos simples dentro de cada bloque."""
     return "\n\n".join(bloque.strip() for bloque in bloques if bloque)
 
-def formatear_fecha(fecha: str) -> str:
-    try:
-        partes = fecha.strip().split("/")
-        if len(partes) == 3:
-            dia, mes, anio = partes
-            meses = {
-                "01": "enero", "02": "febrero", "03": "marzo", "04": "abril",
-                "05": "mayo", "06": "junio", "07": "julio", "08": "agosto",
-                "09": "septiembre", "10": "octubre", "11": "noviembre", "12": "diciembre"
-            }
-            mes_nombre = meses.get(mes.zfill(2), mes)
-            return f"{int(dia)} de {mes_nombre} de {anio}"
-    except:
-        pass
-    return fecha
-
-def mes_a_numero(mes: str) -> int:
-    meses = {
-        "enero": 1, "febrero": 2, "marzo": 3, "abril": 4,
-        "mayo": 5, "junio": 6, "julio": 7, "agosto": 8,
-        "septiembre": 9, "octubre": 10, "noviembre": 11, "diciembre": 12
-    }
-    return meses.get(mes.strip().lower(), 0)
-
 def get_entity(tracker: Tracker, entity_name: str) -> Text:
     entity = next(tracker.get_latest_entity_values(entity_name), None)
     return entity if entity else ""
@@ -106,7 +51,8 @@ class ActionRegistrarGasto(Action):
     def name(self) -> Text:
         return "action_registrar_gasto"
 
-    def run(self, dispatcher, tracker, domain):
+    @por_usuario
+    async def run(self, dispatcher, tracker, domain):
         try:
             texto_usuario = tracker.latest_message.get("text", "").lower()
             tipo_actual = tracker.get_slot("tipo") or "gasto"
@@ -162,37 +108,34 @@ class ActionRegistrarGasto(Action):
                 "medio": medio
             }
 
-            # ✅ Guardar directamente (sin llamar descargar_de_github aquí)
-            from transacciones_io import descargar_de_github, guardar_transaccion
-            descargar_de_github()  # 🔁 Descargar antes de guardar para evitar sobrescribir
-            guardar_transaccion(transaccion)
+            # ✅ Guardar sin bloquear el servidor (guardar_transaccion ya sincroniza antes de escribir)
+            await guardar_transaccion_async(transaccion)
 
 
-            mes_actual = transaccion.get("mes", "").lower()
+            mes_actual = transaccion["mes"]
+            año_actual = transaccion["año"]
+            periodo_actual = f"{mes_actual} de {año_actual}"
 
-            # 🔔 Verificar alertas activas
-            alertas = cargar_alertas()
-            alertas_activas = [
-                a for a in alertas
-                if a.get("categoria", "").lower() == categoria.lower()
-                and a.get("periodo", "").lower() == mes_actual
-            ]
+            # 🔔 Verificar alertas activas (las alertas guardan el periodo como "abril de 2025";
+            # las más antiguas, solo el mes)
+            alerta = (
+                await buscar_alerta_activa_async(categoria, periodo_actual)
+                or await buscar_alerta_activa_async(categoria, mes_actual)
+            )
 
-            if alertas_activas:
-                limite = float(alertas_activas[0].get("monto", 0))
-                transacciones = cargar_transacciones()
-                total_categoria = sum(
-                    float(t["monto"]) for t in transacciones
-                    if t.get("tipo") == "gasto"
-                    and t.get("categoria", "").lower() == categoria.lower()
-                    and t.get("mes", "").lower() == mes_actual
+            if alerta:
+                limite = alerta["monto"]
+                # 📊 Total del mes leído del resumen incremental, sin recorrer el historial
+                resumenes = await obtener_resumenes_async()
+                total_categoria = resumenes.total(
+                    año=año_actual, mes=mes_actual, tipo="gasto", categoria=categoria
                 )
                 if total_categoria > limite:
                     exceso = total_categoria - limite
                     dispatcher.utter_message(
                         text=(
                             f"⚠️ *Atención*: Has superado el límite de *{limite:.2f} soles* en *{categoria}* "
-                            f"para *{mes_actual}*. Te has excedido por *{exceso:.2f} soles*."
+                            f"para *{periodo_actual}*. Te has excedido por *{exceso:.2f} soles*."
                         )
                     )
 
@@ -222,15 +165,12 @@ class ActionRegistrarGasto(Action):
             )
             return []
 
-from datetime import datetime, timedelta
-
-from datetime import datetime, timedelta
-
 class ActionRegistrarIngreso(Action):
     def name(self) -> Text:
         return "action_registrar_ingreso"
 
-    def run(self, dispatcher: CollectingDispatcher,
+    @por_usuario
+    async def run(self, dispatcher: CollectingDispatcher,
             tracker: Tracker,
             domain: Dict[Text, Any]) -> List[EventType]:
 
@@ -289,10 +229,8 @@ class ActionRegistrarIngreso(Action):
                 "medio": medio
             }
 
-            from transacciones_io import guardar_transaccion
-
             # Solo guardar, la sincronización ya se maneja internamente en guardar_transaccion()
-            guardar_transaccion(transaccion)
+            await guardar_transaccion_async(transaccion)
 
             mensaje = construir_mensaje(
                 "✅ **Ingreso registrado con éxito:**",
@@ -323,19 +261,17 @@ class ActionConsultarSaldo(Action):
     def name(self) -> Text:
         return "action_consultar_saldo"
 
-    def run(self, dispatcher: CollectingDispatcher,
+    @por_usuario
+    async def run(self, dispatcher: CollectingDispatcher,
             tracker: Tracker,
             domain: Dict[Text, Any]) -> List[EventType]:
 
         try:
-            transacciones = cargar_transacciones()
             medio = next(tracker.get_latest_entity_values("medio"), None)
+            resumenes = await obtener_resumenes_async()
 
-            if medio:
-                transacciones = [t for t in transacciones if t.get("medio") == medio]
-
-            total_ingresos = sum(float(t["monto"]) for t in transacciones if t["tipo"] == "ingreso")
-            total_gastos = sum(float(t["monto"]) for t in transacciones if t["tipo"] == "gasto")
+            total_ingresos = resumenes.total(tipo="ingreso", medio=medio)
+            total_gastos = resumenes.total(tipo="gasto", medio=medio)
             saldo = total_ingresos - total_gastos
 
             if total_ingresos == 0 and total_gastos == 0:
@@ -374,251 +310,220 @@ class ActionConsultarSaldo(Action):
             dispatcher.utter_message(text="❌ Ocurrió un error al consultar tu saldo. Por favor, intenta nuevamente.")
             return []
 
+# 📄 Historial paginado: cada mensaje muestra como máximo esta cantidad de transacciones
+TAMAÑO_PAGINA_HISTORIAL = int(os.getenv("HISTORIAL_TAMANO_PAGINA", "20"))
+
+def formatear_linea_historial(t) -> str:
+    monto = t["monto"]
+    categoria = (t["categoria"] or "sin categoría").capitalize()
+    dia = t["dia"]
+    mes_f = t["mes"]
+    año_f = t["año"]
+    medio = t["medio"]
+    fecha_str = f"{dia} de {mes_f} de {año_f}" if dia and mes_f and año_f else ""
+    linea = f"🔸 *{t['tipo'].capitalize()}* de *{monto:.2f} soles* en *{categoria}*"
+    if fecha_str:
+        linea += f", el *{fecha_str}*"
+    if medio and medio != "n/a":
+        linea += f", con *{medio}*"
+    return linea
+
+def lineas_historial(transacciones):
+    """Líneas del historial en orden cronológico, con un encabezado al empezar cada mes."""
+    mes_actual = None
+    for t in transacciones:
+        if (t["año"], t["mes"]) != mes_actual:
+            mes_actual = (t["año"], t["mes"])
+            yield f"📅 *{t['mes'].capitalize()} de {t['año']}*:"
+        yield formatear_linea_historial(t)
+
+async def enviar_pagina_historial(dispatcher: CollectingDispatcher, criterios: Dict[str, Any], despues_de=None, pagina: int = 1,
+                                  sin_resultados: Optional[str] = None) -> List[EventType]:
+    """
+    Envía una página del historial y deja en el slot `historial_cursor` los criterios y la
+    clave de la última transacción mostrada, para que "ver más" continúe desde ahí.
+    Si la página sale vacía y se indica `sin_resultados`, envía ese mensaje en su lugar.
+    """
+    consulta = dict(criterios)
+    if consulta.get("rango"):
+        # En el cursor (JSON) el rango viaja como fechas ISO
+        consulta["rango"] = tuple(date.fromisoformat(d) for d in consulta["rango"])
+
+    # Una transacción de más indica si queda otra página, sin contar el resto
+    transacciones = await consultar_async(
+        **consulta, orden="fecha", despues_de=despues_de, limite=TAMAÑO_PAGINA_HISTORIAL + 1
+    )
+    if not transacciones and sin_resultados:
+        dispatcher.utter_message(text=sin_resultados)
+        return [SlotSet("historial_cursor", None)]
+    hay_mas = len(transacciones) > TAMAÑO_PAGINA_HISTORIAL
+    transacciones = transacciones[:TAMAÑO_PAGINA_HISTORIAL]
+
+    titulo = "**📋 Historial de transacciones**:" if pagina == 1 else f"**📋 Historial de transacciones (página {pagina})**:"
+    mensaje = [titulo, *lineas_historial(transacciones)]
+
+    if not hay_mas:
+        mensaje.append("👉 ¿Deseas *consultar otro periodo* o *registrar algo nuevo*?")
+        dispatcher.utter_message(text=construir_mensaje(*mensaje))
+        return [
+            SlotSet("historial_cursor", None),
+            SlotSet("sugerencia_pendiente", "action_consultar_resumen_mensual")
+        ]
+
+    ultima = transacciones[-1]
+    cursor = {
+        "criterios": criterios,
+        "despues_de": [ultima["fecha_ord"] or 0, ultima.get("timestamp") or ""],
+        "pagina": pagina,
+    }
+    mensaje.append("👉 Escribe *ver más* para ver los siguientes movimientos.")
+    dispatcher.utter_message(text=construir_mensaje(*mensaje))
+    return [
+        SlotSet("historial_cursor", json.dumps(cursor, ensure_ascii=False)),
+        SlotSet("sugerencia_pendiente", "action_ver_mas_historial")
+    ]
+
 class ActionVerHistorialCompleto(Action):
     def name(self) -> Text:
         return "action_ver_historial_completo"
 
-    def run(self, dispatcher: CollectingDispatcher,
+    @por_usuario
+    async def run(self, dispatcher: CollectingDispatcher,
             tracker: Tracker,
             domain: Dict[Text, Any]) -> List[EventType]:
 
         try:
-            from transacciones_io import cargar_transacciones
-            import re
-            import calendar
-            from datetime import datetime
-            from rasa_sdk.events import SlotSet
-
-            def interpretar_periodo(periodo_raw):
-                hoy = datetime.now()
-
-                if not periodo_raw:
-                    return None, None
-
-                texto = periodo_raw.lower().strip()
-
-                if "este mes" in texto:
-                    return hoy.strftime("%B"), hoy.year
-                elif "último mes" in texto or "mes pasado" in texto:
-                    mes = hoy.month - 1 if hoy.month > 1 else 12
-                    año = hoy.year if hoy.month > 1 else hoy.year - 1
-                    nombre_mes = calendar.month_name[mes]
-                    return nombre_mes, año
-                else:
-                    match = re.search(r"([a-záéíóúñ]+)(?:\s+de\s+)?(\d{4})?", texto)
-                    if match:
-                        return match.group(1), int(match.group(2)) if match.group(2) else hoy.year
-
-                return None, None
-
-            transacciones = cargar_transacciones(filtrar_activos=True)
-
             periodo_raw = get_entity(tracker, "periodo")
             categoria_raw = get_entity(tracker, "categoria")
             medio_raw = get_entity(tracker, "medio")
 
-            # 📆 Normalizar periodo a (mes, año)
-            mes, año = interpretar_periodo(periodo_raw)
-
-            meses_orden = {
-                "enero": 1, "febrero": 2, "marzo": 3, "abril": 4, "mayo": 5, "junio": 6,
-                "julio": 7, "agosto": 8, "septiembre": 9, "octubre": 10, "noviembre": 11, "diciembre": 12
+            # 📆 Un rango ("del 1 al 15 de abril", "últimos 30 días") o, si no, el periodo como (mes, año)
+            rango = interpretar_rango(tracker.latest_message.get("text", "")) or interpretar_rango(periodo_raw)
+            mes, año = (None, None) if rango else interpretar_periodo(periodo_raw)
+
+            criterios = {
+                "tipo": ["ingreso", "gasto"],
+                "categoria": categoria_raw or None,
+                "medio": medio_raw or None,
+                "periodo": [año, mes] if mes and año else None,
+                "rango": [rango[0].isoformat(), rango[1].isoformat()] if rango else None,
+                "parcial": True,
             }
 
-            def orden_fecha(t):
-                return (
-                    int(t.get("año", 0)),
-                    meses_orden.get(t.get("mes", "").lower(), 0),
-                    int(t.get("dia", 0))
-                )
-
-            # 🔍 Filtrar transacciones válidas
-            transacciones_filtradas = [
-                t for t in transacciones if t.get("tipo") in ["ingreso", "gasto"]
-            ]
+            # 🔍 Solo se consulta la primera página, sin ordenar ni formatear el historial completo
+            sin_resultados = construir_mensaje(
+                f"📭 *No se encontraron transacciones registradas* con los criterios proporcionados.",
+                f"🧾 **Parámetros usados:**",
+                f"- Categoría: *{categoria_raw}*" if categoria_raw else "",
+                f"- Periodo: *{texto_rango(*rango) if rango else periodo_raw}*" if rango or periodo_raw else "",
+                f"- Medio: *{medio_raw}*" if medio_raw else ""
+            )
+            return await enviar_pagina_historial(dispatcher, criterios, sin_resultados=sin_resultados)
 
-            if mes and año:
-                transacciones_filtradas = [
-                    t for t in transacciones_filtradas
-                    if t.get("mes", "").lower() == mes.lower() and int(t.get("año", 0)) == año
-                ]
+        except Exception as e:
+            print(f"[ERROR] Fallo en action_ver_historial_completo: {e}")
+            dispatcher.utter_message(text="❌ Ocurrió un error al mostrar tu historial. Por favor, intenta nuevamente.")
+            return []
 
-            if categoria_raw:
-                transacciones_filtradas = [
-                    t for t in transacciones_filtradas
-                    if categoria_raw.lower() in t.get("categoria", "").lower()
-                ]
+class ActionVerMasHistorial(Action):
+    def name(self) -> Text:
+        return "action_ver_mas_historial"
 
-            if medio_raw:
-                transacciones_filtradas = [
-                    t for t in transacciones_filtradas
-                    if medio_raw.lower() in t.get("medio", "").lower()
-                ]
+    @por_usuario
+    async def run(self, dispatcher: CollectingDispatcher,
+            tracker: Tracker,
+            domain: Dict[Text, Any]) -> List[EventType]:
 
-            if not transacciones_filtradas:
-                mensaje = construir_mensaje(
-                    f"📭 *No se encontraron transacciones registradas* con los criterios proporcionados.",
-                    f"🧾 **Parámetros usados:**",
-                    f"- Categoría: *{categoria_raw}*" if categoria_raw else "",
-                    f"- Periodo: *{periodo_raw}*" if periodo_raw else "",
-                    f"- Medio: *{medio_raw}*" if medio_raw else ""
-                )
-                dispatcher.utter_message(text=mensaje)
-                return []
+        cursor = tracker.get_slot("historial_cursor")
+        if not cursor:
+            dispatcher.utter_message(
+                text="📭 *No hay más movimientos por mostrar.*\n\n👉 Pídeme tu *historial* de un periodo para empezar."
+            )
+            return []
 
-            transacciones_filtradas.sort(key=orden_fecha)
-
-            # 🧾 Agrupar por tipo > año > mes
-            agrupadas = {"ingreso": {}, "gasto": {}}
-            for t in transacciones_filtradas:
-                tipo = t["tipo"]
-                año_t = int(t.get("año", 0))
-                mes_t = t.get("mes", "").capitalize()
-                agrupadas.setdefault(tipo, {}).setdefault(año_t, {}).setdefault(mes_t, []).append(t)
-
-            def formatear_linea(t):
-                monto = float(t.get("monto", 0))
-                categoria = t.get("categoria", "sin categoría").capitalize()
-                dia = t.get("dia")
-                mes_f = t.get("mes")
-                año_f = t.get("año")
-                medio = t.get("medio", "")
-                fecha_str = f"{dia} de {mes_f} de {año_f}" if dia and mes_f and año_f else ""
-                linea = f"🔸 *{t['tipo'].capitalize()}* de *{monto:.2f} soles* en *{categoria}*"
-                if fecha_str:
-                    linea += f", el *{fecha_str}*"
-                if medio and medio.lower() != "n/a":
-                    linea += f", con *{medio}*"
-                return linea
-
-            mensaje = ["**📋 Historial de transacciones**:"]
-
-            for tipo, label in [("ingreso", "💰 **Ingresos:**"), ("gasto", "🧾 **Egresos:**")]:
-                if not agrupadas[tipo]:
-                    continue
-                mensaje.append(label)
-                for año_t in sorted(agrupadas[tipo].keys()):
-                    for mes_t in sorted(agrupadas[tipo][año_t].keys(), key=lambda m: meses_orden[m.lower()]):
-                        mensaje.append(f"📅 *{mes_t} de {año_t}*:")
-                        transacciones_mes = agrupadas[tipo][año_t][mes_t]
-                        transacciones_mes.sort(key=orden_fecha)
-                        for t in transacciones_mes:
-                            mensaje.append(formatear_linea(t))
-
-            mensaje.append("👉 ¿Deseas *consultar otro periodo* o *registrar algo nuevo*?")
-            dispatcher.utter_message(text=construir_mensaje(*mensaje))
-            return [SlotSet("sugerencia_pendiente", "action_consultar_resumen_mensual")]
+        try:
+            estado = json.loads(cursor)
+            return await enviar_pagina_historial(
+                dispatcher, estado["criterios"], estado["despues_de"], estado.get("pagina", 1) + 1
+            )
 
         except Exception as e:
-            print(f"[ERROR] Fallo en action_ver_historial_completo: {e}")
-            dispatcher.utter_message(text="❌ Ocurrió un error al mostrar tu historial. Por favor, intenta nuevamente.")
+            print(f"[ERROR] Fallo en action_ver_mas_historial: {e}")
+            dispatcher.utter_message(text="❌ Ocurrió un error al mostrar más movimientos. Por favor, intenta nuevamente.")
             return []
 
-from collections import Counter, defaultdict
-
 class ActionAnalizarGastos(Action):
     def name(self) -> Text:
         return "action_analizar_gastos"
 
-    def run(self, dispatcher: CollectingDispatcher,
+    @por_usuario
+    async def run(self, dispatcher: CollectingDispatcher,
             tracker: Tracker,
             domain: Dict[Text, Any]) -> List[EventType]:
 
         from datetime import datetime
-        from collections import defaultdict
-        import re
-        import calendar
 
-        transacciones = cargar_transacciones(filtrar_activos=True)
         texto_usuario = tracker.latest_message.get("text", "").lower()
 
         # 🔍 Extraer entidades
         periodo_raw = get_entity(tracker, "periodo")
         categoria = get_entity(tracker, "categoria")
 
-        # 📆 Interpretar periodo (mes + año)
-        def interpretar_periodo(texto):
-            hoy = datetime.now()
-            if not texto or len(texto.strip()) < 4:
-                return None, hoy.year  # Por defecto, considerar todo el año actual
-            texto = texto.lower()
-
-            if "este mes" in texto:
-                return hoy.strftime("%B"), hoy.year
-            elif "último mes" in texto or "mes pasado" in texto:
-                mes = hoy.month - 1 if hoy.month > 1 else 12
-                año = hoy.year if hoy.month > 1 else hoy.year - 1
-                return calendar.month_name[mes], año
-
-            match = re.search(r"(enero|febrero|marzo|abril|mayo|junio|julio|agosto|septiembre|octubre|noviembre|diciembre)(?:\s+de\s+)?(\d{4})?", texto)
-            if match:
-                mes = match.group(1)
-                año = int(match.group(2)) if match.group(2) else hoy.year
-                return mes, año
-
-            return None, hoy.year  # Si no se identifica correctamente, usar todo el año actual
-
-        mes, año = interpretar_periodo(periodo_raw or texto_usuario)
-        if not año:
+        # 📆 Un rango ("del 1 al 15 de abril", "últimos 30 días") o el periodo (mes + año);
+        # sin periodo reconocible se considera todo el año actual
+        rango = interpretar_rango(texto_usuario) or interpretar_rango(periodo_raw)
+        mes, año = (None, None) if rango else interpretar_periodo(periodo_raw or texto_usuario)
+        if not año and not rango:
             año = datetime.now().year  # Año por defecto
+        filtro = {"rango": rango} if rango else {"periodo": (año, mes)}
+        periodo_str = texto_rango(*rango) if rango else f"{mes} de {año}" if mes else f"{año}"
+        en_periodo = f" *{periodo_str}*" if rango else f" durante *{periodo_str}*" if mes else f" en *{año}*"
 
-        # 🎯 Filtrar gastos válidos
-        gastos = [t for t in transacciones if t.get("tipo") == "gasto" and t.get("monto") and t.get("categoria")]
-
-        # 📅 Filtrar por año siempre, y por mes si está presente
-        gastos = [
-            g for g in gastos
-            if int(str(g.get("año", 0)).replace(",", "")) == año and
-               (not mes or g.get("mes", "").lower() == mes.lower())
-        ]
+        # 📊 Totales por categoría del periodo (año siempre, mes si está presente), de mayor a menor
+        por_categoria = await consultar_async(
+            tipo="gasto", **filtro, agrupar_por=("categoria",), orden="-total"
+        )
+        sin_categoria = sum(g["cantidad"] for g in por_categoria if not g["categoria"])
+        por_categoria = [g for g in por_categoria if g["categoria"] and g["total"]]
 
-        if not gastos:
-            periodo_str = f"{mes} de {año}" if mes else f"{año}"
+        if not por_categoria:
             dispatcher.utter_message(text=f"📭 *No se encontraron gastos registrados* para el periodo **{periodo_str}**.\n¿Deseas ingresar uno?")
             return []
 
-        sin_categoria = [g for g in gastos if not g.get("categoria")]
+        total_gasto = sum(g["total"] for g in por_categoria)
 
         # 📂 Filtrar por categoría si fue indicada
         if categoria:
-            gastos_categoria = [g for g in gastos if categoria.lower() in g.get("categoria", "").lower()]
-            total_categoria = sum(float(g["monto"]) for g in gastos_categoria)
+            gastos_categoria = [g for g in por_categoria if categoria.lower() in g["categoria"]]
+            total_categoria = sum(g["total"] for g in gastos_categoria)
 
             if not gastos_categoria:
                 mensaje = construir_mensaje(
-                    f"⚠️ Se encontraron {len(sin_categoria)} gasto(s) sin categoría." if sin_categoria else "",
-                    f"🔍 No se encontraron gastos en la categoría *{categoria}*"
-                    + (f" durante *{mes} de {año}*" if mes else f" en *{año}*") + "."
+                    f"⚠️ Se encontraron {sin_categoria} gasto(s) sin categoría." if sin_categoria else "",
+                    f"🔍 No se encontraron gastos en la categoría *{categoria}*{en_periodo}."
                 )
             else:
-                porcentaje = (total_categoria / sum(float(g["monto"]) for g in gastos) * 100)
+                porcentaje = total_categoria / total_gasto * 100
                 mensaje = construir_mensaje(
                     f"📊 En *{categoria}* gastaste un total de *{total_categoria:.2f} soles*",
                     f"📈 Eso representa aproximadamente *{porcentaje:.1f}%* del total de tus gastos.",
-                    f"📅 Periodo analizado: *{mes} de {año}*" if mes else f"📅 Año: *{año}*"
+                    f"📅 Periodo analizado: *{periodo_str}*" if rango or mes else f"📅 Año: *{año}*"
                 )
 
             dispatcher.utter_message(text=mensaje.replace("\n", "<br>"))
             return [SlotSet("sugerencia_pendiente", "action_consultar_resumen_mensual")]
 
-        # 📊 Agrupar por categoría
-        categorias_sumadas = defaultdict(float)
-        for g in gastos:
-            nombre = g.get("categoria", "Sin categoría").strip().lower()
-            categorias_sumadas[nombre] += float(g.get("monto", 0))
-
-        total_gasto = sum(categorias_sumadas.values())
-        top_categorias = sorted(categorias_sumadas.items(), key=lambda x: x[1], reverse=True)[:3]
+        top_categorias = [(g["categoria"], g["total"]) for g in por_categoria[:3]]
 
         # 🧾 Generar mensaje estructurado y formateado
         mensaje = []
 
         titulo = f"📊 **Análisis de tus hábitos de consumo**"
-        titulo += f" durante *{mes} de {año}*" if mes else f" en el año *{año}*"
+        titulo += en_periodo if rango or mes else f" en el año *{año}*"
         mensaje.append(titulo)
 
         if sin_categoria:
-            mensaje.append(f"⚠️ *{len(sin_categoria)} gasto(s) sin categoría* podrían afectar el análisis.")
+            mensaje.append(f"⚠️ *{sin_categoria} gasto(s) sin categoría* podrían afectar el análisis.")
 
         resumen = "**📌 Categorías con mayor gasto:**"
         for cat, monto in top_categorias:
@@ -629,15 +534,13 @@ class ActionAnalizarGastos(Action):
         mensaje.append(f"💸 **Total gastado:** *{total_gasto:.2f} soles*")
 
         # 📋 Ejemplos recientes
-        recientes = sorted(gastos, key=lambda g: g.get("timestamp", ""), reverse=True)[:5]
+        recientes = await consultar_async(tipo="gasto", **filtro, orden="-timestamp", limite=5)
         detalles = "📋 **Ejemplos recientes:**"
         for g in recientes:
-            dia = g.get("dia", "")
-            mes_r = g.get("mes", "").capitalize()
-            año_r = g.get("año", "")
+            dia, mes_r, año_r = g["dia"], g["mes"].capitalize(), g["año"]
             fecha = f"{dia} de {mes_r} de {año_r}" if dia and mes_r and año_r else "sin fecha"
-            monto = g.get("monto", 0)
-            cat = g.get("categoria", "Sin categoría")
+            monto = g["monto"]
+            cat = g["categoria"] or "sin categoría"
             detalles += f"\n- {cat.title()}: {monto:.2f} soles ({fecha})"
         mensaje.append(detalles)
 
@@ -647,77 +550,43 @@ class ActionAnalizarGastos(Action):
 
         return [SlotSet("sugerencia_pendiente", "action_comparar_meses")]
 
-def extraer_mes(fecha: str) -> str:
-    meses = {
-        "01": "enero", "02": "febrero", "03": "marzo", "04": "abril",
-        "05": "mayo", "06": "junio", "07": "julio", "08": "agosto",
-        "09": "septiembre", "10": "octubre", "11": "noviembre", "12": "diciembre"
-    }
-    try:
-        partes = fecha.strip().split("/")
-        if len(partes) >= 2:
-            mes = partes[1].lower().zfill(2)
-            if mes in meses:
-                return meses[mes]  # si es numérico
-            return mes  # si ya está como nombre, lo devolvemos directamente
-    except:
-        pass
-    return ""
-
 class ActionCompararMeses(Action):
     def name(self) -> Text:
         return "action_comparar_meses"
 
-    def run(self, dispatcher: CollectingDispatcher,
+    @por_usuario
+    async def run(self, dispatcher: CollectingDispatcher,
             tracker: Tracker,
             domain: Dict[Text, Any]) -> List[EventType]:
 
         try:
             from datetime import datetime
-            import re
-            from collections import defaultdict
 
-            transacciones = cargar_transacciones(filtrar_activos=True)
             texto = tracker.latest_message.get("text", "").lower()
 
             tipo = "ingreso" if "ingreso" in texto or "ingresos" in texto else "gasto"
             año_actual = datetime.now().year
 
-            posibles_meses = [
-                "enero", "febrero", "marzo", "abril", "mayo", "junio",
-                "julio", "agosto", "septiembre", "octubre", "noviembre", "diciembre"
-            ]
-
             texto_normalizado = texto
             for sep in [" y ", " o ", " vs ", " versus ", " entre ", "contra", "comparar "]:
                 texto_normalizado = texto_normalizado.replace(sep, " y ")
 
             # Buscar "marzo de 2025", "abril 2024", etc.
-            matches = re.findall(rf"({'|'.join(posibles_meses)})(?:\s+de)?\s+(\d{{4}})", texto_normalizado)
+            periodos = extraer_periodos(texto_normalizado)
 
-            if len(matches) == 2:
-                mes1, año1 = matches[0][0].lower(), int(matches[0][1])
-                mes2, año2 = matches[1][0].lower(), int(matches[1][1])
+            if len(periodos) == 2:
+                (año1, num1), (año2, num2) = periodos
+                mes1, mes2 = nombre_mes(num1), nombre_mes(num2)
 
                 if mes1 == mes2 and año1 == año2:
                     dispatcher.utter_message(text="⚠️ Por favor, proporciona *dos periodos diferentes* para la comparación.")
                     return []
 
-                total = defaultdict(float)
-                for t in transacciones:
-                    if t.get("tipo") != tipo:
-                        continue
-                    mes_t = t.get("mes", "").lower()
-                    año_t = int(str(t.get("año", 0)).replace(",", ""))
-
-                    if mes_t == mes1 and año_t == año1:
-                        total[f"{mes1} de {año1}"] += float(t.get("monto", 0))
-                    elif mes_t == mes2 and año_t == año2:
-                        total[f"{mes2} de {año2}"] += float(t.get("monto", 0))
-
-                periodo1 = f"{mes1} de {año1}"
-                periodo2 = f"{mes2} de {año2}"
-                v1, v2 = total.get(periodo1, 0), total.get(periodo2, 0)
+                resumenes = await obtener_resumenes_async()
+                periodo1 = texto_periodo(mes1, año1)
+                periodo2 = texto_periodo(mes2, año2)
+                v1 = resumenes.total(año=año1, mes=mes1, tipo=tipo)
+                v2 = resumenes.total(año=año2, mes=mes2, tipo=tipo)
 
                 if v1 == 0 and v2 == 0:
                     dispatcher.utter_message(
@@ -742,23 +611,18 @@ class ActionCompararMeses(Action):
                 return [SlotSet("sugerencia_pendiente", "action_crear_configuracion")]
 
             elif "en qué mes" in texto:
-                totales_por_mes = defaultdict(float)
-                for t in transacciones:
-                    if t.get("tipo") != tipo:
-                        continue
-                    mes = t.get("mes", "").lower()
-                    año = int(str(t.get("año", 0)).replace(",", ""))
-                    if mes in posibles_meses and año == año_actual:
-                        totales_por_mes[mes] += float(t.get("monto", 0))
-
-                if not totales_por_mes:
+                por_mes = [
+                    g for g in await consultar_async(tipo=tipo, periodo=(año_actual, None), agrupar_por=("mes",), orden="-total")
+                    if g["mes"] in NUMERO_MES and g["total"] > 0
+                ]
+
+                if not por_mes:
                     dispatcher.utter_message(
                         text=f"📭 No se encontraron {tipo}s registrados durante el año *{año_actual}*."
                     )
                     return []
 
-                mes_max = max(totales_por_mes.items(), key=lambda x: x[1])[0]
-                monto_max = totales_por_mes[mes_max]
+                mes_max, monto_max = por_mes[0]["mes"], por_mes[0]["total"]
 
                 mensaje = construir_mensaje(
                     f"📅 **Mes con mayor {tipo} en {año_actual}:**",
@@ -785,16 +649,11 @@ class ActionConsultarInformacionFinanciera(Action):
     def name(self) -> Text:
         return "action_consultar_informacion_financiera"
 
-    def run(self, dispatcher: CollectingDispatcher,
+    @por_usuario
+    async def run(self, dispatcher: CollectingDispatcher,
             tracker: Tracker,
             domain: Dict[Text, Any]) -> List[EventType]:
 
-        from datetime import datetime
-        from collections import defaultdict
-        import re
-        import calendar
-
-        transacciones = cargar_transacciones(filtrar_activos=True)
         texto = tracker.latest_message.get("text", "").strip().lower()
 
         tipo = get_entity(tracker, "tipo") or tracker.get_slot("tipo")
@@ -803,24 +662,6 @@ class ActionConsultarInformacionFinanciera(Action):
         fecha_raw = get_entity(tracker, "fecha") or tracker.get_slot("fecha")
         periodo_raw = get_entity(tracker, "periodo") or tracker.get_slot("periodo")
 
-        def interpretar_periodo(periodo_raw):
-            hoy = datetime.now()
-            if not periodo_raw:
-                return None, None
-            texto = periodo_raw.lower().strip()
-            if "este mes" in texto:
-                return hoy.strftime("%B"), hoy.year
-            elif "último mes" in texto or "mes pasado" in texto:
-                mes = hoy.month - 1 if hoy.month > 1 else 12
-                año = hoy.year if hoy.month > 1 else hoy.year - 1
-                nombre_mes = calendar.month_name[mes]
-                return nombre_mes, año
-            else:
-                match = re.search(r"([a-záéíóúñ]+)(?:\s+de\s+)?(\d{4})?", texto)
-                if match:
-                    return match.group(1), int(match.group(2)) if match.group(2) else hoy.year
-            return None, None
-
         def normalizar_tipo(tipo_raw):
             mapa = {
                 "ingresos": "ingreso",
@@ -832,60 +673,52 @@ class ActionConsultarInformacionFinanciera(Action):
             }
             return mapa.get(tipo_raw.lower(), tipo_raw.lower())
 
+        # 📆 Un rango ("del 1 al 15 de abril", "últimos 30 días") tiene prioridad sobre el mes completo
+        rango = interpretar_rango(texto) or interpretar_rango(periodo_raw)
         mes, año = None, None
-        if periodo_raw:
+        if periodo_raw and not rango:
             mes, año = interpretar_periodo(periodo_raw)
+        periodo_str = texto_rango(*rango) if rango else f"{mes} de {año}" if mes and año else None
+        en_periodo = f" *{periodo_str}*" if rango else f" durante *{periodo_str}*"
 
         tipo_normalizado = normalizar_tipo(tipo) if tipo else None
 
-        resultados = []
-        for t in transacciones:
-            if t.get("status", 1) != 1:
-                continue
-            if tipo_normalizado and t.get("tipo") != tipo_normalizado:
-                continue
-            if medio and medio.lower() not in t.get("medio", "").lower():
-                continue
-            if categoria and categoria.lower() not in t.get("categoria", "").lower():
-                continue
-            try:
-                año_json = int(str(t.get("año", 0)).replace(",", ""))
-            except:
-                año_json = 0
-            if mes and año:
-                if t.get("mes", "").lower() != mes.lower() or año_json != int(año):
-                    continue
-            resultados.append(t)
-
-        print(f"[DEBUG] Resultados encontrados: {len(resultados)} | tipo={tipo_normalizado}, mes={mes}, año={año}")
+        # 📊 Totales por categoría con todos los filtros aplicados en una sola consulta
+        por_categoria = await consultar_async(
+            tipo=tipo_normalizado,
+            categoria=categoria,
+            medio=medio,
+            periodo=(año, mes) if mes and año else None,
+            rango=rango,
+            parcial=True,
+            agrupar_por=("categoria",),
+        )
+        cantidad = sum(g["cantidad"] for g in por_categoria)
 
-        total = sum(t["monto"] for t in resultados)
+        total = sum(g["total"] for g in por_categoria)
 
-        if not resultados:
+        if not cantidad:
             mensaje = construir_mensaje(
                 f"📭 *No se encontraron registros financieros* con los criterios proporcionados.",
                 f"🧾 **Parámetros usados:**",
                 f"- Tipo: *{tipo}*" if tipo else "",
                 f"- Categoría: *{categoria}*" if categoria else "",
                 f"- Medio: *{medio}*" if medio else "",
-                f"- Periodo: *{mes} de {año}*" if mes and año else ""
+                f"- Periodo: *{periodo_str}*" if periodo_str else ""
             )
             dispatcher.utter_message(text=mensaje)
             return []
 
         partes = []
 
-        if categoria and mes and año:
-            partes.append(f"📌 Tu *{tipo}* total en *{categoria}* durante *{mes} de {año}* es de *{total:.2f} soles*.")
-        elif tipo and mes and año:
-            partes.append(f"📌 Tu *{tipo}* total durante *{mes} de {año}* es de *{total:.2f} soles*.")
+        if categoria and periodo_str:
+            partes.append(f"📌 Tu *{tipo}* total en *{categoria}*{en_periodo} es de *{total:.2f} soles*.")
+        elif tipo and periodo_str:
+            partes.append(f"📌 Tu *{tipo}* total{en_periodo} es de *{total:.2f} soles*.")
         elif tipo:
-            resumen_cat = defaultdict(float)
-            for t in resultados:
-                resumen_cat[t.get("categoria", "Sin categoría")] += t["monto"]
             partes.append(f"📊 *Resumen de {tipo}s por categoría:*")
-            for cat, monto in resumen_cat.items():
-                partes.append(f"- {cat}: {monto:.2f} soles")
+            for g in por_categoria:
+                partes.append(f"- {g['categoria'] or 'Sin categoría'}: {g['total']:.2f} soles")
         elif medio:
             partes.append(f"📌 Total registrado usando *{medio}*: *{total:.2f} soles*.")
         else:
@@ -900,7 +733,8 @@ class ActionEntradaNoEntendida(Action):
     def name(self) -> Text:
         return "action_entrada_no_entendida"
 
-    def run(self, dispatcher: CollectingDispatcher,
+    @por_usuario
+    async def run(self, dispatcher: CollectingDispatcher,
             tracker: Tracker,
             domain: Dict[Text, Any]) -> List[EventType]:
 
@@ -919,7 +753,7 @@ class ActionEntradaNoEntendida(Action):
                 return []
 
             # 🧠 Guardar entrada como no comprendida
-            guardar_transaccion({
+            await guardar_transaccion_async({
                 "tipo": "entrada_no_entendida",
                 "descripcion": texto,
                 "timestamp": datetime.now().isoformat()
@@ -961,22 +795,12 @@ class ActionResetearCategoriaGastos(Action):
     def name(self) -> Text:
         return "action_resetear_categoria_gastos"
 
-    def run(self, dispatcher: CollectingDispatcher,
+    @por_usuario
+    async def run(self, dispatcher: CollectingDispatcher,
             tracker: Tracker,
             domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
 
-        from datetime import datetime
-        import re
-        import json
-        from transacciones_io import (
-            descargar_de_github,
-            cargar_transacciones,
-            RUTA_TRANSACCIONES,
-            REPO,
-            ARCHIVO_GITHUB,
-            TOKEN,
-            subir_a_github
-        )
+        from transacciones_io import desactivar_transacciones_async
         from utils import get_entity, construir_mensaje
 
         categoria = get_entity(tracker, "categoria")
@@ -989,43 +813,22 @@ class ActionResetearCategoriaGastos(Action):
             return []
 
         # 🗓️ Normalizar periodo
-        match = re.search(r"([a-záéíóúñ]+)(?:\s+de\s+)?(\d{4})", periodo.lower())
-        if not match:
+        mes, año = interpretar_periodo(periodo, requiere_año=True)
+        if not mes:
             dispatcher.utter_message(
                 text="🗓️ El periodo debe tener el formato *“marzo de 2025”*, por ejemplo."
             )
             return []
 
-        mes = match.group(1).strip().lower()
-        año = int(match.group(2))
-        ahora = datetime.now().isoformat()
-
-        # 📥 Sincronizar antes de consultar
-        descargar_de_github()
-
-        # 📄 Cargar transacciones completas (activas e inactivas)
-        transacciones = cargar_transacciones(filtrar_activos=False)
-        gastos_reseteados = []
-
-        for t in transacciones:
-            if (
-                t.get("tipo") == "gasto"
-                and t.get("categoria", "").lower() == categoria.lower()
-                and t.get("mes", "").lower() == mes
-                and t.get("año") == año
-                and t.get("status", 1) == 1
-            ):
-                t["status"] = 0
-                t["timestamp_modificacion"] = ahora
-                gastos_reseteados.append(t)
-
-        # 💾 Guardar cambios en /tmp
-        with open(RUTA_TRANSACCIONES, "w", encoding="utf-8") as f:
-            json.dump(transacciones, f, ensure_ascii=False, indent=2)
-
-        # ☁ Subir a GitHub
-        if TOKEN:
-            subir_a_github(RUTA_TRANSACCIONES, REPO, ARCHIVO_GITHUB, TOKEN)
+        # 🔄 Desactivar los gastos (sincroniza, persiste y sube según el modo de almacenamiento)
+        gastos_reseteados = await desactivar_transacciones_async(
+            lambda t: (
+                t["tipo"] == "gasto"
+                and t["categoria"] == categoria.lower()
+                and t["mes"] == mes
+                and t["año"] == año
+            )
+        )
 
         # 📢 Mensaje al usuario
         if gastos_reseteados:
@@ -1052,12 +855,12 @@ class ActionCrearConfiguracion(Action):
     def name(self) -> Text:
         return "action_crear_configuracion"
 
-    def run(self, dispatcher: CollectingDispatcher,
+    @por_usuario
+    async def run(self, dispatcher: CollectingDispatcher,
             tracker: Tracker,
             domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         try:
-            import re
             from datetime import datetime
 
             categoria = get_entity(tracker, "categoria")
@@ -1080,28 +883,17 @@ class ActionCrearConfiguracion(Action):
                 return []
 
             # 📆 Normalizar periodo
-            periodo = periodo.lower().strip()
-            match = re.search(r"([a-záéíóúñ]+)(?:\s+de\s+)?(\d{4})", periodo)
-            if not match:
+            mes, año = interpretar_periodo(periodo, requiere_año=True)
+            if not mes:
                 dispatcher.utter_message(
                     text="📅 El formato del periodo debe ser *“abril de 2024”*, por ejemplo."
                 )
                 return []
 
-            mes = match.group(1).strip().lower()
-            año = int(match.group(2))
-            periodo_normalizado = f"{mes} de {año}"
+            periodo_normalizado = texto_periodo(mes, año)
 
             # 🧠 Verificar si ya existe una alerta activa
-            alertas = cargar_alertas()
-            ya_existe = any(
-                a.get("categoria", "").lower() == categoria.lower() and
-                a.get("periodo", "").lower() == periodo_normalizado and
-                a.get("status", 1) == 1
-                for a in alertas
-            )
-
-            if ya_existe:
+            if await buscar_alerta_activa_async(categoria, periodo_normalizado):
                 dispatcher.utter_message(
                     text=f"🔔 Ya existe una *alerta activa* para *{categoria}* en *{periodo_normalizado}*.\n\n🛠️ Usa *modificar* si deseas actualizarla."
                 )
@@ -1117,7 +909,7 @@ class ActionCrearConfiguracion(Action):
                 "status": 1
             }
 
-            guardar_alerta(nueva_alerta)
+            await guardar_alerta_async(nueva_alerta)
 
             mensaje = construir_mensaje(
                 f"✅ *Presupuesto/Alerta registrada correctamente*",
@@ -1137,14 +929,13 @@ class ActionModificarConfiguracion(Action):
     def name(self) -> Text:
         return "action_modificar_configuracion"
 
-    def run(self, dispatcher: CollectingDispatcher,
+    @por_usuario
+    async def run(self, dispatcher: CollectingDispatcher,
             tracker: Tracker,
             domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
 
-        import re
         import json
         from datetime import datetime
-        from alertas_io import modificar_alerta, RUTA_ALERTAS
         from utils import parse_monto, construir_mensaje
         from typing import Dict
 
@@ -1169,40 +960,21 @@ class ActionModificarConfiguracion(Action):
             return []
 
         # 📅 Normalizar periodo
-        match = re.search(r"([a-záéíóúñ]+)(?:\s+de\s+)?(\d{4})", periodo.lower())
-        if not match:
+        mes, año = interpretar_periodo(periodo, requiere_año=True)
+        if not mes:
             dispatcher.utter_message(
                 text="📅 El formato del periodo debe ser *“abril de 2024”*, por ejemplo."
             )
             return []
 
-        mes = match.group(1).strip().lower()
-        año = int(match.group(2))
-        periodo_normalizado = f"{mes} de {año}"
+        periodo_normalizado = texto_periodo(mes, año)
 
-        # 📂 Cargar desde archivo original directamente (sin cache)
-        if not os.path.exists(RUTA_ALERTAS):
-            dispatcher.utter_message(text="❌ No se encontró el archivo de alertas.")
-            return []
+        # 📂 Alerta vigente para la categoría y periodo
+        alerta_actual = await buscar_alerta_activa_async(categoria, periodo_normalizado)
+        monto_original = alerta_actual["monto"] if alerta_actual else None
 
-        with open(RUTA_ALERTAS, "r", encoding="utf-8") as f:
-            alertas = json.load(f)
-
-        monto_original = None
-        for alerta in alertas:
-            if (
-                alerta.get("categoria", "").lower() == categoria.lower()
-                and alerta.get("periodo", "").lower() == periodo_normalizado
-                and alerta.get("status", 1) == 1
-            ):
-                monto_original = alerta.get("monto")
-                break
-
-        # ✏️ Intentar modificar alerta
-        modificada = modificar_alerta(
-            condiciones={"categoria": categoria, "periodo": periodo_normalizado},
-            nuevos_valores={"monto": monto_float}
-        )
+        # ✏️ Modificar la alerta encontrada, localizada por su id
+        modificada = bool(alerta_actual) and await modificar_alerta_por_id_async(alerta_actual["id"], {"monto": monto_float})
 
         if modificada and monto_original is not None:
             mensaje = construir_mensaje(
@@ -1226,7 +998,8 @@ class ActionConfirmarModificacionAlerta(Action):
     def name(self) -> Text:
         return "confirmar_modificacion_alerta"
 
-    def run(self, dispatcher: CollectingDispatcher,
+    @por_usuario
+    async def run(self, dispatcher: CollectingDispatcher,
             tracker: Tracker,
             domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
 
@@ -1237,13 +1010,7 @@ class ActionConfirmarModificacionAlerta(Action):
         periodo = tracker.get_slot("periodo")
 
         # 🔍 Verificar si la alerta aún existe y está activa
-        alertas = cargar_alertas()
-        alerta_existente = next((
-            a for a in alertas
-            if a.get("categoria", "").lower() == categoria.lower()
-            and a.get("periodo", "").lower() == periodo.lower()
-            and a.get("status", 1) == 1
-        ), None)
+        alerta_existente = await buscar_alerta_activa_async(categoria, periodo)
 
         if not alerta_existente:
             dispatcher.utter_message(
@@ -1265,14 +1032,15 @@ class ActionConfirmarModificacionAlerta(Action):
         dispatcher.utter_message(text=mensaje)
 
         return [
-            SlotSet("alerta_original", json.dumps(alerta_existente))  # Para su uso posterior
+            SlotSet("alerta_id", alerta_existente["id"])  # Para su uso posterior
         ]
 
 class ActionEjecutarModificacionAlerta(Action):
     def name(self) -> Text:
         return "action_ejecutar_modificacion_alerta"
 
-    def run(self, dispatcher: CollectingDispatcher,
+    @por_usuario
+    async def run(self, dispatcher: CollectingDispatcher,
             tracker: Tracker,
             domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
 
@@ -1283,41 +1051,25 @@ class ActionEjecutarModificacionAlerta(Action):
             categoria = tracker.get_slot("categoria")
             monto = tracker.get_slot("monto")
             periodo = tracker.get_slot("periodo")
-            alerta_json = tracker.get_slot("alerta_original")
+            alerta_id = tracker.get_slot("alerta_id")
 
-            if not (categoria and monto and periodo and alerta_json):
+            if not (categoria and monto and periodo and alerta_id):
                 dispatcher.utter_message(
                     text="⚠️ *No se pudo completar la modificación* porque faltan datos importantes."
                 )
                 return []
 
-            alerta_original = json.loads(alerta_json)
-            alertas = cargar_alertas()
-            ahora = datetime.now()
-
-            # 🚫 Desactivar alerta anterior
-            for alerta in alertas:
-                if (
-                    alerta.get("categoria", "").lower() == alerta_original.get("categoria", "").lower() and
-                    alerta.get("periodo", "").lower() == alerta_original.get("periodo", "").lower() and
-                    alerta.get("status", 1) == 1
-                ):
-                    alerta["status"] = 0
-                    alerta["timestamp_modificacion"] = ahora.isoformat()
-
-            # 🆕 Crear alerta actualizada
+            # 🔁 Desactivar la alerta anterior (si sigue activa) y guardar la actualizada, en una sola escritura
             nueva_alerta = {
                 "categoria": categoria,
                 "monto": float(monto),
-                "periodo": periodo,
-                "status": 1,
-                "timestamp": ahora.isoformat()
+                "periodo": periodo
             }
-            alertas.append(nueva_alerta)
-
-            # 💾 Guardar cambios
-            with open(RUTA_ALERTAS, "w", encoding="utf-8") as f:
-                json.dump(alertas, f, ensure_ascii=False, indent=2)
+            if not await reemplazar_alerta_por_id_async(alerta_id, nueva_alerta):
+                dispatcher.utter_message(
+                    text="⚠️ *La alerta que intentas modificar ya no está activa o no existe.*"
+                )
+                return [SlotSet("alerta_id", None)]
 
             # ✅ Confirmación final
             mensaje = construir_mensaje(
@@ -1333,7 +1085,7 @@ class ActionEjecutarModificacionAlerta(Action):
                 SlotSet("categoria", None),
                 SlotSet("monto", None),
                 SlotSet("periodo", None),
-                SlotSet("alerta_original", None),
+                SlotSet("alerta_id", None),
                 SlotSet("sugerencia_pendiente", None),
             ]
 
@@ -1345,22 +1097,18 @@ class ActionEjecutarModificacionAlerta(Action):
             return []
 
 def desactivar_alerta(categoria: str, periodo: str):
-    alertas = cargar_alertas()
-    for alerta in alertas:
-        if alerta["categoria"].lower() == categoria.lower() and alerta["periodo"].lower() == periodo.lower():
-            alerta["status"] = 0
-    guardar_todas_las_alertas(alertas)
+    # Una sola mutación en el escritor: leer, modificar y reescribir aquí podía pisar otra escritura
+    desactivar_alertas(categoria, periodo)
 
 class ActionEliminarConfiguracion(Action):
     def name(self) -> Text:
         return "action_eliminar_configuracion"
 
-    def run(self, dispatcher: CollectingDispatcher,
+    @por_usuario
+    async def run(self, dispatcher: CollectingDispatcher,
             tracker: Tracker,
             domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
 
-        import re
-        from alertas_io import eliminar_alerta_logicamente, cargar_alertas, recuperar_alertas_desde_github
         from utils import construir_mensaje
 
         categoria = get_entity(tracker, "categoria")
@@ -1376,16 +1124,10 @@ class ActionEliminarConfiguracion(Action):
         periodo = periodo.lower().strip()
 
         # 🔁 Recuperar la versión más reciente del archivo
-        recuperar_alertas_desde_github()
+        await recuperar_alertas_desde_github_async()
 
         # 🔍 Buscar alerta activa con ese criterio
-        alertas = cargar_alertas()
-        alerta = next((
-            a for a in alertas
-            if a.get("categoria", "").lower() == categoria.lower()
-            and a.get("periodo", "").lower() == periodo
-            and a.get("status", 1) == 1
-        ), None)
+        alerta = await buscar_alerta_activa_async(categoria, periodo)
 
         if not alerta:
             dispatcher.utter_message(
@@ -1393,13 +1135,10 @@ class ActionEliminarConfiguracion(Action):
             )
             return []
 
-        monto = alerta.get("monto", 0)
+        monto = alerta["monto"]
 
-        # 🗑️ Eliminar directamente
-        eliminar_alerta_logicamente({
-            "categoria": categoria,
-            "periodo": periodo
-        })
+        # 🗑️ Eliminar directamente, por id
+        await eliminar_alerta_logicamente_async({"id": alerta["id"]})
 
         mensaje = construir_mensaje(
             f"🗑️ *Alerta eliminada correctamente*",
@@ -1415,7 +1154,8 @@ class ActionConfirmarEliminacionAlerta(Action):
     def name(self) -> Text:
         return "confirmar_eliminacion_alerta"
 
-    def run(self, dispatcher: CollectingDispatcher,
+    @por_usuario
+    async def run(self, dispatcher: CollectingDispatcher,
             tracker: Tracker,
             domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
 
@@ -1433,24 +1173,9 @@ class ActionConfirmarEliminacionAlerta(Action):
             return [SlotSet("sugerencia_pendiente", None)]
 
         # 🔍 Buscar y desactivar alerta
-        alertas = cargar_alertas()
-        encontrado = False
-
-        for alerta in alertas:
-            if (
-                alerta.get("categoria", "").lower() == categoria.lower()
-                and alerta.get("periodo", "").lower() == periodo.lower()
-                and alerta.get("status", 1) == 1
-            ):
-                alerta["status"] = 0
-                alerta["timestamp_modificacion"] = datetime.now().isoformat()
-                encontrado = True
+        encontrado = await desactivar_alertas_async(categoria, periodo) > 0
 
         if encontrado:
-            # 💾 Guardar cambios
-            with open(RUTA_ALERTAS, "w", encoding="utf-8") as f:
-                json.dump(alertas, f, ensure_ascii=False, indent=2)
-
             mensaje = construir_mensaje(
                 f"🗑️ *Alerta eliminada correctamente*",
                 f"• Categoría: *{categoria}*",
@@ -1473,38 +1198,16 @@ class ActionConsultarConfiguracion(Action):
     def name(self) -> Text:
         return "action_consultar_configuracion"
 
-    def run(self, dispatcher, tracker, domain):
-        import re
+    @por_usuario
+    async def run(self, dispatcher, tracker, domain):
         from datetime import datetime
 
-        alertas = cargar_alertas()
-        if not alertas:
-            dispatcher.utter_message(
-                text="📭 *No tienes configuraciones de alertas registradas actualmente.*"
-            )
-            return []
-
         texto_usuario = tracker.latest_message.get("text", "").lower()
 
         # 🔍 Capturar entidad periodo (normalizado)
         periodo_raw = get_entity(tracker, "periodo")
-        periodo_normalizado = None
-        if "este mes" in texto_usuario:
-            mes_actual_en = datetime.now().strftime("%B").lower()
-            meses_es = {
-                "january": "enero", "february": "febrero", "march": "marzo", "april": "abril",
-                "may": "mayo", "june": "junio", "july": "julio", "august": "agosto",
-                "september": "septiembre", "october": "octubre", "november": "noviembre", "december": "diciembre"
-            }
-            mes_actual = meses_es.get(mes_actual_en, mes_actual_en)
-            año_actual = datetime.now().year
-            periodo_normalizado = f"{mes_actual} de {año_actual}"
-        elif periodo_raw:
-            match = re.search(r"([a-záéíóúñ]+)(?:\s+de\s+)?(\d{4})?", periodo_raw.lower())
-            if match:
-                mes = match.group(1).strip()
-                año = match.group(2) or str(datetime.now().year)
-                periodo_normalizado = f"{mes} de {año}"
+        mes, año = interpretar_periodo("este mes" if "este mes" in texto_usuario else periodo_raw)
+        periodo_normalizado = texto_periodo(mes, año) if mes else None
 
         # 🔍 Capturar entidad categoria
         categoria_raw = None
@@ -1515,23 +1218,14 @@ class ActionConsultarConfiguracion(Action):
         if not categoria_raw:
             categoria_raw = tracker.get_slot("categoria")
 
-        # 📌 Filtrar alertas activas, y por periodo o categoría si aplica
-        ultimas_alertas = {}
-        for alerta in sorted(alertas, key=lambda x: x.get("timestamp", ""), reverse=True):
-            if alerta.get("status", 1) != 1:
-                continue
-
-            periodo_alerta = alerta.get("periodo", "").lower()
-            categoria_alerta = alerta.get("categoria", "").lower()
-            clave = f"{categoria_alerta}_{periodo_alerta}"
+        # 📌 Alerta vigente de cada categoría y periodo, filtrada por periodo o categoría si aplica
+        ultimas_alertas = await listar_alertas_activas_async(categoria_raw, periodo_normalizado)
 
-            if periodo_normalizado and periodo_alerta != periodo_normalizado:
-                continue
-            if categoria_raw and categoria_alerta != categoria_raw:
-                continue
-
-            if clave not in ultimas_alertas:
-                ultimas_alertas[clave] = alerta
+        if not ultimas_alertas and not await listar_alertas_activas_async():
+            dispatcher.utter_message(
+                text="📭 *No tienes configuraciones de alertas registradas actualmente.*"
+            )
+            return []
 
         if not ultimas_alertas:
             texto = f"📭 *No se encontraron alertas activas"
@@ -1544,10 +1238,10 @@ class ActionConsultarConfiguracion(Action):
             return []
 
         mensaje = ["🔔 **Estas son tus configuraciones de alerta activas:**"]
-        for alerta in ultimas_alertas.values():
-            categoria = alerta.get("categoria", "desconocida").capitalize()
-            monto = alerta.get("monto", "?")
-            periodo = alerta.get("periodo", "")
+        for alerta in ultimas_alertas:
+            categoria = (alerta["categoria"] or "desconocida").capitalize()
+            monto = alerta["monto"]
+            periodo = alerta["periodo"]
             fecha = ""
             if alerta.get("timestamp"):
                 try:
@@ -1568,7 +1262,8 @@ class ActionEliminarAlerta(Action):
     def name(self) -> Text:
         return "action_eliminar_alerta"
 
-    def run(self, dispatcher, tracker, domain):
+    @por_usuario
+    async def run(self, dispatcher, tracker, domain):
         categoria = get_entity(tracker, "categoria")
         periodo = get_entity(tracker, "periodo")
 
@@ -1583,22 +1278,16 @@ class ActionEliminarAlerta(Action):
             "periodo": periodo.lower()
         }
 
-        alertas = cargar_alertas()
-        coincidencias = [
-            a for a in alertas
-            if a.get("categoria", "").lower() == condiciones["categoria"]
-            and a.get("periodo", "").lower() == condiciones["periodo"]
-            and a.get("status", 1) == 1
-        ]
+        alerta = await buscar_alerta_activa_async(condiciones["categoria"], condiciones["periodo"])
 
-        if not coincidencias:
+        if not alerta:
             dispatcher.utter_message(
                 text=f"📭 *No encontré ninguna alerta activa* para *{categoria}* en *{periodo}*."
             )
             return []
 
-        # 🗑️ Eliminar lógicamente
-        eliminar_alerta_logicamente(condiciones)
+        # 🗑️ Eliminar lógicamente, por id
+        await eliminar_alerta_logicamente_async({"id": alerta["id"]})
 
         mensaje = construir_mensaje(
             f"🗑️ *Alerta eliminada correctamente*",
@@ -1616,7 +1305,8 @@ class ActionFollowSuggestion(Action):
     def name(self) -> Text:
         return "action_follow_suggestion"
 
-    def run(self, dispatcher: CollectingDispatcher,
+    @por_usuario
+    async def run(self, dispatcher: CollectingDispatcher,
             tracker: Tracker,
             domain: Dict[Text, Any]) -> List[EventType]:
 
@@ -1660,21 +1350,15 @@ class ActionBienvenida(Action):
     def name(self) -> Text:
         return "action_bienvenida"
 
-    def run(self, dispatcher: CollectingDispatcher,
+    @por_usuario
+    async def run(self, dispatcher: CollectingDispatcher,
             tracker: Tracker,
             domain: Dict[Text, Any]) -> List[EventType]:
 
         from datetime import datetime
 
-        meses_es = {
-            "January": "enero", "February": "febrero", "March": "marzo", "April": "abril",
-            "May": "mayo", "June": "junio", "July": "julio", "August": "agosto",
-            "September": "septiembre", "October": "octubre", "November": "noviembre", "December": "diciembre"
-        }
-
         ahora = datetime.now()
-        nombre_mes_en = ahora.strftime("%B")
-        nombre_mes_es = meses_es.get(nombre_mes_en, nombre_mes_en).capitalize()
+        nombre_mes_es = nombre_mes(ahora.month).capitalize()
         fecha_formateada = f"{ahora.day} de {nombre_mes_es} de {ahora.year}"
 
         mensaje = construir_mensaje(
@@ -1696,7 +1380,8 @@ class ActionAyudaGeneral(Action):
     def name(self) -> Text:
         return "action_ayuda_general"
 
-    def run(self, dispatcher: CollectingDispatcher,
+    @por_usuario
+    async def run(self, dispatcher: CollectingDispatcher,
             tracker: Tracker,
             domain: Dict[Text, Any]) -> List[EventType]:
 
@@ -1720,6 +1405,7 @@ class ActionSessionStart(Action):
     def name(self) -> Text:
         return "action_session_start"
 
+    @por_usuario
     async def run(
         self, dispatcher: CollectingDispatcher, tracker: Tracker, domain: Dict
     ) -> List[EventType]:
@@ -1738,7 +1424,8 @@ class ActionNegacion(Action):
     def name(self) -> Text:
         return "action_negacion"
 
-    def run(self, dispatcher: CollectingDispatcher,
+    @por_usuario
+    async def run(self, dispatcher: CollectingDispatcher,
             tracker: Tracker,
             domain: Dict[Text, Any]) -> List[EventType]:
 
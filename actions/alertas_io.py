@@ -1,193 +1,668 @@
 import json
 import os
-import base64
+import threading
+from collections import defaultdict
 from datetime import datetime
-from typing import Dict, Any
-import requests
-
+from typing import Dict, Any, List, Optional, Set, Tuple
+import almacen_sqlite
+from asincrono import en_hilo
+from escritor import escritor, mutacion
+from esquema import cargar_documento, normalizar_alerta, serializar
+from github_sync import descargar_si_cambio, encolar_subida, escribir_atomico, hay_subida_pendiente, registrar_fusionador, ACTUALIZADO
+from identificadores import asegurar_ids, diferencias_por_id, nuevo_id
+from registros import Alerta, compactar
+from usuarios import PorUsuario, ruta_local, ruta_remota, usuario_actual
+
+# Rutas del usuario legado; cada usuario tiene las suyas (ver usuarios.py)
 RUTA_ALERTAS = "/tmp/alertas.json"
 
+# "json" (archivo completo) o "sqlite" (tabla indexada; alertas.json queda como espejo para GitHub)
+MODO_ALERTAS = os.getenv("ALERTAS_MODO", "json").lower()
+
 # --- GitHub Sync ---
 GITHUB_REPO = "MaximoGuzmanH/chatbot-financiero"
 ARCHIVO_ALERTAS = "alertas.json"
 GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
 
+def ruta_alertas() -> str:
+    return ruta_local(RUTA_ALERTAS)
+
+def archivo_alertas() -> str:
+    return ruta_remota(ARCHIVO_ALERTAS)
+
 # --- Recuperación inicial desde GitHub si no existe alerta local ---
 def recuperar_alertas_desde_github():
     if not GITHUB_TOKEN:
         print("[WARN] GITHUB_TOKEN no definido. No se puede recuperar desde GitHub.")
         return
 
-    api_url = f"https://api.github.com/repos/{GITHUB_REPO}/contents/{ARCHIVO_ALERTAS}"
-    headers = {"Authorization": f"Bearer {GITHUB_TOKEN}"}
-
-    response = requests.get(api_url, headers=headers)
-    if response.status_code == 200:
-        contenido_base64 = response.json().get("content", "")
-        if contenido_base64:
-            contenido_json = base64.b64decode(contenido_base64).decode("utf-8")
-            with open(RUTA_ALERTAS, "w", encoding="utf-8") as f:
-                f.write(contenido_json)
-            print("[INIT] alertas.json restaurado desde GitHub.")
-    else:
-        print(f"[ERROR] No se pudo recuperar alertas desde GitHub: {response.status_code}")
+    # 🛑 Con una subida pendiente en el outbox, la copia local es la más reciente
+    if hay_subida_pendiente(archivo_alertas()):
+        print("[INFO] alertas.json tiene cambios pendientes de subir. No se sobrescribirá.")
+        return
+
+    api_url = f"https://api.github.com/repos/{GITHUB_REPO}/contents/{archivo_alertas()}"
+    # Contenido en crudo (sin base64) y condicional por ETag: un 304 no consume cuota ni reescribe
+    headers = {"Authorization": f"Bearer {GITHUB_TOKEN}", "Accept": "application/vnd.github.raw"}
+
+    try:
+        estado = descargar_si_cambio(api_url, ruta_alertas(), headers, validar=lambda c: bool(c.strip()),
+                                     ruta_destino=archivo_alertas())
+    except Exception as e:
+        print(f"[ERROR] No se pudo recuperar alertas desde GitHub: {e}")
+        return
+
+    if estado == ACTUALIZADO:
+        print("[INIT] alertas.json restaurado desde GitHub.")
+    elif estado is None:
+        print("[ERROR] No se pudo recuperar alertas desde GitHub.")
 
 # --- Inicialización local desde GitHub si no existe o está vacío ---
-if not os.path.exists(RUTA_ALERTAS) or os.path.getsize(RUTA_ALERTAS) == 0:
-    recuperar_alertas_desde_github()
-    if not os.path.exists(RUTA_ALERTAS):  # Si aún no se creó, inicializar vacío
-        with open(RUTA_ALERTAS, "w", encoding="utf-8") as f:
-            json.dump([], f)
+# Se hace en el primer acceso de cada usuario (o en el precalentamiento), nunca al importar el módulo
+_inicializados: Set[str] = set()
+_lock_inicializacion = threading.Lock()
 
-def subir_a_github_alertas():
-    if not GITHUB_TOKEN:
-        print("[WARN] GITHUB_TOKEN no definido. No se subirá a GitHub.")
+def inicializar_alertas():
+    usuario = usuario_actual()
+    if usuario in _inicializados:
         return
+    with _lock_inicializacion:
+        if usuario in _inicializados:
+            return
+        ruta = ruta_alertas()
+        if not os.path.exists(ruta) or os.path.getsize(ruta) == 0:
+            recuperar_alertas_desde_github()
+            if not os.path.exists(ruta):  # Si aún no se creó, inicializar vacío
+                with open(ruta, "w", encoding="utf-8") as f:
+                    f.write(serializar([]))
+        _inicializados.add(usuario)
+
+# --- Copia en memoria (modo json) ---
+def clave_alerta(categoria, periodo) -> Tuple[str, str]:
+    """Clave normalizada (categoría, periodo) con la que se indexan las alertas activas."""
+    return str(categoria or "").strip().lower(), str(periodo or "").strip().lower()
+
+class AlertStore:
+    """
+    Alertas ya parseadas con tres índices que se mantienen en cada mutación:
+    id → posición, (categoría, periodo) → alertas activas en orden de registro, y las claves
+    activas por periodo y por categoría. Solo se relee el archivo cuando cambia su versión
+    (mtime y tamaño); las mutaciones pasan por `agregar` y `modificar` y luego se persiste
+    con `_persistir_json`. Las alertas se guardan como `Alerta` (registros.py); hacia
+    afuera se entregan copias en diccionarios.
+    """
 
+    def __init__(self, ruta: str):
+        self.ruta = ruta
+        self._alertas: Optional[List[dict]] = None
+        self._posiciones: Dict[str, int] = {}
+        self._activas: Dict[Tuple[str, str], List[dict]] = {}
+        self._claves_por_periodo: Dict[str, Set[Tuple[str, str]]] = defaultdict(set)
+        self._claves_por_categoria: Dict[str, Set[Tuple[str, str]]] = defaultdict(set)
+        self._version = None
+        self.lock = threading.RLock()
+
+    def _version_local(self):
+        try:
+            info = os.stat(self.ruta)
+            return info.st_mtime_ns, info.st_size
+        except OSError:
+            return None
+
+    def obtener(self) -> List[dict]:
+        with self.lock:
+            version = self._version_local()
+            if self._alertas is None or version != self._version:
+                self._alertas = self._leer()
+                self._indexar()
+                self._version = version
+            return self._alertas
+
+    def _leer(self) -> List[dict]:
+        if not os.path.exists(self.ruta):
+            return []
+        with open(self.ruta, "r", encoding="utf-8") as f:
+            # Un alertas.json de una versión anterior del esquema se migra al leerlo
+            return compactar(cargar_documento(json.load(f), "alertas"), Alerta)
+
+    def _indexar(self):
+        asegurar_ids(self._alertas)
+        self._posiciones = {a["id"]: posicion for posicion, a in enumerate(self._alertas)}
+        self._activas = {}
+        self._claves_por_periodo.clear()
+        self._claves_por_categoria.clear()
+        for alerta in sorted(self._alertas, key=lambda a: a.get("timestamp", "")):
+            self._registrar(alerta)
+
+    def _registrar(self, alerta: dict):
+        if alerta.get("status", 1) != 1:
+            return
+        clave = clave_alerta(alerta.get("categoria"), alerta.get("periodo"))
+        activas = self._activas.setdefault(clave, [])
+        # Casi siempre es la más reciente; si no, se ubica por timestamp (listas de 1 o 2 elementos)
+        posicion = len(activas)
+        while posicion and activas[posicion - 1].get("timestamp", "") > alerta.get("timestamp", ""):
+            posicion -= 1
+        activas.insert(posicion, alerta)
+        self._claves_por_periodo[clave[1]].add(clave)
+        self._claves_por_categoria[clave[0]].add(clave)
+
+    def _retirar(self, alerta: dict):
+        clave = clave_alerta(alerta.get("categoria"), alerta.get("periodo"))
+        activas = self._activas.get(clave)
+        if not activas:
+            return
+        activas[:] = [a for a in activas if a is not alerta]
+        if not activas:
+            del self._activas[clave]
+            self._claves_por_periodo[clave[1]].discard(clave)
+            self._claves_por_categoria[clave[0]].discard(clave)
+
+    def buscar_por_id(self, id_alerta: str) -> Optional[dict]:
+        with self.lock:
+            alertas = self.obtener()
+            posicion = self._posiciones.get(id_alerta)
+            return alertas[posicion] if posicion is not None else None
+
+    def activas(self, categoria, periodo) -> List[dict]:
+        """Alertas activas de la categoría y periodo, de la más antigua a la más reciente."""
+        with self.lock:
+            self.obtener()
+            return list(self._activas.get(clave_alerta(categoria, periodo), ()))
+
+    def activa(self, categoria, periodo) -> Optional[dict]:
+        """La alerta activa más reciente de la categoría y periodo, en O(1)."""
+        with self.lock:
+            self.obtener()
+            activas = self._activas.get(clave_alerta(categoria, periodo))
+            return activas[-1] if activas else None
+
+    def ultimas_activas(self, categoria=None, periodo=None) -> List[dict]:
+        """La alerta vigente de cada (categoría, periodo), opcionalmente filtrada, de la más nueva a la más antigua."""
+        with self.lock:
+            self.obtener()
+            if categoria and periodo:
+                claves = {clave_alerta(categoria, periodo)} & self._activas.keys()
+            elif periodo:
+                claves = self._claves_por_periodo.get(clave_alerta(None, periodo)[1], ())
+            elif categoria:
+                claves = self._claves_por_categoria.get(clave_alerta(categoria, None)[0], ())
+            else:
+                claves = self._activas.keys()
+            ultimas = [self._activas[clave][-1] for clave in claves]
+        return sorted(ultimas, key=lambda a: a.get("timestamp", ""), reverse=True)
+
+    def agregar(self, alerta: dict):
+        with self.lock:
+            alertas = self.obtener()
+            alerta = Alerta.desde(alerta)
+            self._posiciones[alerta["id"]] = len(alertas)
+            alertas.append(alerta)
+            self._registrar(alerta)
+
+    def modificar(self, alerta: dict, cambios: Dict[str, Any]):
+        """Aplica `cambios` a una alerta de esta copia y actualiza los índices en su lugar."""
+        with self.lock:
+            self._retirar(alerta)
+            alerta.update(cambios)
+            normalizar_alerta(alerta)
+            self._registrar(alerta)
+
+    def marcar_vigente(self):
+        with self.lock:
+            self._version = self._version_local()
+
+    def invalidar(self):
+        with self.lock:
+            self._alertas = None
+            self._posiciones = {}
+            self._activas = {}
+            self._claves_por_periodo.clear()
+            self._claves_por_categoria.clear()
+            self._version = None
+
+_stores = PorUsuario(lambda usuario: AlertStore(ruta_local(RUTA_ALERTAS, usuario)))
+
+def store_alertas() -> AlertStore:
+    """La copia en memoria de las alertas del usuario actual."""
+    return _stores.obtener()
+
+def _alertas_json() -> List[dict]:
+    inicializar_alertas()
+    return store_alertas().obtener()
+
+def _persistir_json(alertas: List[dict]):
+    """Escribe la copia en memoria (ya modificada) en alertas.json y encola la subida."""
+    store = store_alertas()
     try:
-        with open(RUTA_ALERTAS, "r", encoding="utf-8") as f:
-            contenido = f.read()
-
-        contenido_base64 = base64.b64encode(contenido.encode("utf-8")).decode("utf-8")
-        api_url = f"https://api.github.com/repos/{GITHUB_REPO}/contents/{ARCHIVO_ALERTAS}"
-
-        response_get = requests.get(api_url, headers={"Authorization": f"Bearer {GITHUB_TOKEN}"})
-        sha = response_get.json().get("sha") if response_get.status_code == 200 else None
-
-        payload = {
-            "message": "🟢 Actualización de alertas desde el bot",
-            "content": contenido_base64,
-            "branch": "main"
-        }
-        if sha:
-            payload["sha"] = sha
-
-        headers = {
-            "Authorization": f"Bearer {GITHUB_TOKEN}",
-            "Accept": "application/vnd.github+json"
-        }
-
-        response = requests.put(api_url, headers=headers, json=payload)
-        if response.status_code in [200, 201]:
-            print("[SYNC] alertas.json actualizado en GitHub.")
-        else:
-            print(f"[ERROR] GitHub ({response.status_code}):", response.text)
+        escribir_atomico(store.ruta, serializar(alertas))
+    except Exception:
+        # La copia en memoria tiene cambios que no llegaron al disco: se descarta
+        store.invalidar()
+        raise
+    store.marcar_vigente()
+    subir_a_github_alertas()
 
-    except Exception as e:
-        print(f"[ERROR] al subir alertas: {e}")
+def subir_a_github_alertas():
+    # 📬 Se encola: el outbox de github_sync agrupa las escrituras seguidas en una sola subida
+    encolar_subida(ruta_alertas(), archivo_alertas(), "🟢 Actualización de alertas desde el bot")
+
+# --- Backend SQLite ---
+def _importar_espejo_sqlite():
+    # Se vuelve a comprobar en el escritor: otra consulta pudo importarlo mientras esta esperaba
+    if almacen_sqlite.contar("alertas") == 0 and os.path.exists(ruta_alertas()):
+        almacen_sqlite.importar_desde_json(None, ruta_alertas())
+
+def _buscar_alertas_sqlite(categoria=None, periodo=None, filtrar_activos=True):
+    inicializar_alertas()
+    # 🆕 Tabla vacía (primer arranque): se llena con el espejo JSON
+    if almacen_sqlite.contar("alertas") == 0 and os.path.exists(ruta_alertas()):
+        escritor.ejecutar(_importar_espejo_sqlite)
+    return almacen_sqlite.buscar_alertas(categoria, periodo, filtrar_activos)
+
+def _subir_espejo_sqlite():
+    almacen_sqlite.exportar_a_json("alertas", ruta_alertas())
+    subir_a_github_alertas()
 
 def cargar_alertas(filtrar_activos=True):
-    if not os.path.exists(RUTA_ALERTAS):
-        return []
-    with open(RUTA_ALERTAS, "r", encoding="utf-8") as f:
-        data = json.load(f)
-    return [a for a in data if a.get("status", 1) == 1] if filtrar_activos else data
+    if MODO_ALERTAS == "sqlite":
+        return [a for _, a in _buscar_alertas_sqlite(filtrar_activos=filtrar_activos)]
 
-def guardar_alerta(alerta):
-    alertas = cargar_alertas(filtrar_activos=False)
+    # Copias: quien llama puede modificarlas sin alterar la copia en memoria
+    with store_alertas().lock:
+        return [dict(a) for a in _alertas_json() if not filtrar_activos or a.get("status", 1) == 1]
+
+# --- Mutaciones: corren en el escritor único (escritor.py), nunca dos a la vez ---
+def _antes_de_escribir(sincronizar: bool = False):
+    """
+    Lo que puede tocar la red (la inicialización del usuario y, si se pide, la descarga de
+    alertas.json) se hace en el hilo de quien escribe, antes de encolar: el escritor único solo
+    trabaja con la copia local y nunca espera a GitHub.
+    """
+    inicializar_alertas()
+    if sincronizar and MODO_ALERTAS != "sqlite":
+        # Con el lock, la descarga no se cruza con una escritura (que encola su subida antes de soltarlo)
+        with store_alertas().lock:
+            recuperar_alertas_desde_github()
+
+def _persistir_alertas_nuevas(nuevas: List[dict]) -> List[None]:
+    """Agrega un lote de alertas del usuario actual con una sola escritura."""
+    if MODO_ALERTAS == "sqlite":
+        # Si es la primera escritura, el espejo JSON se importa antes (después la tabla ya no está vacía)
+        inicializar_alertas()
+        _importar_espejo_sqlite()
+        almacen_sqlite.insertar_alertas(nuevas)
+        _subir_espejo_sqlite()
+        return [None] * len(nuevas)
+
+    store = store_alertas()
+    with store.lock:
+        alertas = _alertas_json()
+        for alerta in nuevas:
+            store.agregar(alerta)
+        _persistir_json(alertas)
+    return [None] * len(nuevas)
+
+def _preparar_alerta(alerta: dict) -> dict:
+    alerta["id"] = nuevo_id()
     alerta["timestamp"] = datetime.now().isoformat()
     alerta["status"] = 1
-    alertas.append(alerta)
+    normalizar_alerta(alerta)
+    return alerta
 
-    with open(RUTA_ALERTAS, "w", encoding="utf-8") as f:
-        json.dump(alertas, f, ensure_ascii=False, indent=2)
+def guardar_alerta(alerta):
+    _antes_de_escribir()
+    escritor.ejecutar_en_lote(_persistir_alertas_nuevas, _preparar_alerta(alerta))
 
-    subir_a_github_alertas()
+@mutacion(antes=_antes_de_escribir)
+def desactivar_alertas(categoria: str, periodo: str) -> int:
+    """Desactiva todas las alertas activas de una categoría y periodo. Devuelve cuántas se desactivaron."""
+    ahora = datetime.now().isoformat()
 
-def eliminar_alerta_logicamente(condiciones):
-    recuperar_alertas_desde_github()
-    alertas = cargar_alertas(filtrar_activos=False)
-    modificada = False
-    for alerta in alertas:
-        if all(alerta.get(k) == v for k, v in condiciones.items()) and alerta.get("status", 1) == 1:
+    if MODO_ALERTAS == "sqlite":
+        activas = _buscar_alertas_sqlite(categoria, periodo)
+        for _, alerta in activas:
             alerta["status"] = 0
-            alerta["timestamp_modificacion"] = datetime.now().isoformat()
-            modificada = True
-            break
-    if modificada:
-        with open(RUTA_ALERTAS, "w", encoding="utf-8") as f:
-            json.dump(alertas, f, ensure_ascii=False, indent=2)
-        subir_a_github_alertas()
+            alerta["timestamp_modificacion"] = ahora
+        if activas:
+            almacen_sqlite.actualizar_alertas(activas)
+            _subir_espejo_sqlite()
+        return len(activas)
+
+    store = store_alertas()
+    with store.lock:
+        alertas = _alertas_json()
+        activas = store.activas(categoria, periodo)
+        for alerta in activas:
+            store.modificar(alerta, {"status": 0, "timestamp_modificacion": ahora})
+
+        if activas:
+            _persistir_json(alertas)
+    return len(activas)
 
-def guardar_todas_las_alertas(nuevas_alertas):
-    ahora = datetime.now()
-    alertas = cargar_alertas(filtrar_activos=False)
+def eliminar_alerta_logicamente(condiciones):
+    _antes_de_escribir(sincronizar=True)
+    escritor.ejecutar(_eliminar_alerta_logicamente, condiciones)
 
-    for alerta in alertas:
-        if alerta.get("status", 1) == 1:
-            alerta["status"] = 0
-            alerta["timestamp_modificacion"] = ahora.isoformat()
+def _eliminar_alerta_logicamente(condiciones):
+    if set(condiciones) == {"id"}:
+        eliminar_alerta_por_id(condiciones["id"])
+        return
 
-    for nueva in nuevas_alertas:
-        nueva_alerta = {
+    if MODO_ALERTAS == "sqlite":
+        candidatas = _buscar_alertas_sqlite(condiciones.get("categoria"), condiciones.get("periodo"))
+        for id_alerta, alerta in candidatas:
+            if all(alerta.get(k) == v for k, v in condiciones.items()):
+                alerta["status"] = 0
+                alerta["timestamp_modificacion"] = datetime.now().isoformat()
+                almacen_sqlite.actualizar_alertas([(id_alerta, alerta)])
+                _subir_espejo_sqlite()
+                break
+        return
+
+    store = store_alertas()
+    with store.lock:
+        alertas = _alertas_json()
+        for alerta in alertas:
+            if all(alerta.get(k) == v for k, v in condiciones.items()) and alerta.get("status", 1) == 1:
+                store.modificar(alerta, {"status": 0, "timestamp_modificacion": datetime.now().isoformat()})
+                _persistir_json(alertas)
+                break
+
+@mutacion(antes=_antes_de_escribir)
+def guardar_todas_las_alertas(nuevas_alertas):
+    ahora = datetime.now()
+    reemplazos = [
+        normalizar_alerta({
+            "id": nuevo_id(ahora),
             "categoria": nueva["categoria"],
             "monto": nueva["monto"],
             "periodo": nueva["periodo"],
             "status": 1,
             "timestamp": ahora.isoformat()
-        }
-        alertas.append(nueva_alerta)
+        })
+        for nueva in nuevas_alertas
+    ]
 
-    with open(RUTA_ALERTAS, "w", encoding="utf-8") as f:
-        json.dump(alertas, f, ensure_ascii=False, indent=2)
+    if MODO_ALERTAS == "sqlite":
+        activas = _buscar_alertas_sqlite()
+        for _, alerta in activas:
+            alerta["status"] = 0
+            alerta["timestamp_modificacion"] = ahora.isoformat()
+        almacen_sqlite.actualizar_alertas(activas)
+        almacen_sqlite.insertar_alertas(reemplazos)
+        _subir_espejo_sqlite()
+        return
 
-    subir_a_github_alertas()
+    store = store_alertas()
+    with store.lock:
+        alertas = _alertas_json()
+
+        for alerta in store.ultimas_activas():
+            for activa in store.activas(alerta.get("categoria"), alerta.get("periodo")):
+                store.modificar(activa, {"status": 0, "timestamp_modificacion": ahora.isoformat()})
+
+        for reemplazo in reemplazos:
+            store.agregar(reemplazo)
 
+        _persistir_json(alertas)
+
+@mutacion(antes=_antes_de_escribir)
 def actualizar_alerta_existente(condiciones: Dict[str, str], nueva_alerta: Dict[str, Any]) -> bool:
     ahora = datetime.now().isoformat()
-    alertas = cargar_alertas(filtrar_activos=False)
-    modificada = False
-
-    for alerta in alertas:
-        if (
-            alerta.get("categoria", "").lower() == condiciones["categoria"].lower()
-            and alerta.get("periodo", "").lower() == condiciones["periodo"].lower()
-            and alerta.get("status", 1) == 1
-        ):
+
+    if MODO_ALERTAS == "sqlite":
+        activas = _buscar_alertas_sqlite(condiciones["categoria"], condiciones["periodo"])
+        if not activas:
+            return False
+        for _, alerta in activas:
             alerta["status"] = 0
             alerta["timestamp_modificacion"] = ahora
-            modificada = True
-
-    if modificada:
+        nueva_alerta["id"] = nuevo_id()
         nueva_alerta["status"] = 1
         nueva_alerta["timestamp"] = ahora
-        alertas.append(nueva_alerta)
-
-        with open(RUTA_ALERTAS, "w", encoding="utf-8") as f:
-            json.dump(alertas, f, ensure_ascii=False, indent=2)
-
-        subir_a_github_alertas()
+        normalizar_alerta(nueva_alerta)
+        almacen_sqlite.actualizar_alertas(activas)
+        almacen_sqlite.insertar_alertas([nueva_alerta])
+        _subir_espejo_sqlite()
+        return True
+
+    store = store_alertas()
+    with store.lock:
+        alertas = _alertas_json()
+        activas = store.activas(condiciones["categoria"], condiciones["periodo"])
+        for alerta in activas:
+            store.modificar(alerta, {"status": 0, "timestamp_modificacion": ahora})
+        modificada = bool(activas)
+
+        if modificada:
+            nueva_alerta["id"] = nuevo_id()
+            nueva_alerta["status"] = 1
+            nueva_alerta["timestamp"] = ahora
+            normalizar_alerta(nueva_alerta)
+            store.agregar(nueva_alerta)
+            _persistir_json(alertas)
 
     return modificada
 
+@mutacion(antes=_antes_de_escribir)
 def modificar_alerta(condiciones: Dict[str, Any], nuevos_valores: Dict[str, Any]) -> bool:
     """
     Modifica una alerta existente activa según las condiciones dadas.
     """
     ahora = datetime.now().isoformat()
 
-    # 🔁 Leer directamente del archivo para evitar trabajar con memoria cacheada
-    if not os.path.exists(RUTA_ALERTAS):
-        return False
-    with open(RUTA_ALERTAS, "r", encoding="utf-8") as f:
-        alertas = json.load(f)
-
-    modificada = False
-    for alerta in alertas:
-        if (
-            alerta.get("categoria", "").lower() == condiciones.get("categoria", "").lower()
-            and alerta.get("periodo", "").lower() == condiciones.get("periodo", "").lower()
-            and alerta.get("status", 1) == 1
-        ):
-            alerta.update(nuevos_valores)
-            alerta["timestamp_modificacion"] = ahora
-            modificada = True
-            break
-
-    if modificada:
-        with open(RUTA_ALERTAS, "w", encoding="utf-8") as f:
-            json.dump(alertas, f, ensure_ascii=False, indent=2)
-
-        subir_a_github_alertas()
+    if MODO_ALERTAS == "sqlite":
+        activas = _buscar_alertas_sqlite(condiciones.get("categoria", ""), condiciones.get("periodo", ""))
+        if not activas:
+            return False
+        id_alerta, alerta = activas[0]
+        alerta.update(nuevos_valores)
+        alerta["timestamp_modificacion"] = ahora
+        normalizar_alerta(alerta)
+        almacen_sqlite.actualizar_alertas([(id_alerta, alerta)])
+        _subir_espejo_sqlite()
+        return True
+
+    # 🔁 La copia en memoria se relee sola si alertas.json cambió en disco
+    store = store_alertas()
+    with store.lock:
+        alertas = _alertas_json()
+        activas = store.activas(condiciones.get("categoria"), condiciones.get("periodo"))
+        if not activas:
+            return False
+        store.modificar(activas[-1], dict(nuevos_valores, timestamp_modificacion=ahora))
+        _persistir_json(alertas)
+    return True
+
+# --- Acceso por id (O(1) en la copia en memoria; por índice único en SQLite) ---
+def buscar_alerta_por_id(id_alerta: str) -> Optional[Dict[str, Any]]:
+    if not id_alerta:
+        return None
+    if MODO_ALERTAS == "sqlite":
+        inicializar_alertas()
+        encontrada = almacen_sqlite.buscar_alerta_por_uid(id_alerta)
+        return encontrada[1] if encontrada else None
+
+    store = store_alertas()
+    with store.lock:
+        inicializar_alertas()
+        alerta = store.buscar_por_id(id_alerta)
+        return dict(alerta) if alerta else None
+
+@mutacion(antes=_antes_de_escribir)
+def modificar_alerta_por_id(id_alerta: str, nuevos_valores: Dict[str, Any]) -> bool:
+    """Aplica `nuevos_valores` a la alerta activa con ese id. Devuelve False si no existe o no está activa."""
+    ahora = datetime.now().isoformat()
 
-    return modificada
+    if MODO_ALERTAS == "sqlite":
+        inicializar_alertas()
+        encontrada = almacen_sqlite.buscar_alerta_por_uid(id_alerta)
+        if not encontrada or encontrada[1].get("status", 1) != 1:
+            return False
+        fila, alerta = encontrada
+        alerta.update(nuevos_valores)
+        alerta["timestamp_modificacion"] = ahora
+        normalizar_alerta(alerta)
+        almacen_sqlite.actualizar_alertas([(fila, alerta)])
+        _subir_espejo_sqlite()
+        return True
+
+    store = store_alertas()
+    with store.lock:
+        alertas = _alertas_json()
+        alerta = store.buscar_por_id(id_alerta)
+        if alerta is None or alerta.get("status", 1) != 1:
+            return False
+        store.modificar(alerta, dict(nuevos_valores, timestamp_modificacion=ahora))
+        _persistir_json(alertas)
+    return True
+
+# --- Búsqueda por (categoría, periodo) ---
+def _ultimas_por_clave(alertas) -> List[dict]:
+    ultimas = {}
+    for alerta in sorted(alertas, key=lambda a: a.get("timestamp", "")):
+        ultimas[clave_alerta(alerta.get("categoria"), alerta.get("periodo"))] = alerta
+    return sorted(ultimas.values(), key=lambda a: a.get("timestamp", ""), reverse=True)
+
+def buscar_alerta_activa(categoria: str, periodo: str) -> Optional[Dict[str, Any]]:
+    """La alerta activa más reciente para la categoría y periodo (sin distinguir mayúsculas), o None."""
+    if MODO_ALERTAS == "sqlite":
+        ultimas = _ultimas_por_clave(a for _, a in _buscar_alertas_sqlite(categoria, periodo))
+        return ultimas[0] if ultimas else None
+
+    store = store_alertas()
+    with store.lock:
+        inicializar_alertas()
+        alerta = store.activa(categoria, periodo)
+        return dict(alerta) if alerta else None
+
+def listar_alertas_activas(categoria: Optional[str] = None, periodo: Optional[str] = None) -> List[Dict[str, Any]]:
+    """La alerta vigente de cada (categoría, periodo), filtrable por ambos, de la más nueva a la más antigua."""
+    if MODO_ALERTAS == "sqlite":
+        return _ultimas_por_clave(a for _, a in _buscar_alertas_sqlite(categoria, periodo))
+
+    store = store_alertas()
+    with store.lock:
+        inicializar_alertas()
+        return [dict(a) for a in store.ultimas_activas(categoria, periodo)]
+
+def eliminar_alerta_por_id(id_alerta: str) -> bool:
+    return modificar_alerta_por_id(id_alerta, {"status": 0})
+
+@mutacion(antes=_antes_de_escribir)
+def reemplazar_alerta_por_id(id_alerta: str, nueva_alerta: Dict[str, Any]) -> bool:
+    """
+    Desactiva la alerta activa con ese id y registra `nueva_alerta` en su lugar, como una sola
+    mutación. Devuelve False (sin registrar nada) si la alerta ya no está activa o no existe.
+    """
+    _preparar_alerta(nueva_alerta)
+    ahora = nueva_alerta["timestamp"]
+
+    if MODO_ALERTAS == "sqlite":
+        encontrada = almacen_sqlite.buscar_alerta_por_uid(id_alerta)
+        if not encontrada or encontrada[1].get("status", 1) != 1:
+            return False
+        fila, alerta = encontrada
+        alerta["status"] = 0
+        alerta["timestamp_modificacion"] = ahora
+        almacen_sqlite.actualizar_alertas([(fila, alerta)])
+        almacen_sqlite.insertar_alertas([nueva_alerta])
+        _subir_espejo_sqlite()
+        return True
+
+    store = store_alertas()
+    with store.lock:
+        alertas = _alertas_json()
+        alerta = store.buscar_por_id(id_alerta)
+        if alerta is None or alerta.get("status", 1) != 1:
+            return False
+        store.modificar(alerta, {"status": 0, "timestamp_modificacion": ahora})
+        store.agregar(nueva_alerta)
+        _persistir_json(alertas)
+    return True
+
+# --- Fusión con GitHub (varias réplicas) ---
+def _incorporar_remotas(contenido_remoto: str) -> str:
+    """
+    Incorpora las alertas de la versión remota de alertas.json que faltan o cambiaron localmente
+    y devuelve el contenido a subir en su lugar.
+    """
+    remotas = compactar(cargar_documento(json.loads(contenido_remoto), "alertas"), Alerta)
+    asegurar_ids(remotas)
+
+    if MODO_ALERTAS == "sqlite":
+        inicializar_alertas()
+        _importar_espejo_sqlite()
+        filas = {}
+
+        def buscar(uid):
+            encontrada = almacen_sqlite.buscar_alerta_por_uid(uid)
+            if encontrada is None:
+                return None
+            filas[uid] = encontrada[0]
+            return encontrada[1]
+
+        nuevas, cambios = diferencias_por_id(buscar, remotas)
+        if nuevas:
+            almacen_sqlite.insertar_alertas(nuevas)
+        if cambios:
+            almacen_sqlite.actualizar_alertas([(filas[local["id"]], dict(remota)) for local, remota in cambios])
+        almacen_sqlite.exportar_a_json("alertas", ruta_alertas())
+    else:
+        store = store_alertas()
+        with store.lock:
+            alertas = _alertas_json()
+            nuevas, cambios = diferencias_por_id(store.buscar_por_id, remotas)
+            for alerta in nuevas:
+                store.agregar(alerta)
+            for local, remota in cambios:
+                store.modificar(local, dict(remota))
+            if nuevas or cambios:
+                try:
+                    escribir_atomico(store.ruta, serializar(alertas))
+                except Exception:
+                    store.invalidar()
+                    raise
+                store.marcar_vigente()
+
+    if nuevas or cambios:
+        print(f"[INFO] Fusión con GitHub: {len(nuevas)} alertas nuevas y {len(cambios)} actualizadas")
+    with open(ruta_alertas(), "r", encoding="utf-8") as f:
+        return f.read()
+
+registrar_fusionador(lambda ruta: ruta == ARCHIVO_ALERTAS, lambda ruta, local, remoto: escritor.ejecutar(_incorporar_remotas, remoto))
+
+# --- Variantes asíncronas (acciones `async def run`) ---
+async def cargar_alertas_async(filtrar_activos=True):
+    return await en_hilo(cargar_alertas, filtrar_activos)
+
+async def buscar_alerta_activa_async(categoria: str, periodo: str) -> Optional[Dict[str, Any]]:
+    return await en_hilo(buscar_alerta_activa, categoria, periodo)
+
+async def listar_alertas_activas_async(categoria: Optional[str] = None, periodo: Optional[str] = None) -> List[Dict[str, Any]]:
+    return await en_hilo(listar_alertas_activas, categoria, periodo)
+
+async def recuperar_alertas_desde_github_async():
+    return await en_hilo(recuperar_alertas_desde_github)
+
+# Las escrituras esperan al escritor único sin ocupar un hilo del pool
+async def _mutar_async(funcion, *args, sincronizar: bool = False):
+    await en_hilo(_antes_de_escribir, sincronizar)
+    return await escritor.ejecutar_async(funcion, *args)
+
+async def guardar_alerta_async(alerta):
+    await en_hilo(_antes_de_escribir)
+    await escritor.ejecutar_en_lote_async(_persistir_alertas_nuevas, _preparar_alerta(alerta))
+
+async def desactivar_alertas_async(categoria: str, periodo: str) -> int:
+    return await _mutar_async(desactivar_alertas.__wrapped__, categoria, periodo)
+
+async def eliminar_alerta_logicamente_async(condiciones):
+    return await _mutar_async(_eliminar_alerta_logicamente, condiciones, sincronizar=True)
+
+async def modificar_alerta_por_id_async(id_alerta: str, nuevos_valores: Dict[str, Any]) -> bool:
+    return await _mutar_async(modificar_alerta_por_id.__wrapped__, id_alerta, nuevos_valores)
+
+async def reemplazar_alerta_por_id_async(id_alerta: str, nueva_alerta: Dict[str, Any]) -> bool:
+    return await _mutar_async(reemplazar_alerta_por_id.__wrapped__, id_alerta, nueva_alerta)
@@ -0,0 +1,330 @@
+# actions/almacen_sqlite.py
+# Backend SQLite opcional para transacciones y alertas (TRANSACCIONES_MODO=sqlite / ALERTAS_MODO=sqlite).
+#
+# Cada registro se guarda completo en la columna `datos` (JSON) y, además, en columnas
+# normalizadas (minúsculas, año entero) indexadas para que los filtros por mes, categoría,
+# medio o estado sean búsquedas por índice y no recorridos en Python.
+# Cada usuario tiene su propia base (ver usuarios.py); RUTA_SQLITE es la del usuario legado.
+
+import argparse
+import json
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from esquema import VERSION_ESQUEMA, leer_archivo, normalizar_alerta, normalizar_transaccion, serializar
+from identificadores import asegurar_ids
+from registros import serializable
+from usuarios import como_usuario, ruta_local
+
+RUTA_SQLITE = os.getenv("SQLITE_RUTA", "/tmp/finanzas.db")
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS transacciones (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    uid TEXT,
+    tipo TEXT,
+    categoria TEXT,
+    medio TEXT,
+    mes TEXT,
+    anio INTEGER,
+    monto REAL,
+    status INTEGER NOT NULL DEFAULT 1,
+    datos TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_transacciones_filtros
+    ON transacciones (anio, mes, tipo, categoria, medio, status);
+CREATE INDEX IF NOT EXISTS idx_transacciones_categoria ON transacciones (categoria, status);
+CREATE INDEX IF NOT EXISTS idx_transacciones_medio ON transacciones (medio, status);
+
+CREATE TABLE IF NOT EXISTS alertas (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    uid TEXT,
+    categoria TEXT,
+    periodo TEXT,
+    status INTEGER NOT NULL DEFAULT 1,
+    datos TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_alertas_activas ON alertas (categoria, periodo, status);
+"""
+
+_local = threading.local()
+
+def ruta_sqlite(usuario: Optional[str] = None) -> str:
+    return ruta_local(RUTA_SQLITE, usuario)
+
+def conectar() -> sqlite3.Connection:
+    """
+    Una conexión por hilo y por base (la del usuario actual); sqlite3 no permite
+    compartirlas entre hilos por defecto.
+    """
+    conexiones = getattr(_local, "conexiones", None)
+    if conexiones is None:
+        conexiones = _local.conexiones = {}
+    ruta = ruta_sqlite()
+    conn = conexiones.get(ruta)
+    if conn is None:
+        conn = sqlite3.connect(ruta, timeout=10)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(ESQUEMA)
+        _migrar_esquema(conn)
+        conexiones[ruta] = conn
+    return conn
+
+def _migrar_esquema(conn: sqlite3.Connection):
+    """
+    Pone al día bases creadas con versiones anteriores: normaliza los registros de `datos`
+    al esquema actual y agrega la columna uid (ids estables) a ambas tablas, completándola
+    desde `datos`. Las transacciones de bases antiguas se identificaban por su timestamp
+    (`clave UNIQUE`); esa columna queda vacía para que dos registros con el mismo timestamp
+    puedan convivir.
+    """
+    with conn:
+        for tabla in ("transacciones", "alertas"):
+            if "uid" not in {fila[1] for fila in conn.execute(f"PRAGMA table_info({tabla})")}:
+                conn.execute(f"ALTER TABLE {tabla} ADD COLUMN uid TEXT")
+                if tabla == "transacciones":
+                    conn.execute("UPDATE transacciones SET clave = NULL")
+
+        # `user_version` guarda la versión del esquema de los registros en `datos`
+        if conn.execute("PRAGMA user_version").fetchone()[0] < VERSION_ESQUEMA:
+            for tabla, normalizar, fila in (
+                ("transacciones", normalizar_transaccion, _fila_transaccion),
+                ("alertas", normalizar_alerta, _fila_alerta),
+            ):
+                registros = [(f[0], normalizar(json.loads(f[1]))) for f in conn.execute(f"SELECT id, datos FROM {tabla}")]
+                conn.executemany(
+                    f"UPDATE {tabla} SET {', '.join(c + ' = ?' for c in _COLUMNAS[tabla])} WHERE id = ?",
+                    [fila(r) + (id_fila,) for id_fila, r in registros]
+                )
+            conn.execute(f"PRAGMA user_version = {VERSION_ESQUEMA}")
+
+        for tabla in ("transacciones", "alertas"):
+            pendientes = [(fila[0], json.loads(fila[1])) for fila in conn.execute(f"SELECT id, datos FROM {tabla} WHERE uid IS NULL")]
+            if pendientes:
+                # Los ids ya asignados cuentan: un id derivado no puede repetir el de otra fila
+                existentes = [{"id": fila[0]} for fila in conn.execute(f"SELECT uid FROM {tabla} WHERE uid IS NOT NULL")]
+                asegurar_ids(existentes + [r for _, r in pendientes])
+                conn.executemany(
+                    f"UPDATE {tabla} SET uid = ?, datos = ? WHERE id = ?",
+                    [(r["id"], json.dumps(r, ensure_ascii=False), id_fila) for id_fila, r in pendientes]
+                )
+        conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_transacciones_uid ON transacciones (uid)")
+        conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_alertas_uid ON alertas (uid)")
+
+def rutas_version(usuario: Optional[str] = None) -> Tuple[str, str]:
+    # En modo WAL cada commit modifica el archivo -wal aunque la base principal no cambie
+    ruta = ruta_sqlite(usuario)
+    return (ruta, ruta + "-wal")
+
+def _texto(valor) -> str:
+    return str(valor or "").strip().lower()
+
+def contar(tabla: str) -> int:
+    assert tabla in ("transacciones", "alertas")
+    return conectar().execute(f"SELECT COUNT(*) FROM {tabla}").fetchone()[0]
+
+# Columnas que escriben _fila_transaccion y _fila_alerta, en ese orden
+_COLUMNAS = {
+    "transacciones": ("uid", "tipo", "categoria", "medio", "mes", "anio", "monto", "status", "datos"),
+    "alertas": ("uid", "categoria", "periodo", "status", "datos"),
+}
+
+# ---------- TRANSACCIONES ----------
+def _fila_transaccion(t: Dict[str, Any]) -> tuple:
+    return (
+        t.get("id"),
+        # Registro ya normalizado: las columnas son sus campos tal cual
+        t["tipo"],
+        t["categoria"],
+        t["medio"],
+        t["mes"],
+        t["año"] or None,
+        t["monto"],
+        t["status"],
+        json.dumps(t, ensure_ascii=False, default=serializable),
+    )
+
+def insertar_transacciones(transacciones: List[Dict[str, Any]]) -> int:
+    """Inserta ignorando las que ya existen (mismo id). Devuelve cuántas se agregaron."""
+    for t in transacciones:
+        normalizar_transaccion(t)
+    asegurar_ids(transacciones)
+    conn = conectar()
+    with conn:
+        antes = conn.total_changes
+        conn.executemany(
+            "INSERT OR IGNORE INTO transacciones "
+            "(uid, tipo, categoria, medio, mes, anio, monto, status, datos) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [_fila_transaccion(t) for t in transacciones]
+        )
+        return conn.total_changes - antes
+
+def actualizar_transacciones(transacciones: List[Dict[str, Any]]):
+    """Reescribe estado y datos de transacciones existentes, identificadas por su id."""
+    conn = conectar()
+    with conn:
+        conn.executemany(
+            "UPDATE transacciones SET status = ?, datos = ? WHERE uid = ?",
+            [
+                (t.get("status", 1), json.dumps(t, ensure_ascii=False, default=serializable), t.get("id"))
+                for t in transacciones
+            ]
+        )
+
+def asignar_ids_transacciones() -> int:
+    """Guarda en `datos` el id de las transacciones importadas antes de los ids estables."""
+    conn = conectar()
+    registros = [(fila[0], json.loads(fila[1])) for fila in conn.execute("SELECT id, datos FROM transacciones ORDER BY id")]
+    pendientes = [(id_fila, t) for id_fila, t in registros if not t.get("id")]
+    asegurar_ids(t for _, t in pendientes)
+    with conn:
+        conn.executemany(
+            "UPDATE transacciones SET uid = ?, datos = ? WHERE id = ?",
+            [(t["id"], json.dumps(t, ensure_ascii=False, default=serializable), id_fila) for id_fila, t in pendientes]
+        )
+    return len(pendientes)
+
+def buscar_transacciones(
+    tipo: Optional[str] = None,
+    categoria: Optional[str] = None,
+    medio: Optional[str] = None,
+    mes: Optional[str] = None,
+    anio: Optional[int] = None,
+    filtrar_activos: bool = True,
+) -> List[Dict[str, Any]]:
+    condiciones, parametros = [], []
+    for columna, valor in (("tipo", tipo), ("categoria", categoria), ("medio", medio), ("mes", mes)):
+        if valor:
+            condiciones.append(f"{columna} = ?")
+            parametros.append(_texto(valor))
+    if anio is not None:
+        condiciones.append("anio = ?")
+        parametros.append(int(anio))
+    if filtrar_activos:
+        condiciones.append("status = 1")
+
+    sql = "SELECT datos FROM transacciones"
+    if condiciones:
+        sql += " WHERE " + " AND ".join(condiciones)
+    sql += " ORDER BY id"
+    return [json.loads(fila[0]) for fila in conectar().execute(sql, parametros)]
+
+# ---------- ALERTAS ----------
+def _fila_alerta(a: Dict[str, Any]) -> tuple:
+    return (
+        a.get("id"),
+        a["categoria"],
+        a["periodo"],
+        a["status"],
+        json.dumps(a, ensure_ascii=False, default=serializable),
+    )
+
+def insertar_alertas(alertas: List[Dict[str, Any]]):
+    for a in alertas:
+        normalizar_alerta(a)
+    asegurar_ids(alertas)
+    conn = conectar()
+    with conn:
+        conn.executemany(
+            "INSERT INTO alertas (uid, categoria, periodo, status, datos) VALUES (?, ?, ?, ?, ?)",
+            [_fila_alerta(a) for a in alertas]
+        )
+
+def buscar_alertas(
+    categoria: Optional[str] = None,
+    periodo: Optional[str] = None,
+    filtrar_activos: bool = True,
+) -> List[Tuple[int, Dict[str, Any]]]:
+    """Devuelve pares (id, alerta) para poder actualizar después la fila exacta."""
+    condiciones, parametros = [], []
+    if categoria:
+        condiciones.append("categoria = ?")
+        parametros.append(_texto(categoria))
+    if periodo:
+        condiciones.append("periodo = ?")
+        parametros.append(_texto(periodo))
+    if filtrar_activos:
+        condiciones.append("status = 1")
+
+    sql = "SELECT id, datos FROM alertas"
+    if condiciones:
+        sql += " WHERE " + " AND ".join(condiciones)
+    sql += " ORDER BY id"
+    return [(fila[0], json.loads(fila[1])) for fila in conectar().execute(sql, parametros)]
+
+def buscar_alerta_por_uid(uid: str) -> Optional[Tuple[int, Dict[str, Any]]]:
+    fila = conectar().execute("SELECT id, datos FROM alertas WHERE uid = ?", (uid,)).fetchone()
+    return (fila[0], json.loads(fila[1])) if fila else None
+
+def actualizar_alertas(alertas: List[Tuple[int, Dict[str, Any]]]):
+    conn = conectar()
+    with conn:
+        conn.executemany(
+            "UPDATE alertas SET uid = ?, categoria = ?, periodo = ?, status = ?, datos = ? WHERE id = ?",
+            [_fila_alerta(a) + (id_alerta,) for id_alerta, a in alertas]
+        )
+
+# ---------- IMPORTACIÓN DESDE JSON ----------
+def _leer_lista_json(ruta: str, tipo: str) -> List[Dict[str, Any]]:
+    if not os.path.exists(ruta):
+        print(f"[WARN] No existe {ruta}. Nada que importar.")
+        return []
+    try:
+        return leer_archivo(ruta, tipo)
+    except ValueError as e:
+        print(f"[WARN] {ruta}: {e}")
+        return []
+
+def importar_desde_json(ruta_transacciones: Optional[str], ruta_alertas: Optional[str], forzar: bool = False) -> dict:
+    """
+    Importa una sola vez los JSON existentes. Si la tabla ya tiene datos no se toca,
+    salvo con `forzar`, que la vacía antes de importar.
+    """
+    conn = conectar()
+    resumen = {"transacciones": 0, "alertas": 0}
+
+    if ruta_transacciones:
+        if forzar:
+            with conn:
+                conn.execute("DELETE FROM transacciones")
+        if contar("transacciones") == 0:
+            resumen["transacciones"] = insertar_transacciones(_leer_lista_json(ruta_transacciones, "transacciones"))
+        else:
+            print("[INFO] La tabla transacciones ya tiene datos. Usa --forzar para reimportar.")
+
+    if ruta_alertas:
+        if forzar:
+            with conn:
+                conn.execute("DELETE FROM alertas")
+        if contar("alertas") == 0:
+            alertas = _leer_lista_json(ruta_alertas, "alertas")
+            insertar_alertas(alertas)
+            resumen["alertas"] = len(alertas)
+        else:
+            print("[INFO] La tabla alertas ya tiene datos. Usa --forzar para reimportar.")
+
+    print(f"[INFO] Importación a {ruta_sqlite()} completada: {resumen}")
+    return resumen
+
+def exportar_a_json(tabla: str, ruta: str):
+    """Vuelca la tabla completa (activos e inactivos) a un JSON con el esquema versionado."""
+    assert tabla in ("transacciones", "alertas")
+    registros = [json.loads(fila[0]) for fila in conectar().execute(f"SELECT datos FROM {tabla} ORDER BY id")]
+    ruta_temporal = ruta + ".tmp"
+    with open(ruta_temporal, "w", encoding="utf-8") as f:
+        f.write(serializar(registros))
+    os.replace(ruta_temporal, ruta)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Importa transacciones.json y alertas.json a SQLite.")
+    parser.add_argument("--transacciones", default="/tmp/transacciones.json")
+    parser.add_argument("--alertas", default="/tmp/alertas.json")
+    parser.add_argument("--forzar", action="store_true", help="Vacía las tablas antes de importar")
+    parser.add_argument("--usuario", help="sender_id cuya base se llena (por defecto, la del usuario legado)")
+    args = parser.parse_args()
+    with como_usuario(args.usuario):
+        importar_desde_json(args.transacciones, args.alertas, forzar=args.forzar)
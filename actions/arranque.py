@@ -0,0 +1,105 @@
+# actions/arranque.py
+# Arranque del servidor de acciones: precalentamiento en segundo plano y reporte de importación.
+#
+# Importar los módulos de acciones no hace E/S. Cuando el servidor ya escucha en su puerto,
+# un hilo en segundo plano sincroniza con GitHub, carga transacciones y alertas en memoria y
+# arranca el envío periódico de los logs, de modo que la primera conversación no paga ese costo
+# y un GitHub lento no retrasa el arranque.
+#
+# Reporte del costo de importación por módulo:
+#   python arranque.py --reporte
+
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from collections import defaultdict
+
+PUERTO_ACCIONES = int(os.getenv("ACTIONS_PORT", "5055"))
+# Segundos máximos esperando a que el servidor abra el puerto antes de precalentar igualmente
+ESPERA_MAXIMA_PUERTO = float(os.getenv("ACTIONS_ESPERA_PUERTO", "120"))
+
+_precalentamiento_iniciado = False
+
+def _puerto_abierto(puerto: int) -> bool:
+    try:
+        with socket.create_connection(("127.0.0.1", puerto), timeout=0.5):
+            return True
+    except OSError:
+        return False
+
+def _precalentar():
+    limite = time.monotonic() + ESPERA_MAXIMA_PUERTO
+    while not _puerto_abierto(PUERTO_ACCIONES) and time.monotonic() < limite:
+        time.sleep(0.5)
+
+    # Importación diferida: este módulo no debe arrastrar dependencias al importarse
+    from envio_logs import configurar_log
+    from transacciones_io import precalentar as precalentar_transacciones
+    from alertas_io import inicializar_alertas
+
+    # 📝 El log de github_sync se abre aquí (o en su primer uso), no al importar las acciones
+    configurar_log()
+
+    for tarea in (precalentar_transacciones, inicializar_alertas):
+        try:
+            tarea()
+        except Exception as e:
+            print(f"[WARN] Falló el precalentamiento ({tarea.__name__}): {e}")
+
+    # 📝 Los logs se envían a GitHub desde su propio hilo, nunca desde las subidas de datos
+    from envio_logs import iniciar_envio_logs
+    iniciar_envio_logs()
+
+def precalentar_en_segundo_plano():
+    """Lanza (una sola vez) el precalentamiento, que espera a que el puerto del servidor esté abierto."""
+    global _precalentamiento_iniciado
+    if _precalentamiento_iniciado:
+        return
+    _precalentamiento_iniciado = True
+    threading.Thread(target=_precalentar, name="precalentamiento", daemon=True).start()
+
+# ---------- REPORTE DE IMPORTACIÓN ----------
+def reporte_importacion(modulo: str = "actions", top: int = 15):
+    """Importa `modulo` en un proceso nuevo con -X importtime y agrupa el costo por paquete raíz."""
+    proceso = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {modulo}"],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True,
+        text=True,
+    )
+    costos = defaultdict(int)
+    for linea in proceso.stderr.splitlines():
+        # Formato: "import time: self [us] | cumulative | imported package"
+        if not linea.startswith("import time:") or "imported package" in linea:
+            continue
+        partes = linea[len("import time:"):].split("|")
+        if len(partes) != 3:
+            continue
+        try:
+            propio_us = int(partes[0])
+        except ValueError:
+            continue
+        costos[partes[2].strip().split(".")[0]] += propio_us
+
+    if proceso.returncode != 0:
+        print(f"[WARN] La importación de {modulo} terminó con error:\n{proceso.stderr.splitlines()[-1]}")
+
+    total = sum(costos.values()) or 1
+    print(f"Costo de importación de '{modulo}': {total / 1000:.1f} ms")
+    for nombre, costo in sorted(costos.items(), key=lambda x: x[1], reverse=True)[:top]:
+        print(f"  {nombre:<30} {costo / 1000:>8.1f} ms  ({costo / total:.0%})")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Herramientas de arranque del servidor de acciones.")
+    parser.add_argument("--reporte", action="store_true", help="Muestra el costo de importación por módulo")
+    parser.add_argument("--modulo", default="actions")
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+    if args.reporte:
+        reporte_importacion(args.modulo, args.top)
+    else:
+        parser.print_help()
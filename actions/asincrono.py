@@ -0,0 +1,22 @@
+# actions/asincrono.py
+# Ejecuta funciones bloqueantes (disco, SQLite, GitHub) en un pool de hilos para que las
+# acciones `async def run` no detengan el event loop del servidor de acciones.
+#
+# Mientras una conversación espera a GitHub, el servidor sigue atendiendo a las demás.
+# La función corre con el contexto de quien la llama (entre otras cosas, el usuario actual; ver usuarios.py).
+
+import asyncio
+import contextvars
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+HILOS_IO = int(os.getenv("ACCIONES_HILOS_IO", "8"))
+
+_ejecutor = ThreadPoolExecutor(max_workers=HILOS_IO, thread_name_prefix="acciones-io")
+
+async def en_hilo(funcion, *args, **kwargs):
+    """Ejecuta `funcion(*args, **kwargs)` en el pool de E/S y espera su resultado sin bloquear."""
+    loop = asyncio.get_running_loop()
+    contexto = contextvars.copy_context()
+    return await loop.run_in_executor(_ejecutor, functools.partial(contexto.run, funcion, *args, **kwargs))
@@ -0,0 +1,101 @@
+# actions/cliente_http.py
+# Sesión HTTP compartida para todo el tráfico saliente (API de GitHub, raw.githubusercontent y Rasa).
+#
+# Una sola `requests.Session` mantiene las conexiones abiertas (keep-alive) y las reutiliza,
+# así cada llamada no paga otra vez el handshake TCP + TLS. Además aplica un timeout por
+# defecto y reintentos con backoff ante errores transitorios.
+
+import os
+import threading
+from typing import Dict
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Segundos para conectar y para esperar la respuesta, si la llamada no indica otro timeout
+TIMEOUT_CONEXION = float(os.getenv("HTTP_TIMEOUT_CONEXION", "5"))
+TIMEOUT_LECTURA = float(os.getenv("HTTP_TIMEOUT_LECTURA", "15"))
+# Conexiones que se conservan abiertas por host
+POOL_POR_HOST = int(os.getenv("HTTP_POOL_POR_HOST", "10"))
+# Reintentos ante fallos de conexión y respuestas 429/5xx (solo métodos idempotentes)
+REINTENTOS = int(os.getenv("HTTP_REINTENTOS", "3"))
+# Con GitHub solo se reintentan aquí los fallos de conexión: los 403/429/5xx los reintenta el
+# planificador de github_sync, que conoce el presupuesto de la API (y así no se reintenta dos veces)
+HOSTS_GITHUB = ("https://api.github.com", "https://raw.githubusercontent.com")
+
+_sesion = None
+_lock_sesion = threading.Lock()
+
+class SesionHTTP(requests.Session):
+    """`requests.Session` con timeout por defecto; ninguna llamada queda colgada indefinidamente."""
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", (TIMEOUT_CONEXION, TIMEOUT_LECTURA))
+        return super().request(method, url, **kwargs)
+
+def _crear_sesion() -> SesionHTTP:
+    reintentos = Retry(
+        total=REINTENTOS,
+        backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adaptador = HTTPAdapter(pool_connections=POOL_POR_HOST, pool_maxsize=POOL_POR_HOST, max_retries=reintentos)
+    sesion = SesionHTTP()
+    sesion.mount("https://", adaptador)
+    sesion.mount("http://", adaptador)
+
+    reintentos_github = Retry(
+        total=REINTENTOS,
+        backoff_factor=0.5,
+        status_forcelist=(),
+        respect_retry_after_header=False,
+        raise_on_status=False,
+    )
+    adaptador_github = HTTPAdapter(pool_connections=POOL_POR_HOST, pool_maxsize=POOL_POR_HOST, max_retries=reintentos_github)
+    for host in HOSTS_GITHUB:
+        sesion.mount(host, adaptador_github)
+    return sesion
+
+def obtener_sesion() -> SesionHTTP:
+    global _sesion
+    if _sesion is None:
+        with _lock_sesion:
+            if _sesion is None:
+                _sesion = _crear_sesion()
+    return _sesion
+
+def estadisticas_pool() -> Dict[str, dict]:
+    """
+    Por host: peticiones hechas, conexiones abiertas y cuántas peticiones reutilizaron
+    una conexión existente (sin handshake nuevo).
+    """
+    if _sesion is None:
+        return {}
+
+    estadisticas = {}
+    for adaptador in set(_sesion.adapters.values()):
+        pools = adaptador.poolmanager.pools
+        for clave in list(pools.keys()):
+            pool = pools.get(clave)
+            if pool is None:
+                continue
+            host = f"{pool.scheme}://{pool.host}:{pool.port}"
+            peticiones = pool.num_requests
+            conexiones = pool.num_connections
+            estadisticas[host] = {
+                "peticiones": peticiones,
+                "conexiones_nuevas": conexiones,
+                "reutilizadas": max(peticiones - conexiones, 0),
+                "tasa_reutilizacion": round((peticiones - conexiones) / peticiones, 3) if peticiones else 0.0,
+            }
+    return estadisticas
+
+if __name__ == "__main__":
+    # Diagnóstico rápido: varias peticiones al mismo host deberían abrir una sola conexión
+    sesion = obtener_sesion()
+    for _ in range(3):
+        sesion.get("https://api.github.com/rate_limit")
+    print(estadisticas_pool())
@@ -0,0 +1,194 @@
+# actions/columnas.py
+# Vista columnar (NumPy) de las transacciones en memoria para las consultas analíticas.
+#
+# Cada campo es un arreglo: montos en float64, fecha y hora de registro como enteros, y
+# año, mes, tipo, categoría y medio codificados como enteros contra un diccionario de valores.
+# Filtrar es combinar máscaras booleanas (sobre todas las filas o solo sobre las posiciones que
+# ya acotó el índice por fecha del TransactionStore), agrupar es una suma por código (np.unique + bincount)
+# y los k primeros salen de np.argpartition, sin recorrer diccionarios en Python.
+#
+# La vista acompaña a la lista de registros del TransactionStore: las altas (que solo se agregan
+# al final) se incorporan al consultarla y las bajas lógicas se marcan por posición.
+
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from resumenes import DIMENSIONES
+
+# Campos por los que se puede ordenar en la vista; el resto se ordena en Python
+CAMPOS_ORDEN = ("fecha", "monto", "timestamp")
+
+_CAPACIDAD_INICIAL = 1024
+_EPOCA = datetime(1970, 1, 1)
+_UN_MICROSEGUNDO = timedelta(microseconds=1)
+
+def _marca(timestamp) -> int:
+    """Microsegundos desde 1970 del timestamp ISO (0 si falta o no es válido)."""
+    try:
+        fecha = datetime.fromisoformat(str(timestamp))
+    except (TypeError, ValueError):
+        return 0
+    return (fecha.replace(tzinfo=None) - _EPOCA) // _UN_MICROSEGUNDO
+
+class MarcoColumnar:
+    def __init__(self, registros: List[dict]):
+        self.registros = registros
+        self._n = 0
+        self._codigos: Dict[str, Dict[Any, int]] = {dim: {} for dim in DIMENSIONES}
+        self._valores: Dict[str, List[Any]] = {dim: [] for dim in DIMENSIONES}
+        self._columnas: Dict[str, np.ndarray] = {
+            "monto": np.empty(0, dtype=np.float64),
+            "status": np.empty(0, dtype=np.int8),
+            "fecha": np.empty(0, dtype=np.int64),
+            "timestamp": np.empty(0, dtype=np.int64),
+            **{dim: np.empty(0, dtype=np.int32) for dim in DIMENSIONES},
+        }
+        self.sincronizar()
+
+    def __len__(self) -> int:
+        return self._n
+
+    def columna(self, nombre: str) -> np.ndarray:
+        return self._columnas[nombre][:self._n]
+
+    # ---------- CONSTRUCCIÓN ----------
+    def sincronizar(self):
+        """Incorpora los registros agregados a `registros` desde la última vez."""
+        nuevos = self.registros[self._n:]
+        if not nuevos:
+            return
+        inicio, fin = self._n, self._n + len(nuevos)
+        self._asegurar_capacidad(fin)
+        cantidad = len(nuevos)
+        columnas = self._columnas
+        columnas["monto"][inicio:fin] = np.fromiter((t["monto"] for t in nuevos), np.float64, cantidad)
+        columnas["status"][inicio:fin] = np.fromiter((t["status"] for t in nuevos), np.int8, cantidad)
+        columnas["fecha"][inicio:fin] = np.fromiter((t["fecha_ord"] or 0 for t in nuevos), np.int64, cantidad)
+        columnas["timestamp"][inicio:fin] = np.fromiter((_marca(t.get("timestamp")) for t in nuevos), np.int64, cantidad)
+        for dim in DIMENSIONES:
+            codigos, valores = self._codigos[dim], self._valores[dim]
+
+            def codificar(valor):
+                codigo = codigos.get(valor)
+                if codigo is None:
+                    codigo = codigos[valor] = len(valores)
+                    valores.append(valor)
+                return codigo
+
+            columnas[dim][inicio:fin] = np.fromiter((codificar(t[dim]) for t in nuevos), np.int32, cantidad)
+        self._n = fin
+
+    def _asegurar_capacidad(self, necesaria: int):
+        capacidad = len(self._columnas["monto"])
+        if necesaria <= capacidad:
+            return
+        # Crecimiento geométrico: agregar de a una alta no copia las columnas cada vez
+        nueva = max(necesaria, capacidad * 2, _CAPACIDAD_INICIAL)
+        for nombre, columna in self._columnas.items():
+            ampliada = np.empty(nueva, dtype=columna.dtype)
+            ampliada[:self._n] = columna[:self._n]
+            self._columnas[nombre] = ampliada
+
+    def marcar_status(self, posicion: int, status: int):
+        if posicion < self._n:
+            self._columnas["status"][posicion] = status
+
+    # ---------- FILTROS ----------
+    def _en(self, dim: str, valores: Iterable[Any], columna: np.ndarray) -> np.ndarray:
+        codigos = [self._codigos[dim][v] for v in valores if v in self._codigos[dim]]
+        if not codigos:
+            return np.zeros(len(columna), dtype=bool)
+        if len(codigos) == 1:
+            return columna == codigos[0]
+        return np.isin(columna, codigos)
+
+    def _contiene(self, dim: str, buscado: str, columna: np.ndarray) -> np.ndarray:
+        return self._en(dim, [v for v in self._valores[dim] if buscado in v], columna)
+
+    def seleccionar(
+        self,
+        posiciones: Optional[np.ndarray] = None,
+        tipos: Optional[Iterable[str]] = None,
+        año: Optional[int] = None,
+        mes: Optional[str] = None,
+        categoria: Optional[str] = None,
+        medio: Optional[str] = None,
+        parcial: bool = False,
+        rango: Optional[Tuple[int, int]] = None,
+        activos: bool = True,
+        despues_de: Optional[Tuple[int, str]] = None,
+    ) -> np.ndarray:
+        """
+        Posiciones (crecientes, o en el orden de `posiciones` si se dan) de las filas que cumplen
+        todos los criterios (valores ya normalizados; rango en ordinales). Con `posiciones` solo
+        se evalúan esas filas. `despues_de` = (fecha_ord, timestamp): solo filas posteriores en orden "fecha".
+        """
+        if posiciones is None:
+            def columna(nombre):
+                return self.columna(nombre)
+        else:
+            def columna(nombre):
+                return self.columna(nombre)[posiciones]
+
+        cantidad = self._n if posiciones is None else len(posiciones)
+        mascara = columna("status") == 1 if activos else np.ones(cantidad, dtype=bool)
+        if tipos is not None:
+            mascara &= self._en("tipo", tipos, columna("tipo"))
+        if año is not None:
+            mascara &= self._en("año", [año], columna("año"))
+        if mes is not None:
+            mascara &= self._en("mes", [mes], columna("mes"))
+        for dim, buscado in (("categoria", categoria), ("medio", medio)):
+            if buscado is not None:
+                valores = columna(dim)
+                mascara &= self._contiene(dim, buscado, valores) if parcial else self._en(dim, [buscado], valores)
+        if rango is not None:
+            fechas = columna("fecha")
+            mascara &= (fechas >= rango[0]) & (fechas <= rango[1])
+        if despues_de is not None:
+            fecha, marca = despues_de[0] or 0, _marca(despues_de[1])
+            fechas = columna("fecha")
+            mascara &= (fechas > fecha) | ((fechas == fecha) & (columna("timestamp") > marca))
+        return np.flatnonzero(mascara) if posiciones is None else posiciones[mascara]
+
+    # ---------- AGREGACIÓN ----------
+    def agrupar(self, dims: Sequence[str], posiciones: np.ndarray) -> List[Tuple[Tuple, float, int]]:
+        """(valores de `dims`, total, cantidad) de cada grupo con filas en `posiciones`."""
+        tamaños = [max(len(self._valores[d]), 1) for d in dims]
+        combinado = np.zeros(len(posiciones), dtype=np.int64)
+        for dim, tamaño in zip(dims, tamaños):
+            combinado = combinado * tamaño + self.columna(dim)[posiciones]
+        claves, inversa = np.unique(combinado, return_inverse=True)
+        totales = np.bincount(inversa, weights=self.columna("monto")[posiciones], minlength=len(claves))
+        cantidades = np.bincount(inversa, minlength=len(claves))
+        codigos = np.unravel_index(claves, tamaños)
+        valores = [[self._valores[d][c] for c in codigos_d.tolist()] for d, codigos_d in zip(dims, codigos)]
+        return [
+            (tuple(v[i] for v in valores), float(totales[i]), int(cantidades[i]))
+            for i in range(len(claves))
+        ]
+
+    def ordenar(self, posiciones: np.ndarray, campo: str, descendente: bool = False, limite: Optional[int] = None) -> np.ndarray:
+        """`posiciones` ordenadas por `campo` (de CAMPOS_ORDEN); con `limite`, solo los k primeros."""
+        if campo == "fecha":
+            # Fecha del movimiento y, a igual fecha, orden de registro
+            orden = np.lexsort((self.columna("timestamp")[posiciones], self.columna("fecha")[posiciones]))
+            if descendente:
+                orden = orden[::-1]
+            return posiciones[orden[:limite] if limite else orden]
+        valores = self.columna(campo)[posiciones]
+        if descendente:
+            valores = -valores
+        if limite and limite < len(posiciones):
+            # Top-k: se separan los k menores en O(n) y solo esos se ordenan
+            candidatos = np.argpartition(valores, limite - 1)[:limite]
+            orden = candidatos[np.argsort(valores[candidatos], kind="stable")]
+        else:
+            orden = np.argsort(valores, kind="stable")
+        return posiciones[orden]
+
+    def filas(self, posiciones: np.ndarray) -> List[dict]:
+        registros = self.registros
+        return [registros[p] for p in posiciones.tolist()]
@@ -0,0 +1,199 @@
+# actions/envio_logs.py
+# Log de github_sync: rotación por tamaño, compresión y envío a GitHub en segundo plano.
+#
+# El log se escribe en logs/github_sync.log. Cuando supera LOGS_TAMANO_MAXIMO bytes, o cambia el
+# día, ese segmento se cierra (se renombra a github_sync_<última línea>.log) y se abre otro: escribir una
+# línea nunca comprime ni sube nada. Un hilo aparte, cada LOGS_INTERVALO segundos, comprime los
+# segmentos cerrados y sube a GitHub los que faltan, cada uno una sola vez y con un nombre propio de
+# la réplica (logs/<fecha>/<réplica>_<hora>.log.gz). Subido un segmento, se borra la copia local.
+# Así el costo de cada envío depende solo de lo nuevo, y las subidas de datos (outbox de
+# github_sync) no esperan nunca a los logs.
+
+import gzip
+import logging
+import os
+import re
+import shutil
+import socket
+import threading
+import time
+from datetime import date, datetime
+from typing import List, Optional, Tuple
+
+from usuarios import normalizar_usuario
+
+LOGS_DIR = os.path.join(os.path.dirname(__file__), "logs")
+LOG_ACTIVO = os.path.join(LOGS_DIR, "github_sync.log")
+# Carpeta equivalente dentro del repositorio de GitHub
+DIR_REMOTO = "logs"
+
+TAMANO_MAXIMO = int(os.getenv("LOGS_TAMANO_MAXIMO", str(1024 * 1024)))
+INTERVALO = float(os.getenv("LOGS_INTERVALO", "300"))
+# Nombre de esta réplica en los segmentos subidos: dos servidores nunca escriben el mismo archivo
+REPLICA = normalizar_usuario(os.getenv("LOGS_REPLICA") or socket.gethostname())
+
+FORMATO = "%(asctime)s - %(levelname)s - %(message)s"
+_SEGMENTO = re.compile(r"^github_sync_(\d{8})-\d{6}-\d{6}\.log(\.gz)?$")
+
+_manejador: Optional["ManejadorSegmentos"] = None
+_hilo_envio = None
+_lock_envio = threading.Lock()
+
+class ManejadorSegmentos(logging.FileHandler):
+    """FileHandler que cierra el segmento activo al superar `tamano_maximo` bytes o al cambiar el día."""
+
+    def __init__(self, ruta: str = LOG_ACTIVO, tamano_maximo: int = TAMANO_MAXIMO):
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        super().__init__(ruta, encoding="utf-8")
+        self.tamano_maximo = tamano_maximo
+        # Si se sigue un segmento de una ejecución anterior, su día es el de la última escritura
+        self._dia = date.fromtimestamp(os.path.getmtime(ruta))
+
+    @staticmethod
+    def _cerrar_archivo(ruta: str):
+        if os.path.exists(ruta) and os.path.getsize(ruta) > 0:
+            # El nombre lleva la hora de la última línea: al cambiar el día, el segmento es del anterior
+            ultima = datetime.fromtimestamp(os.path.getmtime(ruta)).strftime("%Y%m%d-%H%M%S-%f")
+            os.replace(ruta, os.path.join(os.path.dirname(ruta), f"github_sync_{ultima}.log"))
+
+    def _reabrir_si_lo_cerraron(self):
+        # Otro proceso con el mismo directorio (p. ej. un script de migración) pudo cerrar el
+        # segmento: se sigue escribiendo en el nuevo y no en el ya cerrado
+        try:
+            cerrado = os.stat(self.baseFilename).st_ino != os.fstat(self.stream.fileno()).st_ino
+        except FileNotFoundError:
+            cerrado = True
+        if cerrado:
+            self.stream.close()
+            self.stream = self._open()
+            self._dia = date.today()
+
+    def _debe_rotar(self) -> bool:
+        if self._dia != date.today():
+            return True
+        return self.stream is not None and self.stream.tell() >= self.tamano_maximo
+
+    def rotar(self):
+        """Cierra el segmento activo y abre uno nuevo (solo un rename: la compresión es del hilo de envío)."""
+        self.acquire()
+        try:
+            if self.stream:
+                self.stream.close()
+                self.stream = None
+            self._cerrar_archivo(self.baseFilename)
+            self._dia = date.today()
+            self.stream = self._open()
+        finally:
+            self.release()
+
+    def rotar_si_corresponde(self):
+        self.acquire()
+        try:
+            if self._debe_rotar():
+                self.rotar()
+        finally:
+            self.release()
+
+    def emit(self, record):
+        try:
+            if self.stream is not None:
+                self._reabrir_si_lo_cerraron()
+            if self._debe_rotar():
+                self.rotar()
+        except Exception:
+            self.handleError(record)
+        super().emit(record)
+
+def configurar_log():
+    """Envía el log de la aplicación al segmento activo (una sola vez, como logging.basicConfig)."""
+    global _manejador
+    if _manejador is not None:
+        return
+    _manejador = ManejadorSegmentos()
+    _manejador.setFormatter(logging.Formatter(FORMATO))
+    logging.basicConfig(level=logging.INFO, handlers=[_manejador])
+
+# ---------- SEGMENTOS ----------
+def _segmentos(comprimidos: bool) -> List[str]:
+    try:
+        nombres = os.listdir(LOGS_DIR)
+    except FileNotFoundError:
+        return []
+    segmentos = []
+    for nombre in nombres:
+        coincide = _SEGMENTO.match(nombre)
+        if coincide and bool(coincide.group(2)) == comprimidos:
+            segmentos.append(os.path.join(LOGS_DIR, nombre))
+    return sorted(segmentos)
+
+def comprimir_segmentos() -> int:
+    """Comprime con gzip los segmentos cerrados. Devuelve cuántos comprimió."""
+    comprimidos = 0
+    for ruta in _segmentos(comprimidos=False):
+        ruta_temporal = ruta + ".gz.tmp"
+        try:
+            with open(ruta, "rb") as origen, gzip.open(ruta_temporal, "wb") as destino:
+                shutil.copyfileobj(origen, destino)
+            os.replace(ruta_temporal, ruta + ".gz")
+            os.remove(ruta)
+            comprimidos += 1
+        except OSError as e:
+            print(f"[WARN] No se pudo comprimir {os.path.basename(ruta)}: {e}")
+    return comprimidos
+
+def ruta_remota(ruta_segmento: str) -> str:
+    nombre = os.path.basename(ruta_segmento)
+    dia = _SEGMENTO.match(nombre).group(1)
+    fecha = f"{dia[:4]}-{dia[4:6]}-{dia[6:]}"
+    return f"{DIR_REMOTO}/{fecha}/{REPLICA}_{nombre[len('github_sync_'):]}"
+
+# ---------- ENVÍO ----------
+def enviar_logs() -> int:
+    """Cierra el segmento si corresponde, comprime los cerrados y sube los pendientes. Devuelve cuántos subió."""
+    # Importación diferida: github_sync importa este módulo
+    from github_sync import (
+        ESPERA_MAXIMA_ESCRITURA, GITHUB_TOKEN, MODO_SUBIDA, planificador, subir_archivo, subir_commit_unico
+    )
+
+    if _manejador is not None:
+        _manejador.rotar_si_corresponde()
+    comprimir_segmentos()
+
+    pendientes: List[Tuple[str, str]] = [(ruta, ruta_remota(ruta)) for ruta in _segmentos(comprimidos=True)]
+    if not pendientes or not GITHUB_TOKEN:
+        return 0
+    # Los logs nunca compiten con los datos por el presupuesto agotado de la API
+    if planificador.pausa_restante() > ESPERA_MAXIMA_ESCRITURA:
+        return 0
+
+    if MODO_SUBIDA == "git":
+        if not subir_commit_unico(pendientes, f"📝 Logs de {REPLICA}: {len(pendientes)} segmento(s)"):
+            return 0
+        subidos = pendientes
+    else:
+        subidos = [
+            (ruta, destino) for ruta, destino in pendientes
+            if subir_archivo(ruta, destino, f"📝 Log de {REPLICA}: {destino}")
+        ]
+
+    for ruta, _ in subidos:
+        os.remove(ruta)
+    if subidos:
+        logging.info(f"[OK] {len(subidos)} segmento(s) de log subidos a GitHub")
+    return len(subidos)
+
+def _bucle_envio():
+    while True:
+        time.sleep(INTERVALO)
+        try:
+            enviar_logs()
+        except Exception as e:
+            logging.error(f"[ERROR] Fallo al enviar los logs: {e}")
+
+def iniciar_envio_logs():
+    """Lanza (una sola vez) el hilo que envía los segmentos de log a GitHub."""
+    global _hilo_envio
+    with _lock_envio:
+        if _hilo_envio is None or not _hilo_envio.is_alive():
+            _hilo_envio = threading.Thread(target=_bucle_envio, name="envio-logs", daemon=True)
+            _hilo_envio.start()
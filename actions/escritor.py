@@ -0,0 +1,172 @@
+# actions/escritor.py
+# Escritor único: todas las mutaciones de transacciones y alertas corren en un solo hilo.
+#
+# rasa_sdk atiende varias acciones a la vez; si cada una leyera, modificara y reescribiera los
+# archivos por su cuenta, dos altas simultáneas podrían pisarse. Aquí cada mutación se encola
+# (cola acotada: con ESCRITOR_MAX_COLA tareas pendientes, quien encola espera) y un hilo las
+# ejecuta de a una, en orden de llegada y con el contexto de quien la pidió (el usuario actual,
+# ver usuarios.py). Quien llama espera su resultado: al volver, el cambio ya es durable.
+#
+# Las tareas de lote (p. ej. altas de transacciones) que llegan seguidas para el mismo usuario
+# se juntan en una sola llamada: una escritura y un fsync para todas, hasta ESCRITOR_MAX_LOTE.
+# Las lecturas no pasan por la cola: toman el lock del store, que el escritor retiene mientras
+# persiste y aplica cada lote, así que ven el estado anterior o el posterior, nunca uno a medias.
+
+import asyncio
+import contextvars
+import functools
+import os
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, List, Optional
+
+from asincrono import en_hilo
+from usuarios import usuario_actual
+
+MAX_COLA = int(os.getenv("ESCRITOR_MAX_COLA", "1000"))
+MAX_LOTE = int(os.getenv("ESCRITOR_MAX_LOTE", "64"))
+
+class _Tarea:
+    __slots__ = ("funcion", "args", "kwargs", "contexto", "futuro", "lote")
+
+    def __init__(self, funcion, args, kwargs, lote=None):
+        self.funcion = funcion
+        self.args = args
+        self.kwargs = kwargs
+        self.contexto = contextvars.copy_context()
+        self.futuro: Future = Future()
+        # (funcion, usuario) si la tarea puede juntarse con las contiguas de la misma clave
+        self.lote = lote
+
+class Escritor:
+    def __init__(self, max_cola: int = MAX_COLA, max_lote: int = MAX_LOTE):
+        self._cola: "queue.Queue[_Tarea]" = queue.Queue(maxsize=max_cola)
+        self._max_lote = max(1, max_lote)
+        self._hilo: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.tareas = 0
+        self.lotes = 0
+
+    def _iniciar(self):
+        if self._hilo is None:
+            with self._lock:
+                if self._hilo is None:
+                    self._hilo = threading.Thread(target=self._bucle, name="escritor", daemon=True)
+                    self._hilo.start()
+
+    def en_escritor(self) -> bool:
+        return threading.current_thread() is self._hilo
+
+    # ---------- ENCOLAR ----------
+    def enviar(self, funcion: Callable, *args, **kwargs) -> Future:
+        """Encola `funcion(*args, **kwargs)` y devuelve el Future con su resultado."""
+        return self._encolar(_Tarea(funcion, args, kwargs))
+
+    def enviar_a_lote(self, funcion_lote: Callable[[List[Any]], List[Any]], elemento) -> Future:
+        """
+        Encola `elemento` para `funcion_lote`, que recibe una lista de elementos del mismo usuario
+        y devuelve un resultado por elemento, en el mismo orden.
+        """
+        return self._encolar(_Tarea(funcion_lote, (elemento,), {}, lote=(funcion_lote, usuario_actual())))
+
+    def _encolar(self, tarea: _Tarea) -> Future:
+        self._iniciar()
+        self._cola.put(tarea)
+        return tarea.futuro
+
+    def ejecutar(self, funcion: Callable, *args, **kwargs):
+        """Ejecuta la mutación en el escritor y espera su resultado (directamente si ya se está en él)."""
+        if self.en_escritor():
+            return funcion(*args, **kwargs)
+        return self.enviar(funcion, *args, **kwargs).result()
+
+    def ejecutar_en_lote(self, funcion_lote: Callable[[List[Any]], List[Any]], elemento):
+        if self.en_escritor():
+            return funcion_lote([elemento])[0]
+        return self.enviar_a_lote(funcion_lote, elemento).result()
+
+    async def ejecutar_async(self, funcion: Callable, *args, **kwargs):
+        """Como `ejecutar`, sin ocupar un hilo del pool mientras espera (salvo con la cola llena)."""
+        return await self._esperar(_Tarea(funcion, args, kwargs))
+
+    async def ejecutar_en_lote_async(self, funcion_lote: Callable[[List[Any]], List[Any]], elemento):
+        return await self._esperar(_Tarea(funcion_lote, (elemento,), {}, lote=(funcion_lote, usuario_actual())))
+
+    async def _esperar(self, tarea: _Tarea):
+        self._iniciar()
+        try:
+            self._cola.put_nowait(tarea)
+        except queue.Full:
+            # Cola llena: se espera el lugar en el pool de E/S, no en el event loop
+            await en_hilo(self._cola.put, tarea)
+        return await asyncio.wrap_future(tarea.futuro)
+
+    # ---------- HILO ESCRITOR ----------
+    def _bucle(self):
+        while True:
+            pendientes = [self._cola.get()]
+            # Lo que ya esté esperando se atiende en la misma vuelta
+            while len(pendientes) < self._max_lote:
+                try:
+                    pendientes.append(self._cola.get_nowait())
+                except queue.Empty:
+                    break
+
+            inicio = 0
+            while inicio < len(pendientes):
+                fin = inicio + 1
+                clave = pendientes[inicio].lote
+                if clave is not None:
+                    while fin < len(pendientes) and pendientes[fin].lote == clave:
+                        fin += 1
+                self._atender(pendientes[inicio:fin])
+                inicio = fin
+
+    def _atender(self, grupo: List[_Tarea]):
+        # Las tareas canceladas antes de empezar (p. ej. una acción async cancelada) no se ejecutan
+        grupo = [t for t in grupo if t.futuro.set_running_or_notify_cancel()]
+        if not grupo:
+            return
+        primera = grupo[0]
+        try:
+            if primera.lote is None:
+                resultados = [primera.contexto.run(primera.funcion, *primera.args, **primera.kwargs)]
+            else:
+                # Todas son del mismo usuario: corren en el contexto de la primera
+                resultados = primera.contexto.run(primera.funcion, [t.args[0] for t in grupo])
+        except BaseException as e:
+            print(f"[ERROR] Falló una escritura ({getattr(primera.funcion, '__name__', primera.funcion)}): {e}")
+            for tarea in grupo:
+                tarea.futuro.set_exception(e)
+        else:
+            for tarea, resultado in zip(grupo, resultados):
+                tarea.futuro.set_result(resultado)
+        finally:
+            self.tareas += len(grupo)
+            self.lotes += 1
+
+    def estadisticas(self) -> dict:
+        return {
+            "pendientes": self._cola.qsize(),
+            "tareas": self.tareas,
+            "lotes": self.lotes,
+            "tareas_por_lote": round(self.tareas / self.lotes, 2) if self.lotes else 0.0,
+        }
+
+escritor = Escritor()
+
+def mutacion(funcion: Optional[Callable] = None, *, antes: Optional[Callable[[], Any]] = None):
+    """
+    Decorador: la función se ejecuta en el escritor único (y quien la llama espera su resultado).
+    `antes`, si se da, corre primero en el hilo de quien llama: ahí va lo que puede esperar a la
+    red, para que el escritor no lo haga.
+    """
+    def decorar(funcion):
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            if antes is not None:
+                antes()
+            return escritor.ejecutar(funcion, *args, **kwargs)
+        return envoltura
+    return decorar(funcion) if funcion is not None else decorar
@@ -0,0 +1,186 @@
+# actions/esquema.py
+# Esquema versionado de transacciones y alertas.
+#
+# Los registros se normalizan una sola vez, al escribirse o al importarse: monto float,
+# año entero, número de mes, textos en minúsculas internados y la fecha como ordinal.
+# Así las lecturas usan los campos tal cual, sin convertir fila por fila.
+#
+# Los archivos se guardan como {"version": N, "registros": [...]}. Una lista suelta es la
+# versión 1 (formato histórico) y se migra al leerla. Para reescribir todo en la versión actual:
+#   python esquema.py --subir
+
+import argparse
+import json
+import os
+import sys
+from datetime import date
+from typing import Any, Callable, Dict, List, Tuple
+
+from periodos import año_completo, interpretar_periodo, nombre_mes, numero_mes
+from registros import serializable
+from usuarios import como_usuario
+
+VERSION_ESQUEMA = 2
+
+def texto(valor) -> str:
+    """Minúsculas sin espacios extremos, internado: categorías y medios repetidos comparten objeto."""
+    return sys.intern(str(valor or "").strip().lower())
+
+def _entero(valor) -> int:
+    try:
+        return int(str(valor).replace(",", ""))
+    except (TypeError, ValueError):
+        return 0
+
+def _decimal(valor) -> float:
+    try:
+        return float(str(valor).replace(",", "")) if valor not in (None, "") else 0.0
+    except (TypeError, ValueError):
+        return 0.0
+
+def _estado(valor) -> int:
+    return 0 if _entero(1 if valor is None else valor) == 0 else 1
+
+def fecha_ordinal(año: int, mes_num: int, dia) -> Any:
+    """Ordinal de la fecha (date.toordinal) o None si no es una fecha válida."""
+    try:
+        return date(año, mes_num, int(dia)).toordinal()
+    except (TypeError, ValueError):
+        return None
+
+# ---------- NORMALIZACIÓN ----------
+def normalizar_transaccion(t: Dict[str, Any]) -> Dict[str, Any]:
+    """Normaliza la transacción en su lugar y la devuelve."""
+    mes_num = numero_mes(t.get("mes"))
+    # '05/04/25' llega con año 25: se guarda como 2025, igual que al leer los periodos
+    año = año_completo(_entero(t.get("año"))) or 0
+    dia = _entero(t.get("dia")) or None
+    t.update({
+        "tipo": texto(t.get("tipo")),
+        "monto": _decimal(t.get("monto")),
+        "categoria": texto(t.get("categoria")),
+        "medio": texto(t.get("medio")),
+        "dia": dia,
+        "mes": sys.intern(nombre_mes(mes_num)) if mes_num else texto(t.get("mes")),
+        "mes_num": mes_num,
+        "año": año,
+        "fecha_ord": fecha_ordinal(año, mes_num, dia),
+        "status": _estado(t.get("status")),
+    })
+    return t
+
+def normalizar_alerta(a: Dict[str, Any]) -> Dict[str, Any]:
+    """Normaliza la alerta en su lugar; mes y año se completan desde el periodo si faltan."""
+    periodo = texto(a.get("periodo"))
+    mes, año = interpretar_periodo(periodo, requiere_año=True)
+    mes = mes or texto(a.get("mes"))
+    a.update({
+        "categoria": texto(a.get("categoria")),
+        "monto": _decimal(a.get("monto")),
+        "periodo": periodo,
+        "mes": mes,
+        "mes_num": numero_mes(mes),
+        "año": año or _entero(a.get("año")),
+        "status": _estado(a.get("status")),
+    })
+    return a
+
+NORMALIZADORES: Dict[str, Callable[[Dict[str, Any]], Dict[str, Any]]] = {
+    "transacciones": normalizar_transaccion,
+    "alertas": normalizar_alerta,
+}
+
+# ---------- MIGRACIONES ----------
+def _v1_a_v2(registros: List[dict], tipo: str) -> List[dict]:
+    normalizar = NORMALIZADORES[tipo]
+    for registro in registros:
+        normalizar(registro)
+    return registros
+
+# Versión de origen → paso que la lleva a la siguiente
+MIGRACIONES: Dict[int, Callable[[List[dict], str], List[dict]]] = {
+    1: _v1_a_v2,
+}
+
+def migrar(registros: List[dict], version: int, tipo: str) -> List[dict]:
+    """Aplica en orden los pasos desde `version` hasta VERSION_ESQUEMA."""
+    if version > VERSION_ESQUEMA:
+        raise ValueError(f"Versión de esquema {version} más nueva que la soportada ({VERSION_ESQUEMA})")
+    for desde in range(version, VERSION_ESQUEMA):
+        registros = MIGRACIONES[desde](registros, tipo)
+    return registros
+
+# ---------- DOCUMENTOS ----------
+def leer_documento(datos: Any) -> Tuple[int, List[dict]]:
+    """(versión, registros) de un documento ya parseado: lista suelta (v1) o envoltorio."""
+    if isinstance(datos, list):
+        return 1, datos
+    if isinstance(datos, dict) and isinstance(datos.get("registros"), list):
+        return int(datos.get("version", 1)), datos["registros"]
+    raise ValueError("El documento no es una lista de registros ni un envoltorio con versión")
+
+def cargar_documento(datos: Any, tipo: str) -> List[dict]:
+    """Registros del documento en la versión actual (migrándolos si vienen de una anterior)."""
+    version, registros = leer_documento(datos)
+    return migrar(registros, version, tipo)
+
+def serializar(registros: List[dict]) -> str:
+    return json.dumps({"version": VERSION_ESQUEMA, "registros": registros}, ensure_ascii=False, indent=2, default=serializable)
+
+def leer_archivo(ruta: str, tipo: str) -> List[dict]:
+    with open(ruta, "r", encoding="utf-8") as f:
+        return cargar_documento(json.load(f), tipo)
+
+def version_de_archivo(ruta: str) -> int:
+    with open(ruta, "r", encoding="utf-8") as f:
+        return leer_documento(json.load(f))[0]
+
+# ---------- MIGRACIÓN DE ARCHIVOS ----------
+def migrar_archivos(subir: bool = False) -> Dict[str, int]:
+    """
+    Reescribe en la versión actual los archivos locales que estén en una anterior
+    (transacciones.json, alertas.json y particiones mensuales) del usuario actual. La base
+    SQLite se migra sola al abrirse.
+    """
+    # Importación diferida: este módulo lo usan las capas de almacenamiento
+    import particiones
+    from github_sync import encolar_subida, escribir_atomico, vaciar_outbox
+    from transacciones_io import espacio_actual, hay_journal_pendiente
+    from alertas_io import archivo_alertas, ruta_alertas
+
+    if hay_journal_pendiente():
+        raise RuntimeError("Hay operaciones en el journal sin compactar; compacta antes de migrar")
+
+    mensaje = f"Migración al esquema v{VERSION_ESQUEMA}"
+    resumen = {}
+    espacio = espacio_actual()
+    archivos = ((espacio.ruta, espacio.archivo_github, "transacciones"), (ruta_alertas(), archivo_alertas(), "alertas"))
+    for ruta, remoto, tipo in archivos:
+        if not os.path.exists(ruta) or version_de_archivo(ruta) == VERSION_ESQUEMA:
+            continue
+        registros = leer_archivo(ruta, tipo)
+        escribir_atomico(ruta, serializar(registros))
+        encolar_subida(ruta, remoto, mensaje)
+        resumen[tipo] = len(registros)
+
+    por_particion = {}
+    for clave in particiones.leer_manifest()["particiones"]:
+        ruta = particiones.ruta_local(clave)
+        if os.path.exists(ruta) and version_de_archivo(ruta) != VERSION_ESQUEMA:
+            por_particion[clave] = particiones.leer_particion(clave)
+    particiones.escribir_particiones(por_particion, mensaje)
+    if por_particion:
+        resumen["particiones"] = len(por_particion)
+
+    print(f"[INFO] Migración al esquema v{VERSION_ESQUEMA} completada: {resumen or 'nada que migrar'}")
+    if subir:
+        vaciar_outbox()
+    return resumen
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Migra transacciones y alertas a la versión actual del esquema.")
+    parser.add_argument("--subir", action="store_true", help="Sube los archivos migrados a GitHub al terminar")
+    parser.add_argument("--usuario", help="sender_id cuyos archivos se migran (por defecto, los del usuario legado)")
+    args = parser.parse_args()
+    with como_usuario(args.usuario):
+        migrar_archivos(subir=args.subir)
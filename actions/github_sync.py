@@ -1,105 +1,786 @@
 import os
+import json
+import time
 import base64
-import requests
+import hashlib
 import logging
+import random
+import threading
+from concurrent.futures import Future
 from datetime import datetime
+from typing import Callable, Dict, List, Optional
+from cliente_http import obtener_sesion, estadisticas_pool
+from envio_logs import configurar_log
+from usuarios import como_usuario, separar_ruta_remota
 
 # ---------- CONFIGURACIÓN DE LOG ----------
-fecha_log = datetime.now().strftime("%Y-%m-%d")
-logs_dir = os.path.join(os.path.dirname(__file__), "logs")
-os.makedirs(logs_dir, exist_ok=True)
-LOG_PATH = os.path.join(logs_dir, f"github_sync_{fecha_log}.log")
-RUTA_DESTINO_LOG = f"logs/github_sync_{fecha_log}.log"
-
-logging.basicConfig(
-    filename=LOG_PATH,
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-)
+# Segmentos rotados por tamaño y enviados a GitHub por su propio hilo (ver envio_logs.py).
+# El archivo se abre en el primer uso (una petición a GitHub o el outbox) o en el
+# precalentamiento, nunca al importar el módulo.
 
 # ---------- VARIABLES DE ENTORNO ----------
 GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
-GITHUB_USERNAME = os.getenv("GITHUB_USERNAME")
-GITHUB_REPO = os.getenv("GITHUB_REPO")
+# Por defecto, el mismo repositorio que usan transacciones_io y alertas_io
+GITHUB_USERNAME = os.getenv("GITHUB_USERNAME", "MaximoGuzmanH")
+GITHUB_REPO = os.getenv("GITHUB_REPO", "chatbot-financiero")
 
-GITHUB_API_URL = f"https://api.github.com/repos/{GITHUB_USERNAME}/{GITHUB_REPO}/contents/"
+GITHUB_REPO_API = f"https://api.github.com/repos/{GITHUB_USERNAME}/{GITHUB_REPO}"
+GITHUB_API_URL = f"{GITHUB_REPO_API}/contents/"
+GITHUB_RAMA = "main"
+GITHUB_RAW_URL = f"https://raw.githubusercontent.com/{GITHUB_USERNAME}/{GITHUB_REPO}/{GITHUB_RAMA}/"
 
-# ---------- FUNCIÓN DE SUBIDA ----------
-def subir_log_a_github(ruta_archivo_local: str, ruta_destino_repo: str, mensaje_commit: str):
-    if not all([GITHUB_TOKEN, GITHUB_USERNAME, GITHUB_REPO]):
-        msg = "[ERROR] Faltan variables de entorno para autenticación con GitHub."
+# "contents": un commit por archivo (Contents API)
+# "git": un único commit con todos los archivos pendientes (Git Data API)
+MODO_SUBIDA = os.getenv("GITHUB_SYNC_MODO", "contents").lower()
+
+# Subidas optimistas: ante un conflicto (otra réplica subió el mismo archivo) se fusiona y se
+# reintenta hasta GITHUB_INTENTOS_CONFLICTO veces, esperando entre intentos un backoff exponencial
+# con jitter a partir de GITHUB_ESPERA_CONFLICTO segundos (como máximo GITHUB_ESPERA_MAXIMA)
+INTENTOS_CONFLICTO = int(os.getenv("GITHUB_INTENTOS_CONFLICTO", "5"))
+ESPERA_CONFLICTO = float(os.getenv("GITHUB_ESPERA_CONFLICTO", "0.5"))
+ESPERA_MAXIMA_CONFLICTO = float(os.getenv("GITHUB_ESPERA_MAXIMA", "8"))
+
+# ---------- PRESUPUESTO DE PETICIONES (rate limit) ----------
+# Todas las peticiones a GitHub pasan por `planificador`. Lleva la cuenta del presupuesto que informa
+# la API (X-RateLimit-Remaining / X-RateLimit-Reset) y, cuando quedan GITHUB_RESERVA peticiones o
+# menos, las reparte hasta el reinicio de la ventana en lugar de agotarlas en una ráfaga. Las
+# escrituras van separadas al menos GITHUB_INTERVALO_ESCRITURAS segundos, como pide GitHub para no
+# caer en los límites secundarios. Los 403/429 por límite y los 5xx se reintentan respetando
+# Retry-After o, si no viene, con backoff exponencial con jitter. Dos lecturas idénticas en curso a
+# la vez se resuelven con una sola petición.
+RESERVA = int(os.getenv("GITHUB_RESERVA", "100"))
+INTERVALO_ESCRITURAS = float(os.getenv("GITHUB_INTERVALO_ESCRITURAS", "1"))
+REINTENTOS = int(os.getenv("GITHUB_REINTENTOS", "4"))
+ESPERA_REINTENTO = float(os.getenv("GITHUB_ESPERA_REINTENTO", "1"))
+# Tope de cada paso del backoff (antes del jitter)
+ESPERA_MAXIMA_REINTENTO = float(os.getenv("GITHUB_ESPERA_MAXIMA_REINTENTO", "8"))
+# Lo más que se espera un turno o un reintento antes de desistir: las lecturas ocurren durante una
+# conversación y tienen la copia local; las escrituras ya están a salvo en el outbox
+ESPERA_MAXIMA_LECTURA = float(os.getenv("GITHUB_ESPERA_MAXIMA_LECTURA", "2"))
+ESPERA_MAXIMA_ESCRITURA = float(os.getenv("GITHUB_ESPERA_MAXIMA_ESCRITURA", "60"))
+# Sin Retry-After, GitHub pide esperar al menos un minuto tras un límite secundario
+ESPERA_LIMITE_SECUNDARIO = 60.0
+
+GITHUB_API_BASE = "https://api.github.com/"
+_REINTENTABLES = (429, 500, 502, 503, 504)
+
+class LimiteDeGitHub(Exception):
+    """El presupuesto de GitHub está agotado y la espera supera la que admite la petición."""
+
+class PlanificadorGitHub:
+    """Cliente de GitHub con la interfaz de `requests.Session` (get, put, post, patch)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.limite: Optional[int] = None
+        self.restantes: Optional[int] = None
+        # Época (segundos) en que se renueva el presupuesto, según X-RateLimit-Reset
+        self.reinicio: Optional[int] = None
+        # Instantes (time.monotonic) antes de los cuales no sale ninguna petición / escritura
+        self._pausado_hasta = 0.0
+        self._proxima = 0.0
+        self._proxima_escritura = 0.0
+        self._en_curso: Dict[tuple, Future] = {}
+        self.peticiones = 0
+        self.reintentos = 0
+        self.colapsadas = 0
+        self.segundos_esperados = 0.0
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def put(self, url, **kwargs):
+        return self.request("PUT", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def patch(self, url, **kwargs):
+        return self.request("PATCH", url, **kwargs)
+
+    def request(self, metodo: str, url: str, **kwargs):
+        configurar_log()
+        metodo = metodo.upper()
+        if metodo != "GET":
+            return self._con_reintentos(metodo, url, kwargs)
+
+        # Una lectura igual a otra que ya está en curso espera esa respuesta en lugar de repetirla
+        clave = (url, repr(sorted((kwargs.get("params") or {}).items())), repr(sorted((kwargs.get("headers") or {}).items())))
+        with self._lock:
+            futuro = self._en_curso.get(clave)
+            lider = futuro is None
+            if lider:
+                futuro = self._en_curso[clave] = Future()
+            else:
+                self.colapsadas += 1
+        if not lider:
+            return futuro.result()
+
+        try:
+            futuro.set_result(self._con_reintentos(metodo, url, kwargs))
+        except BaseException as e:
+            futuro.set_exception(e)
+        finally:
+            with self._lock:
+                del self._en_curso[clave]
+        return futuro.result()
+
+    def _con_reintentos(self, metodo: str, url: str, kwargs: dict):
+        escritura = metodo != "GET"
+        espera_maxima = ESPERA_MAXIMA_ESCRITURA if escritura else ESPERA_MAXIMA_LECTURA
+        api = url.startswith(GITHUB_API_BASE)
+
+        for intento in range(REINTENTOS + 1):
+            if api:
+                self._esperar_turno(escritura, espera_maxima)
+            response = obtener_sesion().request(metodo, url, **kwargs)
+            # Se lee ya el cuerpo: la misma respuesta puede entregarse a varios hilos
+            response.content
+            with self._lock:
+                self.peticiones += 1
+            if api:
+                self._actualizar(response.headers)
+
+            espera = self._espera_reintento(response, intento)
+            if espera is None:
+                return response
+            if intento == REINTENTOS or espera > espera_maxima:
+                logging.warning(f"[LIMITE] {metodo} {url}: {response.status_code}; no se reintentará ({espera:.0f} s de espera)")
+                return response
+            logging.warning(f"[LIMITE] {metodo} {url}: {response.status_code}; reintento en {espera:.1f} s")
+            with self._lock:
+                self.reintentos += 1
+            self._dormir(espera)
+        return response
+
+    def _es_limite(self, response) -> bool:
+        if response.headers.get("X-RateLimit-Remaining") == "0" or "Retry-After" in response.headers:
+            return True
+        return "rate limit" in (response.text or "").lower()
+
+    def _espera_reintento(self, response, intento: int) -> Optional[float]:
+        """Segundos a esperar antes de repetir la petición, o None si no corresponde repetirla."""
+        codigo = response.status_code
+        limitado = codigo in (403, 429) and self._es_limite(response)
+        if codigo not in _REINTENTABLES and not limitado:
+            return None
+
+        espera = None
+        try:
+            espera = float(response.headers["Retry-After"])
+        except (KeyError, ValueError):
+            pass
+        if espera is None and limitado:
+            if response.headers.get("X-RateLimit-Remaining") == "0" and self.reinicio:
+                espera = max(self.reinicio - time.time(), 0) + 1
+            else:
+                espera = ESPERA_LIMITE_SECUNDARIO
+        if espera is None:
+            espera = min(ESPERA_REINTENTO * 2 ** intento, ESPERA_MAXIMA_REINTENTO) * random.uniform(0.5, 1.5)
+        if limitado:
+            # El límite es del token, no de esta petición: las demás también esperan
+            self._pausar(espera)
+        return espera
+
+    def _pausar(self, segundos: float):
+        with self._lock:
+            self._pausado_hasta = max(self._pausado_hasta, time.monotonic() + segundos)
+
+    def _actualizar(self, headers):
+        restantes = headers.get("X-RateLimit-Remaining")
+        if restantes is None:
+            return
+        with self._lock:
+            anteriores = self.restantes
+            self.restantes = int(restantes)
+            self.limite = int(headers.get("X-RateLimit-Limit") or self.limite or 0) or None
+            self.reinicio = int(headers.get("X-RateLimit-Reset") or 0) or None
+            if self.restantes == 0 and self.reinicio:
+                self._pausado_hasta = max(self._pausado_hasta, time.monotonic() + max(self.reinicio - time.time(), 0) + 1)
+        if self.restantes <= RESERVA and (anteriores is None or anteriores > RESERVA):
+            logging.warning(f"[LIMITE] Quedan {self.restantes} peticiones a GitHub hasta {self._hora_reinicio()}; se espaciarán")
+
+    def _intervalo(self) -> float:
+        # Con presupuesto de sobra no se espacia; en la reserva, lo que queda se reparte hasta el reinicio
+        if self.restantes is None or self.restantes > RESERVA or not self.reinicio:
+            return 0.0
+        return max(self.reinicio - time.time(), 0) / max(self.restantes, 1)
+
+    def _esperar_turno(self, escritura: bool, espera_maxima: float):
+        with self._lock:
+            ahora = time.monotonic()
+            turno = max(ahora, self._proxima, self._pausado_hasta)
+            if escritura:
+                turno = max(turno, self._proxima_escritura)
+            espera = turno - ahora
+            if espera > espera_maxima:
+                raise LimiteDeGitHub(f"Límite de GitHub: la próxima petición sale en {espera:.0f} s")
+            self._proxima = turno + self._intervalo()
+            if escritura:
+                self._proxima_escritura = turno + INTERVALO_ESCRITURAS
+        self._dormir(espera)
+
+    def _dormir(self, segundos: float):
+        if segundos <= 0:
+            return
+        with self._lock:
+            self.segundos_esperados += segundos
+        time.sleep(segundos)
+
+    def pausa_restante(self) -> float:
+        """Segundos hasta que vuelva a salir una petición a la API (0 si no hay pausa)."""
+        return max(self._pausado_hasta - time.monotonic(), 0.0)
+
+    def _hora_reinicio(self) -> Optional[str]:
+        return datetime.fromtimestamp(self.reinicio).strftime("%H:%M:%S") if self.reinicio else None
+
+    def estadisticas(self) -> dict:
+        return {
+            "limite": self.limite,
+            "restantes": self.restantes,
+            "reinicio": self._hora_reinicio(),
+            "pausa_segundos": round(self.pausa_restante(), 1),
+            "peticiones": self.peticiones,
+            "reintentos": self.reintentos,
+            "colapsadas": self.colapsadas,
+            "segundos_esperados": round(self.segundos_esperados, 1),
+        }
+
+planificador = PlanificadorGitHub()
+
+def estadisticas_github() -> dict:
+    """Presupuesto restante de la API de GitHub y actividad del planificador."""
+    return planificador.estadisticas()
+
+# ---------- DESCARGAS CONDICIONALES (ETag) ----------
+# ETag de la última versión descargada de cada URL; se persiste para sobrevivir a reinicios del proceso
+RUTA_ETAGS = "/tmp/github_etags.json"
+SIN_CAMBIOS = "sin_cambios"
+ACTUALIZADO = "actualizado"
+# El archivo no existe en el repositorio (por ejemplo, un usuario que aún no sube nada)
+NO_EXISTE = "no_existe"
+
+_etags = None
+_lock_etags = threading.Lock()
+
+def _obtener_etags() -> dict:
+    global _etags
+    if _etags is None:
+        try:
+            with open(RUTA_ETAGS, "r", encoding="utf-8") as f:
+                _etags = json.load(f)
+        except (OSError, ValueError):
+            _etags = {}
+    return _etags
+
+def _recordar_etag(url: str, etag):
+    with _lock_etags:
+        etags = _obtener_etags()
+        if etag:
+            etags[url] = etag
+        else:
+            etags.pop(url, None)
+        ruta_temporal = RUTA_ETAGS + ".tmp"
+        with open(ruta_temporal, "w", encoding="utf-8") as f:
+            json.dump(etags, f)
+        os.replace(ruta_temporal, RUTA_ETAGS)
+
+def descargar_si_cambio(url: str, ruta_local: str, headers: dict = None, validar=None, ruta_destino: str = None):
+    """
+    Descarga `url` en `ruta_local` solo si cambió desde la última descarga (If-None-Match).
+    Devuelve SIN_CAMBIOS ante un 304 (no se toca el archivo local), ACTUALIZADO si se
+    reescribió, NO_EXISTE ante un 404, o None si la descarga falló o `validar(contenido)`
+    la rechazó. Con `ruta_destino` (la ruta del archivo en el repositorio), la versión
+    descargada queda como base de la próxima subida (ver _resolver_conflicto).
+    """
+    cabeceras = {"Accept-Encoding": "gzip, deflate"}
+    cabeceras.update(headers or {})
+
+    # Sin copia local no sirve un 304: se fuerza la descarga completa
+    etag = _obtener_etags().get(url) if os.path.exists(ruta_local) else None
+    if etag:
+        cabeceras["If-None-Match"] = etag
+
+    response = planificador.get(url, headers=cabeceras)
+
+    if response.status_code == 304:
+        logging.info(f"[ETAG] Sin cambios: {url}")
+        return SIN_CAMBIOS
+
+    if response.status_code == 404:
+        logging.info(f"[ETAG] No existe en el repositorio: {url}")
+        if ruta_destino:
+            _recordar_base(ruta_destino, None)
+        return NO_EXISTE
+
+    if response.status_code != 200:
+        msg = f"[WARN] No se pudo descargar {url} ({response.status_code})"
         print(msg)
-        logging.error(msg)
-        return False
+        logging.warning(msg)
+        return None
+
+    contenido = response.text
+    if validar and not validar(contenido):
+        return None
+
+    # 💾 Reemplazo atómico: nunca queda un instante sin archivo local
+    ruta_temporal = ruta_local + ".descarga"
+    with open(ruta_temporal, "w", encoding="utf-8") as f:
+        f.write(contenido)
+    os.replace(ruta_temporal, ruta_local)
+
+    _recordar_etag(url, response.headers.get("ETag"))
+    if ruta_destino:
+        _recordar_base(ruta_destino, sha_blob(contenido.encode("utf-8")))
+    return ACTUALIZADO
+
+# ---------- CONFLICTOS ENTRE RÉPLICAS ----------
+# Varias réplicas del servidor de acciones pueden subir el mismo archivo. Para cada ruta del
+# repositorio se recuerda el sha de la versión de la que parte la copia local (la última que se
+# descargó o subió). Al subir, si el sha remoto es otro, alguien subió entretanto: se descarga
+# esa versión, se fusiona con la local (ver registrar_fusionador) y se sube el resultado sobre
+# el sha nuevo. Si la rama vuelve a moverse antes del PUT, se repite con backoff.
+RUTA_BASES = "/tmp/github_bases.json"
+
+_bases = None
+_lock_bases = threading.Lock()
+_fusionadores: List[tuple] = []
+
+def sha_blob(contenido: bytes) -> str:
+    """El sha con el que Git identifica un archivo con este contenido."""
+    return hashlib.sha1(b"blob %d\0" % len(contenido) + contenido).hexdigest()
+
+def _obtener_bases() -> dict:
+    global _bases
+    if _bases is None:
+        try:
+            with open(RUTA_BASES, "r", encoding="utf-8") as f:
+                _bases = json.load(f)
+        except (OSError, ValueError):
+            _bases = {}
+    return _bases
+
+def _recordar_base(ruta_destino: str, sha: Optional[str]):
+    with _lock_bases:
+        bases = _obtener_bases()
+        if bases.get(ruta_destino) == sha:
+            return
+        if sha:
+            bases[ruta_destino] = sha
+        else:
+            bases.pop(ruta_destino, None)
+        ruta_temporal = RUTA_BASES + ".tmp"
+        with open(ruta_temporal, "w", encoding="utf-8") as f:
+            json.dump(bases, f)
+        os.replace(ruta_temporal, RUTA_BASES)
+
+def registrar_fusionador(corresponde: Callable[[str], bool], fusionar: Callable[[str, str, str], str], siempre: bool = False):
+    """
+    Registra cómo fusionar los archivos para los que `corresponde(ruta)` es verdadero, con `ruta`
+    relativa al usuario (p. ej. "transacciones.json", ver usuarios.separar_ruta_remota).
+    `fusionar(ruta, local, remoto)` corre como el usuario dueño del archivo, incorpora lo remoto
+    a sus datos locales y devuelve el contenido a subir. Con `siempre` se fusiona aunque la versión
+    remota sea la base, para archivos cuya copia local no incluye lo que ya se subió (el manifiesto).
+    """
+    _fusionadores.append((corresponde, fusionar, siempre))
+
+def _fusionador_para(ruta: str):
+    for corresponde, fusionar, siempre in _fusionadores:
+        if corresponde(ruta):
+            return fusionar, siempre
+    return None
+
+def _resolver_conflicto(ruta_destino: str, contenido: bytes, sha_remoto: Optional[str], leer_remoto) -> Optional[bytes]:
+    """
+    Contenido que hay que subir sobre la versión remota `sha_remoto`: el local si el remoto es
+    la base de la que partió (o no existe), o la fusión de ambos si alguien subió entretanto.
+    None si la versión remota no se pudo leer o fusionar.
+    """
+    if not sha_remoto or sha_remoto == sha_blob(contenido):
+        return contenido
+    usuario, ruta = separar_ruta_remota(ruta_destino)
+    fusionador = _fusionador_para(ruta)
+    if fusionador is None:
+        if sha_remoto != _obtener_bases().get(ruta_destino):
+            logging.warning(f"[CONFLICTO] {ruta_destino} cambió en GitHub y no se sabe fusionar: se sobrescribe")
+        return contenido
+    fusionar, siempre = fusionador
+    if sha_remoto == _obtener_bases().get(ruta_destino) and not siempre:
+        return contenido
+
+    remoto = leer_remoto()
+    if remoto is None:
+        return None
+    try:
+        with como_usuario(usuario):
+            fusionado = fusionar(ruta, contenido.decode("utf-8", errors="replace"), remoto.decode("utf-8", errors="replace"))
+    except Exception as e:
+        _registrar_error(f"[ERROR] No se pudo fusionar {ruta_destino} con la versión de GitHub: {e}")
+        return None
+    if not siempre:
+        logging.info(f"[CONFLICTO] {ruta_destino} cambió en GitHub: se fusionó con la copia local")
+    return fusionado.encode("utf-8")
+
+def _esperar_reintento(intento: int):
+    espera = min(ESPERA_CONFLICTO * 2 ** (intento - 1), ESPERA_MAXIMA_CONFLICTO)
+    time.sleep(espera * random.uniform(0.5, 1.5))
 
-    headers = {
+def _leer_blob(sha: str) -> Optional[bytes]:
+    response = planificador.get(f"{GITHUB_REPO_API}/git/blobs/{sha}", headers=_headers_api())
+    if response.status_code != 200:
+        _registrar_error(f"[ERROR] No se pudo leer el blob {sha[:7]}: {response.status_code} - {response.text}")
+        return None
+    return base64.b64decode(response.json()["content"])
+
+def _crear_blob(contenido: bytes) -> Optional[str]:
+    response = planificador.post(
+        f"{GITHUB_REPO_API}/git/blobs",
+        headers=_headers_api(),
+        json={"content": base64.b64encode(contenido).decode("utf-8"), "encoding": "base64"}
+    )
+    if response.status_code != 201:
+        _registrar_error(f"[ERROR] Fallo al crear el blob: {response.status_code} - {response.text}")
+        return None
+    return response.json()["sha"]
+
+def _contenido_remoto(respuesta: dict) -> Optional[bytes]:
+    # La Contents API incluye el contenido hasta 1 MB; más grande, se pide el blob
+    if respuesta.get("encoding") == "base64" and respuesta.get("content"):
+        return base64.b64decode(respuesta["content"])
+    return _leer_blob(respuesta["sha"])
+
+# ---------- FUNCIONES DE SUBIDA ----------
+def _headers_api():
+    return {
         "Authorization": f"token {GITHUB_TOKEN}",
         "Accept": "application/vnd.github.v3+json"
     }
 
-    # Leer archivo local
-    try:
-        with open(ruta_archivo_local, "rb") as f:
-            contenido = f.read()
-        contenido_base64 = base64.b64encode(contenido).decode("utf-8")
-    except Exception as e:
-        msg = f"[ERROR] No se pudo leer el archivo local: {e}"
+def subir_archivo(ruta_archivo_local: str, ruta_destino_repo: str, mensaje_commit: str) -> bool:
+    if not all([GITHUB_TOKEN, GITHUB_USERNAME, GITHUB_REPO]):
+        msg = "[ERROR] Faltan variables de entorno para autenticación con GitHub."
         print(msg)
         logging.error(msg)
         return False
 
-    # Verificar existencia para obtener SHA
+    headers = _headers_api()
     url_archivo = GITHUB_API_URL + ruta_destino_repo
-    response = requests.get(url_archivo, headers=headers)
-    sha = response.json().get("sha") if response.status_code == 200 else None
-
-    # Armar payload
-    payload = {
-        "message": mensaje_commit,
-        "content": contenido_base64,
-        "branch": "main"
-    }
-    if sha:
-        payload["sha"] = sha
 
-    # PUT a GitHub
-    response = requests.put(url_archivo, headers=headers, json=payload)
-
-    if response.status_code in [200, 201]:
-        msg = f"[OK] Archivo actualizado en GitHub: {ruta_destino_repo}"
-        print(msg)
-        logging.info(msg)
-
-        # ---- Subir el LOG TAMBIÉN ----
+    for intento in range(1, INTENTOS_CONFLICTO + 1):
+        # Leer archivo local (en cada intento: una fusión previa pudo reescribirlo)
         try:
-            if os.path.exists(LOG_PATH):
-                with open(LOG_PATH, "rb") as log_f:
-                    log_content = base64.b64encode(log_f.read()).decode("utf-8")
-
-                log_payload = {
-                    "message": f"📝 Log automático: {RUTA_DESTINO_LOG}",
-                    "content": log_content,
-                    "branch": "main"
-                }
-
-                log_url = GITHUB_API_URL + RUTA_DESTINO_LOG
-                log_resp = requests.get(log_url, headers=headers)
-                log_sha = log_resp.json().get("sha") if log_resp.status_code == 200 else None
-                if log_sha:
-                    log_payload["sha"] = log_sha
-
-                log_response = requests.put(log_url, headers=headers, json=log_payload)
-                if log_response.status_code in [200, 201]:
-                    logging.info(f"[OK] Log sincronizado: {RUTA_DESTINO_LOG}")
-                else:
-                    logging.warning(f"[WARN] Fallo al sincronizar log: {log_response.status_code} - {log_response.text}")
+            with open(ruta_archivo_local, "rb") as f:
+                contenido = f.read()
         except Exception as e:
-            logging.error(f"[ERROR] No se pudo sincronizar el log: {e}")
+            msg = f"[ERROR] No se pudo leer el archivo local: {e}"
+            print(msg)
+            logging.error(msg)
+            return False
 
-        return True
+        # Versión remota actual: su SHA y, si hay conflicto, su contenido
+        response = planificador.get(url_archivo, headers=headers)
+        if response.status_code == 200:
+            remoto = response.json()
+            sha = remoto.get("sha")
+        elif response.status_code == 404:
+            remoto, sha = None, None
+        else:
+            _registrar_error(f"[ERROR] No se pudo consultar {ruta_destino_repo}: {response.status_code} - {response.text}")
+            return False
+
+        contenido = _resolver_conflicto(ruta_destino_repo, contenido, sha, lambda: _contenido_remoto(remoto))
+        if contenido is None:
+            return False
+        if sha == sha_blob(contenido):
+            _recordar_base(ruta_destino_repo, sha)
+            logging.info(f"[OK] {ruta_destino_repo} ya estaba al día en GitHub")
+            return True
+
+        # Armar payload
+        payload = {
+            "message": mensaje_commit,
+            "content": base64.b64encode(contenido).decode("utf-8"),
+            "branch": "main"
+        }
+        if sha:
+            payload["sha"] = sha
+
+        # PUT a GitHub: falla (409/422) si el archivo ya no está en `sha`
+        response = planificador.put(url_archivo, headers=headers, json=payload)
+
+        if response.status_code in [200, 201]:
+            _recordar_base(ruta_destino_repo, response.json().get("content", {}).get("sha") or sha_blob(contenido))
+            msg = f"[OK] Archivo actualizado en GitHub: {ruta_destino_repo}"
+            print(msg)
+            logging.info(msg)
+            return True
+
+        if response.status_code in (409, 422):
+            # Otra réplica subió entre la lectura y el PUT: se vuelve a leer, fusionar y subir
+            logging.warning(f"[CONFLICTO] {ruta_destino_repo} cambió durante la subida (intento {intento}/{INTENTOS_CONFLICTO})")
+            _esperar_reintento(intento)
+            continue
 
-    else:
         msg = f"[ERROR] Fallo al subir archivo: {response.status_code} - {response.text}"
         print(msg)
         logging.error(msg)
-        return False
\ No newline at end of file
+        return False
+
+    _registrar_error(f"[ERROR] {ruta_destino_repo}: conflicto persistente tras {INTENTOS_CONFLICTO} intentos; se reintentará")
+    return False
+
+def _registrar_error(msg: str):
+    print(msg)
+    logging.error(msg)
+
+def _blobs_del_arbol(sha_arbol: str) -> Optional[dict]:
+    """Ruta → sha de cada archivo del árbol (recursivo) de un commit."""
+    response = planificador.get(f"{GITHUB_REPO_API}/git/trees/{sha_arbol}", headers=_headers_api(), params={"recursive": "1"})
+    if response.status_code != 200:
+        _registrar_error(f"[ERROR] No se pudo leer el árbol {sha_arbol[:7]}: {response.status_code} - {response.text}")
+        return None
+    return {e["path"]: e["sha"] for e in response.json().get("tree", []) if e.get("type") == "blob"}
+
+def subir_commit_unico(archivos: List[tuple], mensaje_commit: str, intentos: int = INTENTOS_CONFLICTO) -> bool:
+    """
+    Sube varios archivos `(ruta_local, ruta_destino)` en un solo commit con la Git Data API:
+    rama (GET) → árbol actual (GET) → árbol (POST) → commit (POST) → ref (PATCH), cambien uno
+    o diez archivos. Los archivos que otra réplica modificó desde su base se fusionan antes
+    (un GET del blob por cada uno); si la rama se mueve antes del PATCH, se rehace con backoff.
+    """
+    if not all([GITHUB_TOKEN, GITHUB_USERNAME, GITHUB_REPO]):
+        _registrar_error("[ERROR] Faltan variables de entorno para autenticación con GitHub.")
+        return False
+
+    sesion = planificador
+    headers = _headers_api()
+
+    for intento in range(1, intentos + 1):
+        # El contenido se relee en cada intento: una fusión previa pudo reescribirlo
+        try:
+            locales = []
+            for ruta_local, ruta_destino in archivos:
+                with open(ruta_local, "rb") as f:
+                    locales.append((ruta_destino, f.read()))
+        except OSError as e:
+            _registrar_error(f"[ERROR] No se pudo leer el archivo local: {e}")
+            return False
+
+        response = sesion.get(f"{GITHUB_REPO_API}/branches/{GITHUB_RAMA}", headers=headers)
+        if response.status_code != 200:
+            _registrar_error(f"[ERROR] No se pudo leer la rama {GITHUB_RAMA}: {response.status_code} - {response.text}")
+            return False
+        commit_padre = response.json()["commit"]
+        sha_padre = commit_padre["sha"]
+        sha_arbol = commit_padre["commit"]["tree"]["sha"]
+        remotos = _blobs_del_arbol(sha_arbol)
+        if remotos is None:
+            return False
+
+        # El texto va en línea dentro del árbol: solo los binarios (logs comprimidos) necesitan su blob
+        arbol, subidos = [], {}
+        for ruta_destino, contenido in locales:
+            sha_remoto = remotos.get(ruta_destino)
+            contenido = _resolver_conflicto(ruta_destino, contenido, sha_remoto, lambda: _leer_blob(sha_remoto))
+            if contenido is None:
+                return False
+            subidos[ruta_destino] = sha_blob(contenido)
+            if subidos[ruta_destino] == sha_remoto:
+                continue
+            entrada = {"path": ruta_destino, "mode": "100644", "type": "blob"}
+            try:
+                entrada["content"] = contenido.decode("utf-8")
+            except UnicodeDecodeError:
+                entrada["sha"] = _crear_blob(contenido)
+                if entrada["sha"] is None:
+                    return False
+            arbol.append(entrada)
+
+        if not arbol:
+            for ruta_destino, sha in subidos.items():
+                _recordar_base(ruta_destino, sha)
+            logging.info("[OK] Los archivos ya estaban al día en GitHub")
+            return True
+
+        response = sesion.post(
+            f"{GITHUB_REPO_API}/git/trees",
+            headers=headers,
+            json={"base_tree": sha_arbol, "tree": arbol}
+        )
+        if response.status_code != 201:
+            _registrar_error(f"[ERROR] Fallo al crear el árbol: {response.status_code} - {response.text}")
+            return False
+
+        response = sesion.post(
+            f"{GITHUB_REPO_API}/git/commits",
+            headers=headers,
+            json={"message": mensaje_commit, "tree": response.json()["sha"], "parents": [sha_padre]}
+        )
+        if response.status_code != 201:
+            _registrar_error(f"[ERROR] Fallo al crear el commit: {response.status_code} - {response.text}")
+            return False
+        sha_commit = response.json()["sha"]
+
+        response = sesion.patch(
+            f"{GITHUB_REPO_API}/git/refs/heads/{GITHUB_RAMA}",
+            headers=headers,
+            json={"sha": sha_commit}
+        )
+        if response.status_code == 200:
+            for ruta_destino, sha in subidos.items():
+                _recordar_base(ruta_destino, sha)
+            msg = f"[OK] Commit {sha_commit[:7]} con {len(arbol)} archivo(s): {', '.join(a['path'] for a in arbol)}"
+            print(msg)
+            logging.info(msg)
+            return True
+
+        if response.status_code == 422:
+            # La rama avanzó entre la lectura y la actualización: se rehace (y fusiona) sobre el nuevo commit
+            logging.warning(f"[WARN] La rama {GITHUB_RAMA} cambió durante la subida (intento {intento}/{intentos})")
+            _esperar_reintento(intento)
+            continue
+
+        _registrar_error(f"[ERROR] Fallo al actualizar la rama: {response.status_code} - {response.text}")
+        return False
+
+    _registrar_error(f"[ERROR] La rama {GITHUB_RAMA} siguió cambiando tras {intentos} intentos; se reintentará")
+    return False
+
+# ---------- OUTBOX (write-behind) ----------
+# Cada archivo pendiente de subir deja una entrada en disco; varias escrituras del mismo
+# archivo se funden en una sola entrada y el flusher en segundo plano las sube por lotes.
+OUTBOX_DIR = os.getenv("GITHUB_OUTBOX_DIR", "/tmp/github_outbox")
+OUTBOX_MAX_PENDIENTES = int(os.getenv("GITHUB_OUTBOX_MAX_PENDIENTES", "5"))
+OUTBOX_INTERVALO = float(os.getenv("GITHUB_OUTBOX_INTERVALO", "10"))
+
+_lock_outbox = threading.Lock()
+_evento_flush = threading.Event()
+_hilo_flusher = None
+
+def escribir_atomico(ruta: str, contenido: str):
+    """Escribe en un temporal, fuerza a disco y lo renombra: el archivo nunca queda a medias."""
+    ruta_temporal = ruta + ".tmp"
+    with open(ruta_temporal, "w", encoding="utf-8") as f:
+        f.write(contenido)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(ruta_temporal, ruta)
+
+def _ruta_entrada(ruta_destino: str) -> str:
+    return os.path.join(OUTBOX_DIR, hashlib.sha1(ruta_destino.encode("utf-8")).hexdigest() + ".json")
+
+def _leer_entrada(ruta: str):
+    try:
+        with open(ruta, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def subidas_pendientes() -> List[dict]:
+    if not os.path.isdir(OUTBOX_DIR):
+        return []
+    entradas = [
+        _leer_entrada(os.path.join(OUTBOX_DIR, nombre))
+        for nombre in sorted(os.listdir(OUTBOX_DIR))
+        if nombre.endswith(".json")
+    ]
+    return sorted((e for e in entradas if e), key=lambda e: e["secuencia"])
+
+def hay_subida_pendiente(ruta_destino: str) -> bool:
+    pendiente = os.path.exists(_ruta_entrada(ruta_destino))
+    if pendiente:
+        # Puede venir de una ejecución anterior: se asegura que alguien la suba
+        _iniciar_flusher()
+    return pendiente
+
+def encolar_subida(ruta_archivo_local: str, ruta_destino_repo: str, mensaje_commit: str):
+    """
+    Registra de forma durable que `ruta_archivo_local` debe subirse a `ruta_destino_repo`
+    y retorna de inmediato; la subida la hace el flusher en segundo plano.
+    """
+    if not GITHUB_TOKEN:
+        print("[WARN] GITHUB_TOKEN no definido. No se subirá a GitHub.")
+        return
+
+    with _lock_outbox:
+        os.makedirs(OUTBOX_DIR, exist_ok=True)
+        entrada = {
+            "ruta_local": ruta_archivo_local,
+            "ruta_destino": ruta_destino_repo,
+            "mensaje": mensaje_commit,
+            "encolado": datetime.now().isoformat(),
+            "secuencia": time.time_ns(),
+        }
+        escribir_atomico(_ruta_entrada(ruta_destino_repo), json.dumps(entrada, ensure_ascii=False))
+        pendientes = len([n for n in os.listdir(OUTBOX_DIR) if n.endswith(".json")])
+
+    _iniciar_flusher()
+    logging.info(f"[OUTBOX] Encolado {ruta_destino_repo} ({pendientes} pendientes)")
+    if pendientes >= OUTBOX_MAX_PENDIENTES:
+        _evento_flush.set()
+
+def _confirmar_entrada(entrada: dict):
+    ruta = _ruta_entrada(entrada["ruta_destino"])
+    with _lock_outbox:
+        actual = _leer_entrada(ruta)
+        # Si se volvió a encolar durante la subida, la entrada nueva debe sobrevivir
+        if actual and actual["secuencia"] == entrada["secuencia"]:
+            os.remove(ruta)
+
+def _vaciar_en_un_commit(entradas: List[dict]) -> int:
+    archivos = [(e["ruta_local"], e["ruta_destino"]) for e in entradas]
+
+    if len(entradas) == 1:
+        mensaje = entradas[0]["mensaje"]
+    else:
+        mensaje = "🔄 Sincronización automática: " + ", ".join(e["ruta_destino"] for e in entradas)
+
+    if not subir_commit_unico(archivos, mensaje):
+        return 0
+    for entrada in entradas:
+        _confirmar_entrada(entrada)
+    return len(entradas)
+
+def vaciar_outbox() -> int:
+    """Sube todas las entradas pendientes. Devuelve cuántos archivos se subieron."""
+    entradas = subidas_pendientes()
+    if not entradas:
+        return 0
+
+    # Con el presupuesto agotado las entradas esperan en el outbox hasta el reinicio
+    if planificador.pausa_restante() > ESPERA_MAXIMA_ESCRITURA:
+        logging.info(f"[LIMITE] Sin presupuesto de GitHub hasta {estadisticas_github()['reinicio']}; {len(entradas)} subidas en espera")
+        return 0
+
+    if MODO_SUBIDA == "git":
+        subidos = _vaciar_en_un_commit(entradas)
+    else:
+        subidos = 0
+        for entrada in entradas:
+            if not subir_archivo(entrada["ruta_local"], entrada["ruta_destino"], entrada["mensaje"]):
+                # Se conserva la entrada para el siguiente ciclo
+                continue
+            subidos += 1
+            _confirmar_entrada(entrada)
+
+    if subidos:
+        logging.info(f"[HTTP] Reutilización de conexiones: {estadisticas_pool()}")
+        logging.info(f"[HTTP] Presupuesto de GitHub: {estadisticas_github()}")
+    return subidos
+
+def _bucle_flusher():
+    while True:
+        _evento_flush.wait(timeout=OUTBOX_INTERVALO)
+        _evento_flush.clear()
+        try:
+            vaciar_outbox()
+        except Exception as e:
+            logging.error(f"[ERROR] Fallo al vaciar el outbox: {e}")
+
+def _iniciar_flusher():
+    global _hilo_flusher
+    configurar_log()
+    with _lock_outbox:
+        if _hilo_flusher is None or not _hilo_flusher.is_alive():
+            _hilo_flusher = threading.Thread(target=_bucle_flusher, name="github-outbox", daemon=True)
+            _hilo_flusher.start()
@@ -0,0 +1,169 @@
+# actions/identificadores.py
+# Identificadores estables (ULID) para transacciones y alertas.
+#
+# Un ULID son 26 caracteres en base32 de Crockford: 48 bits con los milisegundos de creación
+# seguidos de 80 bits aleatorios, así que ordenar los ids equivale a ordenar por fecha de registro.
+# Los registros anteriores a los ids reciben uno derivado de su timestamp y su contenido, el mismo
+# en cada carga, hasta que se reescriben o se migran con:
+#   python identificadores.py --subir
+
+import argparse
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Iterable, List, Optional, Tuple
+
+from usuarios import como_usuario
+
+ALFABETO = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+LONGITUD_ID = 26
+_MAXIMO_ALEATORIO = (1 << 80) - 1
+
+# Campos que cambian con las modificaciones y por eso no entran en el id derivado
+CAMPOS_MUTABLES = ("id", "status", "timestamp_modificacion")
+
+_lock = threading.Lock()
+_ultimo_ms = -1
+_ultimo_aleatorio = 0
+
+def _codificar(valor: int, caracteres: int) -> str:
+    texto = []
+    for _ in range(caracteres):
+        valor, resto = divmod(valor, 32)
+        texto.append(ALFABETO[resto])
+    return "".join(reversed(texto))
+
+def _decodificar(texto: str) -> int:
+    valor = 0
+    for caracter in texto:
+        valor = valor * 32 + ALFABETO.index(caracter)
+    return valor
+
+def _armar(ms: int, aleatorio: int) -> str:
+    return _codificar(ms, 10) + _codificar(aleatorio, 16)
+
+def nuevo_id(momento: Optional[datetime] = None) -> str:
+    """ULID nuevo. Dentro del mismo milisegundo los ids siguen siendo crecientes."""
+    global _ultimo_ms, _ultimo_aleatorio
+    ms = int(momento.timestamp() * 1000) if momento else time.time_ns() // 1_000_000
+    with _lock:
+        if ms <= _ultimo_ms and _ultimo_aleatorio < _MAXIMO_ALEATORIO:
+            ms, aleatorio = _ultimo_ms, _ultimo_aleatorio + 1
+        else:
+            aleatorio = int.from_bytes(os.urandom(10), "big")
+        _ultimo_ms, _ultimo_aleatorio = ms, aleatorio
+    return _armar(ms, aleatorio)
+
+def _ms_de_timestamp(timestamp) -> int:
+    try:
+        return max(int(datetime.fromisoformat(str(timestamp)).timestamp() * 1000), 0)
+    except (TypeError, ValueError):
+        return 0
+
+def id_derivado(registro: dict) -> str:
+    """Id determinista para un registro sin id: misma marca de tiempo y contenido, mismo id."""
+    inmutable = {k: v for k, v in registro.items() if k not in CAMPOS_MUTABLES}
+    huella = hashlib.sha1(json.dumps(inmutable, ensure_ascii=False, sort_keys=True, default=str).encode("utf-8"))
+    return _armar(_ms_de_timestamp(registro.get("timestamp")), int.from_bytes(huella.digest()[:10], "big"))
+
+def es_id_valido(valor) -> bool:
+    return isinstance(valor, str) and len(valor) == LONGITUD_ID and all(c in ALFABETO for c in valor)
+
+def asegurar_ids(registros: Iterable[dict]) -> int:
+    """Asigna un id derivado a los registros que no lo tienen. Devuelve cuántos se completaron."""
+    vistos = set()
+    asignados = 0
+    for registro in registros:
+        if not registro.get("id"):
+            candidato = id_derivado(registro)
+            # Dos registros idénticos (mismo timestamp y contenido) no pueden compartir id
+            while candidato in vistos:
+                candidato = candidato[:10] + _codificar((_decodificar(candidato[10:]) + 1) & _MAXIMO_ALEATORIO, 16)
+            registro["id"] = candidato
+            asignados += 1
+        vistos.add(registro["id"])
+    return asignados
+
+# ---------- FUSIÓN DE COPIAS ----------
+def version_registro(registro: dict) -> str:
+    """Marca de la última modificación del registro (o de su alta, si nunca se modificó)."""
+    return registro.get("timestamp_modificacion") or registro.get("timestamp") or ""
+
+def diferencias_por_id(buscar: Callable[[str], Optional[dict]], remotos: Iterable[dict]) -> Tuple[List[dict], List[Tuple[dict, dict]]]:
+    """
+    Compara registros de otra copia con los locales (`buscar(id)` da el local o None): devuelve
+    los que faltan localmente y los pares (local, remoto) en que el remoto es más reciente.
+    Las bajas son lógicas, así que un registro que solo tiene una de las copias es un alta.
+    """
+    faltantes, cambios = [], []
+    for remoto in remotos:
+        local = buscar(remoto["id"])
+        if local is None:
+            faltantes.append(remoto)
+        elif version_registro(remoto) > version_registro(local):
+            cambios.append((local, remoto))
+    return faltantes, cambios
+
+# ---------- MIGRACIÓN ----------
+def _migrar_lista_json(ruta: str, tipo: str) -> Optional[List[dict]]:
+    from esquema import leer_archivo
+
+    if not os.path.exists(ruta):
+        return None
+    registros = leer_archivo(ruta, tipo)
+    return registros if asegurar_ids(registros) else None
+
+def migrar_ids(subir: bool = False) -> dict:
+    """
+    Completa y guarda los ids que faltan en el almacenamiento configurado
+    (transacciones.json o particiones mensuales, alertas.json y la base SQLite) del usuario actual.
+    """
+    # Importación diferida: este módulo lo usan las capas de almacenamiento
+    import almacen_sqlite
+    import particiones
+    from esquema import serializar
+    from github_sync import encolar_subida, escribir_atomico, vaciar_outbox
+    from transacciones_io import MODO_ALMACENAMIENTO, espacio_actual, hay_journal_pendiente
+    from alertas_io import archivo_alertas, ruta_alertas
+
+    if hay_journal_pendiente():
+        raise RuntimeError("Hay operaciones en el journal sin compactar; compacta antes de migrar")
+
+    resumen = {"transacciones": 0, "alertas": 0, "sqlite": 0}
+
+    espacio = espacio_actual()
+    archivos = ((espacio.ruta, espacio.archivo_github, "transacciones"), (ruta_alertas(), archivo_alertas(), "alertas"))
+    for ruta, remoto, clave in archivos:
+        registros = _migrar_lista_json(ruta, clave)
+        if registros is not None:
+            escribir_atomico(ruta, serializar(registros))
+            encolar_subida(ruta, remoto, "Identificadores asignados a registros existentes")
+            resumen[clave] = len(registros)
+
+    if MODO_ALMACENAMIENTO == "mensual":
+        por_particion = {}
+        for clave in particiones.leer_manifest()["particiones"]:
+            registros = particiones.leer_particion(clave)
+            if asegurar_ids(registros):
+                por_particion[clave] = registros
+        particiones.escribir_particiones(por_particion, "Identificadores asignados a registros existentes")
+        resumen["transacciones"] += sum(len(r) for r in por_particion.values())
+
+    if os.path.exists(almacen_sqlite.ruta_sqlite()):
+        resumen["sqlite"] = almacen_sqlite.asignar_ids_transacciones()
+
+    print(f"[INFO] Migración de identificadores completada: {resumen}")
+    if subir:
+        vaciar_outbox()
+    return resumen
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Asigna ids estables a transacciones y alertas existentes.")
+    parser.add_argument("--subir", action="store_true", help="Sube los archivos migrados a GitHub al terminar")
+    parser.add_argument("--usuario", help="sender_id cuyos archivos se migran (por defecto, los del usuario legado)")
+    args = parser.parse_args()
+    with como_usuario(args.usuario):
+        migrar_ids(subir=args.subir)
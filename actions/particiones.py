@@ -0,0 +1,241 @@
+# actions/particiones.py
+# Almacenamiento de transacciones particionado por mes (TRANSACCIONES_MODO=mensual).
+#
+# En lugar de un único transacciones.json, cada mes vive en su propio archivo
+# (transacciones/2025/04.json) y un manifiesto pequeño (transacciones/manifest.json)
+# guarda, por partición, cuántos registros tiene y el hash de su contenido.
+# Sincronizar solo descarga las particiones cuyo hash cambió y una escritura solo
+# sube el mes que tocó (más el manifiesto).
+# Cada usuario tiene su propia carpeta de particiones, local y remota (ver usuarios.py);
+# DIR_PARTICIONES y DIR_REMOTO son las del usuario legado.
+
+import argparse
+import hashlib
+import json
+import os
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from github_sync import (
+    GITHUB_RAW_URL, NO_EXISTE, SIN_CAMBIOS, descargar_si_cambio, encolar_subida, escribir_atomico,
+    hay_subida_pendiente, registrar_fusionador, vaciar_outbox
+)
+from esquema import cargar_documento, leer_archivo, serializar
+from periodos import numero_mes
+import usuarios
+
+DIR_PARTICIONES = os.getenv("TRANSACCIONES_DIR_PARTICIONES", "/tmp/transacciones")
+# Carpeta equivalente dentro del repositorio de GitHub
+DIR_REMOTO = "transacciones"
+
+ARCHIVO_MANIFEST = "manifest.json"
+# Última versión del manifiesto descargada de GitHub (para el GET condicional)
+ARCHIVO_MANIFEST_REMOTO = "manifest.remoto.json"
+
+SIN_FECHA = "sin_fecha"
+
+def clave_particion(año, mes) -> str:
+    """'2025/04' para (2025, 'abril'); SIN_FECHA si el año o el mes no son válidos."""
+    try:
+        año = int(str(año).replace(",", ""))
+    except (TypeError, ValueError):
+        return SIN_FECHA
+    numero = numero_mes(mes)
+    if not numero or año <= 0:
+        return SIN_FECHA
+    return f"{año:04d}/{numero:02d}"
+
+def particion_de(transaccion: dict) -> str:
+    # Transacción normalizada: año entero y número de mes ya calculados
+    año, mes_num = transaccion["año"], transaccion["mes_num"]
+    return f"{año:04d}/{mes_num:02d}" if año > 0 and mes_num else SIN_FECHA
+
+def dir_particiones(usuario: Optional[str] = None) -> str:
+    return usuarios.ruta_local(DIR_PARTICIONES, usuario)
+
+def dir_remoto(usuario: Optional[str] = None) -> str:
+    return usuarios.ruta_remota(DIR_REMOTO, usuario)
+
+def ruta_manifest(usuario: Optional[str] = None) -> str:
+    return os.path.join(dir_particiones(usuario), ARCHIVO_MANIFEST)
+
+def ruta_local(clave: str) -> str:
+    return os.path.join(dir_particiones(), *clave.split("/")) + ".json"
+
+def ruta_remota(clave: str) -> str:
+    return f"{dir_remoto()}/{clave}.json"
+
+def _hash(contenido: bytes) -> str:
+    return hashlib.sha1(contenido).hexdigest()
+
+# ---------- MANIFIESTO ----------
+def _manifest_vacio() -> dict:
+    return {"version": 1, "particiones": {}}
+
+def leer_manifest(ruta: Optional[str] = None) -> dict:
+    try:
+        ruta = ruta or ruta_manifest()
+        with open(ruta, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return _manifest_vacio()
+    if not isinstance(manifest, dict) or not isinstance(manifest.get("particiones"), dict):
+        return _manifest_vacio()
+    return manifest
+
+def _guardar_manifest(manifest: dict):
+    os.makedirs(dir_particiones(), exist_ok=True)
+    escribir_atomico(ruta_manifest(), json.dumps(manifest, ensure_ascii=False, indent=2, sort_keys=True))
+
+# ---------- LECTURA ----------
+def leer_particion(clave: str) -> List[dict]:
+    try:
+        with open(ruta_local(clave), "r", encoding="utf-8") as f:
+            return cargar_documento(json.load(f), "transacciones")
+    except FileNotFoundError:
+        return []
+    except (OSError, ValueError) as e:
+        print(f"[ERROR] No se pudo leer la partición {clave}: {e}")
+        return []
+
+def cargar(claves: Iterable[str]) -> List[dict]:
+    registros = []
+    for clave in sorted(claves):
+        registros.extend(leer_particion(clave))
+    return registros
+
+def cargar_todas() -> List[dict]:
+    return cargar(leer_manifest()["particiones"].keys())
+
+# ---------- ESCRITURA ----------
+def escribir_particiones(por_particion: Dict[str, List[dict]], mensaje_commit: str):
+    """
+    Reescribe solo las particiones indicadas, actualiza el manifiesto y encola la subida
+    de esos meses y del manifiesto.
+    """
+    if not por_particion:
+        return
+
+    manifest = leer_manifest()
+    ahora = datetime.now().isoformat()
+    for clave, registros in por_particion.items():
+        ruta = ruta_local(clave)
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        contenido = serializar(registros)
+        escribir_atomico(ruta, contenido)
+        manifest["particiones"][clave] = {
+            "registros": len(registros),
+            "activos": sum(1 for t in registros if t["status"] == 1),
+            "hash": _hash(contenido.encode("utf-8")),
+            "actualizado": ahora,
+        }
+    _guardar_manifest(manifest)
+
+    for clave in por_particion:
+        encolar_subida(ruta_local(clave), ruta_remota(clave), mensaje_commit)
+    encolar_subida(ruta_manifest(), f"{dir_remoto()}/{ARCHIVO_MANIFEST}", mensaje_commit)
+
+def agrupar(registros: Iterable[dict]) -> Dict[str, List[dict]]:
+    por_particion = defaultdict(list)
+    for t in registros:
+        por_particion[particion_de(t)].append(t)
+    return dict(por_particion)
+
+# ---------- SINCRONIZACIÓN ----------
+def sincronizar() -> bool:
+    """
+    Descarga el manifiesto de GitHub (GET condicional) y, si cambió, solo las particiones
+    cuyo hash difiere del local. Las particiones con subidas pendientes no se tocan.
+    """
+    remoto_manifest = f"{dir_remoto()}/{ARCHIVO_MANIFEST}"
+    if hay_subida_pendiente(remoto_manifest):
+        print("[INFO] El manifiesto tiene cambios pendientes de subir. No se sincronizará.")
+        return False
+
+    os.makedirs(dir_particiones(), exist_ok=True)
+    ruta_manifest_remoto = os.path.join(dir_particiones(), ARCHIVO_MANIFEST_REMOTO)
+
+    def manifest_valido(contenido):
+        try:
+            return isinstance(json.loads(contenido).get("particiones"), dict)
+        except (ValueError, AttributeError):
+            print("[WARN] El manifiesto remoto no es válido. Se ignorará.")
+            return False
+
+    try:
+        estado = descargar_si_cambio(GITHUB_RAW_URL + remoto_manifest, ruta_manifest_remoto, validar=manifest_valido,
+                                      ruta_destino=remoto_manifest)
+    except Exception as e:
+        print(f"[ERROR] Al descargar el manifiesto de particiones: {e}")
+        return False
+    if estado is None:
+        return False
+    # Sin manifiesto remoto (usuario sin particiones subidas) no hay nada que traer
+    if estado == NO_EXISTE or (estado == SIN_CAMBIOS and os.path.exists(ruta_manifest())):
+        return True
+
+    local = leer_manifest()
+    remoto = leer_manifest(ruta_manifest_remoto)
+    completo = True
+
+    for clave, info in remoto["particiones"].items():
+        if local["particiones"].get(clave, {}).get("hash") == info.get("hash"):
+            continue
+        if hay_subida_pendiente(ruta_remota(clave)):
+            completo = False
+            continue
+        try:
+            os.makedirs(os.path.dirname(ruta_local(clave)), exist_ok=True)
+            descargado = descargar_si_cambio(GITHUB_RAW_URL + ruta_remota(clave), ruta_local(clave), ruta_destino=ruta_remota(clave))
+        except Exception as e:
+            print(f"[ERROR] Al descargar la partición {clave}: {e}")
+            descargado = None
+        if descargado in (None, NO_EXISTE):
+            completo = False
+            continue
+        local["particiones"][clave] = info
+
+    _guardar_manifest(local)
+    if completo:
+        print(f"[INFO] Particiones sincronizadas desde GitHub ({len(local['particiones'])} meses)")
+    else:
+        # Sin la copia remota, el próximo intento no será un 304 y volverá a comparar las particiones
+        os.remove(ruta_manifest_remoto)
+    return completo
+
+def _fusionar_manifest(ruta: str, local: str, remoto: str) -> str:
+    """
+    Manifiesto subido por otra réplica: se suman los meses que solo conoce ella. El manifiesto
+    local no se toca, así la próxima sincronización descarga esos meses.
+    """
+    fusionado = json.loads(local)
+    for clave, info in json.loads(remoto).get("particiones", {}).items():
+        fusionado["particiones"].setdefault(clave, info)
+    return json.dumps(fusionado, ensure_ascii=False, indent=2, sort_keys=True)
+
+registrar_fusionador(lambda ruta: ruta == f"{DIR_REMOTO}/{ARCHIVO_MANIFEST}", _fusionar_manifest, siempre=True)
+
+# ---------- MIGRACIÓN ----------
+def migrar_desde_json(ruta_origen: str, subir: bool = False) -> Dict[str, int]:
+    """Divide un transacciones.json completo en particiones mensuales y genera el manifiesto."""
+    registros = leer_archivo(ruta_origen, "transacciones")
+
+    por_particion = agrupar(registros)
+    escribir_particiones(por_particion, "Migración a particiones mensuales")
+    resumen = {clave: len(regs) for clave, regs in sorted(por_particion.items())}
+    print(f"[INFO] {len(registros)} transacciones divididas en {len(resumen)} particiones en {dir_particiones()}")
+
+    if subir:
+        vaciar_outbox()
+    return resumen
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Divide transacciones.json en particiones mensuales.")
+    parser.add_argument("--origen", default="/tmp/transacciones.json")
+    parser.add_argument("--subir", action="store_true", help="Sube las particiones a GitHub al terminar")
+    parser.add_argument("--usuario", help="sender_id cuyas particiones se generan (por defecto, el usuario legado)")
+    args = parser.parse_args()
+    with usuarios.como_usuario(args.usuario):
+        for clave, cantidad in migrar_desde_json(args.origen, subir=args.subir).items():
+            print(f"  {clave}: {cantidad}")
@@ -0,0 +1,214 @@
+# actions/periodos.py
+# Interpretación de periodos y fechas en español, compartida por todas las acciones.
+#
+# Los patrones se compilan una sola vez y `parse_periodo` / `parse_rango` están memoizadas:
+# el mismo texto ("abril de 2025", "este mes", "últimos 30 días") en el mismo día se resuelve
+# con un acceso al caché.
+
+import calendar
+import re
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import Optional, Tuple
+
+MESES = [
+    "enero", "febrero", "marzo", "abril", "mayo", "junio",
+    "julio", "agosto", "septiembre", "octubre", "noviembre", "diciembre"
+]
+NUMERO_MES = {mes: numero for numero, mes in enumerate(MESES, start=1)}
+# Variante usada en Perú
+NUMERO_MES_ALIAS = dict(NUMERO_MES, setiembre=9)
+
+_MESES_REGEX = "|".join(sorted(NUMERO_MES_ALIAS, key=len, reverse=True))
+_PATRON_MES = re.compile(rf"\b({_MESES_REGEX})\b(?:\s+(?:del|de)\b)?(?:\s+(\d{{4}}))?")
+_PATRON_MES_CON_AÑO = re.compile(rf"\b({_MESES_REGEX})\b(?:\s+(?:del|de)\b)?\s+(\d{{4}})")
+_PATRON_ESTE_MES = re.compile(r"\b(este mes|mes actual)\b")
+_PATRON_MES_ANTERIOR = re.compile(r"\b(último mes|ultimo mes|mes pasado|mes anterior)\b")
+_PATRON_FECHA = re.compile(r"^\s*(\d{1,2})/(\d{1,2})(?:/(\d{2,4}))?\s*$")
+
+# Rangos de fechas: "del 1 al 15 de abril", "desde el 28 de marzo hasta el 3 de abril de 2025",
+# "entre el 01/04/2025 y el 15/04/2025" y ventanas móviles ("últimos 30 días", "última semana")
+_INICIO_RANGO = r"\b(?:del|desde(?:\s+el)?|entre(?:\s+el)?)\s+"
+_FIN_RANGO = r"\s+(?:al|hasta(?:\s+el)?|y(?:\s+el)?)\s+"
+_DIA_MES = rf"(\d{{1,2}})\s+de\s+({_MESES_REGEX})(?:\s+(?:del|de)\s+(\d{{4}}))?"
+_PATRON_RANGO_MISMO_MES = re.compile(
+    rf"{_INICIO_RANGO}(\d{{1,2}}){_FIN_RANGO}(\d{{1,2}})\s+de\s+({_MESES_REGEX})(?:\s+(?:del|de)\s+(\d{{4}}))?"
+)
+_PATRON_RANGO_MESES = re.compile(rf"{_INICIO_RANGO}{_DIA_MES}{_FIN_RANGO}{_DIA_MES}")
+_PATRON_RANGO_NUMERICO = re.compile(
+    rf"{_INICIO_RANGO}(\d{{1,2}})/(\d{{1,2}})(?:/(\d{{2,4}}))?{_FIN_RANGO}(\d{{1,2}})/(\d{{1,2}})(?:/(\d{{2,4}}))?"
+)
+_PATRON_ULTIMOS = re.compile(r"\b(?:últimos|ultimos|últimas|ultimas)\s+(\d{1,3})\s+(días|dias|semanas|meses)\b")
+_PATRON_ULTIMA_SEMANA = re.compile(r"\b(última semana|ultima semana|semana pasada)\b")
+_PATRON_ESTA_SEMANA = re.compile(r"\besta semana\b")
+_PATRON_HOY = re.compile(r"\bhoy\b")
+_PATRON_AYER = re.compile(r"\bayer\b")
+
+def nombre_mes(numero: int) -> str:
+    return MESES[numero - 1]
+
+def numero_mes(nombre: str) -> int:
+    return NUMERO_MES_ALIAS.get(str(nombre or "").strip().lower(), 0)
+
+def texto_periodo(mes: str, año: int) -> str:
+    """Forma canónica con la que se guardan los periodos de las alertas: 'abril de 2025'."""
+    return f"{mes} de {año}"
+
+@lru_cache(maxsize=2048)
+def parse_periodo(texto: str, hoy: date, requiere_año: bool = False) -> Optional[Tuple[int, int]]:
+    """
+    Devuelve la clave canónica (año, mes) del periodo mencionado en `texto`, o None.
+    Sin año explícito se asume el de `hoy`, salvo con `requiere_año`.
+    `hoy` forma parte de la clave del caché, así que "este mes" no queda desactualizado.
+    """
+    texto = (texto or "").strip().lower()
+    if not texto:
+        return None
+
+    if _PATRON_ESTE_MES.search(texto):
+        return hoy.year, hoy.month
+    if _PATRON_MES_ANTERIOR.search(texto):
+        return (hoy.year, hoy.month - 1) if hoy.month > 1 else (hoy.year - 1, 12)
+
+    match = _PATRON_MES.search(texto)
+    if not match:
+        return None
+    if match.group(2):
+        return int(match.group(2)), NUMERO_MES_ALIAS[match.group(1)]
+    if requiere_año:
+        return None
+    return hoy.year, NUMERO_MES_ALIAS[match.group(1)]
+
+def interpretar_periodo(texto: Optional[str], requiere_año: bool = False) -> Tuple[Optional[str], Optional[int]]:
+    """(nombre del mes, año) del periodo en `texto`, o (None, None) si no se reconoce."""
+    clave = parse_periodo(texto or "", date.today(), requiere_año)
+    if clave is None:
+        return None, None
+    año, mes = clave
+    return nombre_mes(mes), año
+
+@lru_cache(maxsize=1024)
+def extraer_periodos(texto: str) -> Tuple[Tuple[int, int], ...]:
+    """
+    Todos los periodos con mes y año explícitos, en orden de aparición (para comparaciones).
+    Es una tupla: el caché entrega el mismo objeto a todos los que piden el mismo texto.
+    """
+    return tuple(
+        (int(año), NUMERO_MES_ALIAS[mes])
+        for mes, año in _PATRON_MES_CON_AÑO.findall((texto or "").lower())
+    )
+
+def _fecha(año, mes: int, dia) -> Optional[date]:
+    try:
+        return date(int(año), mes, int(dia))
+    except (TypeError, ValueError):
+        return None
+
+def año_completo(texto) -> Optional[int]:
+    """Año de cuatro cifras: '25' → 2025 (los de dos cifras se leen como 20xx)."""
+    if not texto:
+        return None
+    año = int(texto)
+    return año + 2000 if año < 100 else año
+
+def _restar_meses(dia: date, meses: int) -> date:
+    año, mes = divmod(dia.year * 12 + dia.month - 1 - meses, 12)
+    mes += 1
+    # 31 de marzo menos un mes → último día de febrero
+    return date(año, mes, min(dia.day, calendar.monthrange(año, mes)[1]))
+
+def _ordenar(desde: Optional[date], hasta: Optional[date]) -> Optional[Tuple[date, date]]:
+    if desde is None or hasta is None:
+        return None
+    return (desde, hasta) if desde <= hasta else (hasta, desde)
+
+@lru_cache(maxsize=1024)
+def parse_rango(texto: str, hoy: date) -> Optional[Tuple[date, date]]:
+    """
+    (desde, hasta), ambos inclusive, del rango de fechas o la ventana móvil mencionada en
+    `texto`, o None. Sin año explícito se asume el de `hoy` (el del final del rango, si solo
+    ese lo tiene). `hoy` forma parte de la clave del caché, como en `parse_periodo`.
+    """
+    texto = (texto or "").strip().lower()
+    if not texto:
+        return None
+
+    match = _PATRON_RANGO_MESES.search(texto)
+    if match:
+        dia1, mes1, año1, dia2, mes2, año2 = match.groups()
+        año2 = año_completo(año2) or hoy.year
+        mes1, mes2 = NUMERO_MES_ALIAS[mes1], NUMERO_MES_ALIAS[mes2]
+        # "del 20 de diciembre al 5 de enero de 2025": el inicio es del año anterior
+        año1 = año_completo(año1) or (año2 - 1 if mes1 > mes2 else año2)
+        return _ordenar(_fecha(año1, mes1, dia1), _fecha(año2, mes2, dia2))
+
+    match = _PATRON_RANGO_MISMO_MES.search(texto)
+    if match:
+        dia1, dia2, mes, año = match.groups()
+        año, mes = año_completo(año) or hoy.year, NUMERO_MES_ALIAS[mes]
+        return _ordenar(_fecha(año, mes, dia1), _fecha(año, mes, dia2))
+
+    match = _PATRON_RANGO_NUMERICO.search(texto)
+    if match:
+        dia1, mes1, año1, dia2, mes2, año2 = match.groups()
+        año2 = año_completo(año2) or hoy.year
+        año1 = año_completo(año1) or año2
+        return _ordenar(_fecha(año1, int(mes1), dia1), _fecha(año2, int(mes2), dia2))
+
+    match = _PATRON_ULTIMOS.search(texto)
+    if match:
+        cantidad, unidad = int(match.group(1)), match.group(2)
+        if cantidad <= 0:
+            return None
+        if unidad == "meses":
+            return _restar_meses(hoy, cantidad) + timedelta(days=1), hoy
+        dias = cantidad * 7 if unidad == "semanas" else cantidad
+        # "últimos 30 días" incluye hoy: 30 días en total
+        return hoy - timedelta(days=dias - 1), hoy
+
+    if _PATRON_ULTIMA_SEMANA.search(texto):
+        return hoy - timedelta(days=6), hoy
+    if _PATRON_ESTA_SEMANA.search(texto):
+        return hoy - timedelta(days=hoy.weekday()), hoy
+    # "hoy" y "ayer" son el rango solo si no se nombra un mes o periodo: en "hasta hoy en marzo"
+    # o "lo que registré ayer de abril" manda el mes
+    if parse_periodo(texto, hoy) is not None:
+        return None
+    if _PATRON_AYER.search(texto):
+        ayer = hoy - timedelta(days=1)
+        return ayer, ayer
+    if _PATRON_HOY.search(texto):
+        return hoy, hoy
+    return None
+
+def interpretar_rango(texto: Optional[str]) -> Optional[Tuple[date, date]]:
+    """(desde, hasta) del rango de fechas en `texto` ("del 1 al 15 de abril", "últimos 30 días"), o None."""
+    return parse_rango(texto or "", date.today())
+
+def texto_rango(desde: date, hasta: date) -> str:
+    """'del 1 al 15 de abril de 2025', 'del 28 de marzo al 3 de abril de 2025' o 'el 5 de abril de 2025'."""
+    if desde == hasta:
+        return f"el {desde.day} de {nombre_mes(desde.month)} de {desde.year}"
+    if (desde.year, desde.month) == (hasta.year, hasta.month):
+        return f"del {desde.day} al {hasta.day} de {nombre_mes(hasta.month)} de {hasta.year}"
+    if desde.year == hasta.year:
+        return f"del {desde.day} de {nombre_mes(desde.month)} al {hasta.day} de {nombre_mes(hasta.month)} de {hasta.year}"
+    return (
+        f"del {desde.day} de {nombre_mes(desde.month)} de {desde.year} "
+        f"al {hasta.day} de {nombre_mes(hasta.month)} de {hasta.year}"
+    )
+
+def mes_actual() -> Tuple[str, int]:
+    hoy = date.today()
+    return nombre_mes(hoy.month), hoy.year
+
+def formatear_fecha(fecha: str) -> str:
+    """'05/04/2025' (o '05/04/25') → '5 de abril de 2025'. Si no tiene ese formato se devuelve tal cual."""
+    match = _PATRON_FECHA.match(fecha or "")
+    if not match or not match.group(3):
+        return fecha
+    dia, mes, año = match.groups()
+    mes = int(mes)
+    if not 1 <= mes <= 12:
+        return fecha
+    return f"{int(dia)} de {nombre_mes(mes)} de {año_completo(año)}"
@@ -0,0 +1,190 @@
+# actions/registros.py
+# Representación compacta en memoria de transacciones y alertas.
+#
+# Un dict por registro arrastra su propia tabla de claves (con espacio libre) en cada una de
+# las miles de transacciones. `Transaccion` y `Alerta` guardan los campos conocidos en
+# __slots__ (sin __dict__) y los campos categóricos (tipo, categoría, medio, mes, periodo)
+# como cadenas internadas, compartidas por todos los registros con el mismo valor.
+# Se comportan como diccionarios (t["monto"], t.get("dia"), t.update(...), dict(t)),
+# así que el resto del código los usa igual que antes.
+#
+# Memoria por registro, dict frente a registro compacto:
+#   python registros.py --benchmark 100000
+
+import argparse
+import gc
+import json
+import sys
+import tracemalloc
+from collections.abc import MutableMapping
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+class Registro(MutableMapping):
+    """Base de los registros compactos: campos en slots y, si aparece alguno desconocido, en `_extra`."""
+
+    __slots__ = ("_extra",)
+    CAMPOS: Tuple[str, ...] = ()
+    CATEGORICOS: FrozenSet[str] = frozenset()
+    _conjunto: FrozenSet[str] = frozenset()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._conjunto = frozenset(cls.CAMPOS)
+
+    def __init__(self, datos: Optional[Dict[str, Any]] = None):
+        self._extra = None
+        for clave, valor in (datos or {}).items():
+            self[clave] = valor
+
+    @classmethod
+    def desde(cls, registro):
+        """El mismo objeto si ya es de este tipo; si no, una copia compacta del diccionario."""
+        return registro if isinstance(registro, cls) else cls(registro)
+
+    def __getitem__(self, clave):
+        if clave in self._conjunto:
+            try:
+                return getattr(self, clave)
+            except AttributeError:
+                raise KeyError(clave) from None
+        if self._extra is not None and clave in self._extra:
+            return self._extra[clave]
+        raise KeyError(clave)
+
+    def __setitem__(self, clave, valor):
+        if clave in self._conjunto:
+            if clave in self.CATEGORICOS and type(valor) is str:
+                valor = sys.intern(valor)
+            setattr(self, clave, valor)
+            return
+        if self._extra is None:
+            self._extra = {}
+        self._extra[clave] = valor
+
+    def __delitem__(self, clave):
+        if clave in self._conjunto:
+            try:
+                delattr(self, clave)
+                return
+            except AttributeError:
+                raise KeyError(clave) from None
+        if self._extra is None or clave not in self._extra:
+            raise KeyError(clave)
+        del self._extra[clave]
+
+    def __iter__(self):
+        for campo in self.CAMPOS:
+            if hasattr(self, campo):
+                yield campo
+        if self._extra:
+            yield from self._extra
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    # Atajos: las versiones genéricas de MutableMapping pasan por excepciones
+    def __contains__(self, clave) -> bool:
+        if clave in self._conjunto:
+            return hasattr(self, clave)
+        return self._extra is not None and clave in self._extra
+
+    def get(self, clave, defecto=None):
+        if clave in self._conjunto:
+            return getattr(self, clave, defecto)
+        return self._extra.get(clave, defecto) if self._extra is not None else defecto
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({dict(self)!r})"
+
+class Transaccion(Registro):
+    # En el orden en que se escriben en transacciones.json
+    CAMPOS = (
+        "tipo", "monto", "categoria", "fecha", "medio", "dia", "mes", "año", "timestamp",
+        "status", "id", "mes_num", "fecha_ord", "timestamp_modificacion",
+    )
+    CATEGORICOS = frozenset(("tipo", "categoria", "medio", "mes"))
+    __slots__ = CAMPOS
+
+class Alerta(Registro):
+    CAMPOS = (
+        "categoria", "monto", "periodo", "mes", "año", "timestamp", "status", "id", "mes_num",
+        "timestamp_modificacion",
+    )
+    CATEGORICOS = frozenset(("categoria", "periodo", "mes"))
+    __slots__ = CAMPOS
+
+def compactar(registros: Iterable[dict], tipo=Transaccion) -> List[Registro]:
+    return [tipo.desde(r) for r in registros]
+
+def serializable(valor):
+    """`default` para json.dumps: los registros compactos se escriben como diccionarios."""
+    if isinstance(valor, Registro):
+        return dict(valor)
+    raise TypeError(f"Object of type {type(valor).__name__} is not JSON serializable")
+
+# ---------- BENCHMARK DE MEMORIA ----------
+def _documento_sintetico(cantidad: int) -> str:
+    """Transacciones normalizadas (esquema v2) con la variedad de valores de un historial real."""
+    categorias = ["comida", "transporte", "ropa", "salud", "entretenimiento", "educación", "sueldo", "servicios"]
+    medios = ["efectivo", "tarjeta", "yape", "plin", "transferencia"]
+    meses = ["enero", "febrero", "marzo", "abril", "mayo", "junio",
+             "julio", "agosto", "septiembre", "octubre", "noviembre", "diciembre"]
+    registros = []
+    for i in range(cantidad):
+        mes_num = i % 12 + 1
+        dia = i % 28 + 1
+        registros.append({
+            "tipo": "ingreso" if i % 10 == 0 else "gasto",
+            "monto": round(5 + (i * 37 % 1000) / 3, 2),
+            "categoria": categorias[i % len(categorias)],
+            "fecha": f"{dia} de {meses[mes_num - 1]}",
+            "medio": medios[i % len(medios)],
+            "dia": dia,
+            "mes": meses[mes_num - 1],
+            "año": 2020 + i % 6,
+            "timestamp": f"2025-{mes_num:02d}-{dia:02d}T12:{i % 60:02d}:{i % 60:02d}.{i % 1000000:06d}",
+            "status": 1,
+            "id": f"01J{i:023d}",
+            "mes_num": mes_num,
+            "fecha_ord": 737000 + i % 2000,
+        })
+    return json.dumps(registros, ensure_ascii=False)
+
+def _memoria(construir) -> Tuple[int, Any]:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        resultado = construir()
+        gc.collect()
+        return tracemalloc.get_traced_memory()[0], resultado
+    finally:
+        tracemalloc.stop()
+
+def medir_memoria(cantidad: int = 100_000) -> Dict[str, float]:
+    """Bytes por registro (incluidos sus valores) tras un json.load, como dicts y como Transaccion."""
+    documento = _documento_sintetico(cantidad)
+    bytes_dicts, dicts = _memoria(lambda: json.loads(documento))
+    del dicts
+    bytes_compactos, compactos = _memoria(lambda: compactar(json.loads(documento)))
+    del compactos
+
+    resultado = {
+        "registros": cantidad,
+        "bytes_por_dict": bytes_dicts / cantidad,
+        "bytes_por_transaccion": bytes_compactos / cantidad,
+        "ahorro": 1 - bytes_compactos / bytes_dicts,
+    }
+    print(f"Memoria de {cantidad} transacciones en memoria:")
+    print(f"  dict          {bytes_dicts / 2**20:>8.1f} MiB  ({resultado['bytes_por_dict']:.0f} B/registro)")
+    print(f"  Transaccion   {bytes_compactos / 2**20:>8.1f} MiB  ({resultado['bytes_por_transaccion']:.0f} B/registro)")
+    print(f"  ahorro        {resultado['ahorro']:.0%}")
+    return resultado
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Registros compactos de transacciones y alertas.")
+    parser.add_argument("--benchmark", type=int, metavar="N", help="Mide la memoria por registro con N transacciones")
+    args = parser.parse_args()
+    if args.benchmark:
+        medir_memoria(args.benchmark)
+    else:
+        parser.print_help()
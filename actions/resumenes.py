@@ -0,0 +1,101 @@
+# actions/resumenes.py
+# Totales de transacciones activas agregados por (año, mes, tipo, categoria, medio).
+#
+# Se mantienen de forma incremental en cada alta y baja lógica, de modo que saldo,
+# control de presupuesto y comparación de meses no recorren el historial completo.
+# Las transacciones llegan normalizadas (esquema.py), así que sus campos se usan tal cual;
+# solo los filtros, que vienen del usuario, se normalizan aquí.
+
+from collections import defaultdict
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+DIMENSIONES = ("año", "mes", "tipo", "categoria", "medio")
+
+# Combinaciones que consultan las acciones; cada una se responde con un solo acceso al diccionario
+PROYECCIONES = (
+    ("tipo",),
+    ("tipo", "medio"),
+    ("año", "mes", "tipo"),
+    ("año", "mes", "tipo", "categoria"),
+    DIMENSIONES,
+)
+
+def _texto(valor) -> str:
+    return str(valor or "").strip().lower()
+
+def _anio(valor) -> int:
+    try:
+        return int(str(valor).replace(",", ""))
+    except (TypeError, ValueError):
+        return 0
+
+def normalizar_filtro(dimension: str, valor):
+    return _anio(valor) if dimension == "año" else _texto(valor)
+
+def clave_resumen(t: Dict[str, Any]) -> Tuple:
+    return t["año"], t["mes"], t["tipo"], t["categoria"], t["medio"]
+
+class ResumenesMensuales:
+    def __init__(self):
+        self._tablas: Dict[Tuple[str, ...], Dict[Tuple, float]] = {
+            dims: defaultdict(float) for dims in PROYECCIONES
+        }
+        # Cantidad de transacciones activas por clave completa (para promedios y conteos)
+        self._conteos: Dict[Tuple, int] = defaultdict(int)
+
+    def reconstruir(self, registros: Iterable[Dict[str, Any]]):
+        for tabla in self._tablas.values():
+            tabla.clear()
+        self._conteos.clear()
+        for t in registros:
+            if t["status"] == 1:
+                self.aplicar(t, 1)
+
+    def aplicar(self, t: Dict[str, Any], signo: int):
+        """Suma (`signo=1`, alta) o resta (`signo=-1`, baja lógica) una transacción."""
+        clave_completa = clave_resumen(t)
+        completa = dict(zip(DIMENSIONES, clave_completa))
+        monto = signo * t["monto"]
+        self._conteos[clave_completa] += signo
+        if self._conteos[clave_completa] <= 0:
+            del self._conteos[clave_completa]
+        for dims, tabla in self._tablas.items():
+            clave = tuple(completa[d] for d in dims)
+            tabla[clave] += monto
+            # Evita arrastrar residuos de coma flotante en claves que quedaron en cero
+            if abs(tabla[clave]) < 1e-9:
+                del tabla[clave]
+
+    def total(self, **filtros) -> float:
+        filtros = {
+            dimension: normalizar_filtro(dimension, valor)
+            for dimension, valor in filtros.items()
+            if valor not in (None, "")
+        }
+        dims = tuple(d for d in DIMENSIONES if d in filtros)
+        if dims in self._tablas:
+            return self._tablas[dims].get(tuple(filtros[d] for d in dims), 0.0)
+
+        # Combinación sin proyección propia: se recorren las claves, no las transacciones
+        posiciones = [(DIMENSIONES.index(d), v) for d, v in filtros.items()]
+        return sum(
+            monto for clave, monto in self._tablas[DIMENSIONES].items()
+            if all(clave[i] == v for i, v in posiciones)
+        )
+
+    def totales_por_mes(self, tipo: str, año: Optional[int] = None) -> Dict[Tuple[int, str], float]:
+        tipo = _texto(tipo)
+        return {
+            (año_c, mes_c): monto
+            for (año_c, mes_c, tipo_c), monto in self._tablas[("año", "mes", "tipo")].items()
+            if tipo_c == tipo and (año is None or año_c == año)
+        }
+
+    def agregados(self) -> Iterator[Tuple[Tuple, float, int]]:
+        """(clave completa, total, cantidad) de cada combinación con transacciones activas."""
+        totales = self._tablas[DIMENSIONES]
+        for clave, cantidad in self._conteos.items():
+            yield clave, totales.get(clave, 0.0), cantidad
+
+    def instantanea(self) -> Dict[Tuple, float]:
+        return dict(self._tablas[DIMENSIONES])
@@ -1,131 +1,734 @@
+import argparse
+import contextvars
 import json
 import os
-from datetime import datetime
-import requests
-import base64
-
-# Ruta local al archivo transacciones.json dentro del contenedor
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+import numpy as np
+import almacen_sqlite
+import particiones
+from periodos import MESES, nombre_mes, numero_mes
+from asincrono import en_hilo
+from escritor import escritor
+from columnas import CAMPOS_ORDEN, MarcoColumnar
+from esquema import cargar_documento, normalizar_transaccion, serializar
+from identificadores import asegurar_ids, diferencias_por_id, nuevo_id
+from registros import Transaccion, compactar, serializable
+from github_sync import descargar_si_cambio, encolar_subida, escribir_atomico, hay_subida_pendiente, registrar_fusionador, ACTUALIZADO
+from resumenes import DIMENSIONES, ResumenesMensuales, clave_resumen
+from usuarios import PorUsuario, como_usuario, ruta_local, ruta_remota
+
+# Ruta local al archivo transacciones.json dentro del contenedor (la del usuario legado;
+# cada usuario tiene la suya, ver EspacioTransacciones y usuarios.py)
 RUTA_TRANSACCIONES = "/tmp/transacciones.json"
 
 # GitHub API
 REPO = "MaximoGuzmanH/chatbot-financiero"
 ARCHIVO_GITHUB = "transacciones.json"
 TOKEN = os.getenv("GITHUB_TOKEN")
-SINCRONIZADO = False  # Indica si ya se descargó el archivo desde GitHub
-
-# Constante global reutilizable
-MESES = [
-    "enero", "febrero", "marzo", "abril", "mayo", "junio",
-    "julio", "agosto", "septiembre", "octubre", "noviembre", "diciembre"
-]
 
-def subir_a_github(ruta_local, repo, archivo_remoto, token):
-    if not token:
-        print("[WARN] TOKEN de GitHub no disponible. No se subirá el archivo.")
-        return
-
-    with open(ruta_local, "r", encoding="utf-8") as f:
-        contenido = f.read()
+# Segundos que una lectura puede reutilizar la copia en memoria sin volver a consultar GitHub
+TTL_TRANSACCIONES = float(os.getenv("TRANSACCIONES_TTL", "60"))
 
-    headers = {
-        "Authorization": f"token {token}",
-        "Accept": "application/vnd.github+json"
-    }
+# Modo de almacenamiento local: "json" (reescritura completa), "journal" (JSONL append-only),
+# "sqlite" (base indexada en SQLITE_RUTA; transacciones.json queda como espejo para GitHub)
+# o "mensual" (un archivo por mes más un manifiesto; ver particiones.py)
+MODO_ALMACENAMIENTO = os.getenv("TRANSACCIONES_MODO", "json").lower()
+RUTA_JOURNAL = "/tmp/transacciones.jsonl"
+# El volcado a transacciones.json (compactación del journal o exportación de SQLite)
+# se dispara al llegar a N operaciones o, como máximo, tras estos segundos
+UMBRAL_COMPACTACION = int(os.getenv("TRANSACCIONES_UMBRAL_COMPACTACION", "200"))
+INTERVALO_COMPACTACION = float(os.getenv("TRANSACCIONES_INTERVALO_COMPACTACION", "30"))
 
-    url_base = f"https://api.github.com/repos/{repo}/contents/{archivo_remoto}"
-
-    resp = requests.get(url_base, headers=headers)
-    sha = resp.json().get("sha") if resp.status_code == 200 else None
-
-    payload = {
-        "message": f"Actualización automática de {archivo_remoto}",
-        "content": base64.b64encode(contenido.encode()).decode("utf-8"),
-        "branch": "main"
-    }
-    if sha:
-        payload["sha"] = sha
-
-    response = requests.put(url_base, headers=headers, json=payload)
-    if response.status_code not in [200, 201]:
-        print(f"[ERROR] GitHub update failed: {response.status_code} - {response.text}")
-    else:
-        print(f"[OK] Archivo {archivo_remoto} actualizado en GitHub")
 
 def descargar_de_github():
-    global SINCRONIZADO
-    url = f"https://raw.githubusercontent.com/{REPO}/main/{ARCHIVO_GITHUB}"
+    espacio = espacio_actual()
+    url = f"https://raw.githubusercontent.com/{REPO}/main/{espacio.archivo_github}"
 
-    try:
-        response = requests.get(url)
-
-        if response.status_code != 200:
-            print(f"[WARN] No se pudo descargar el archivo desde GitHub ({response.status_code})")
-            return False
+    # 🛑 En modo journal, lo local manda mientras haya operaciones sin compactar
+    if hay_journal_pendiente():
+        print("[INFO] Hay operaciones en el journal sin compactar. No se sobrescribirá transacciones.json.")
+        return False
 
-        nuevo_contenido = response.text
+    # 🛑 Si hay una subida en el outbox, la copia local es más nueva que la de GitHub
+    if hay_subida_pendiente(espacio.archivo_github):
+        print("[INFO] transacciones.json tiene cambios pendientes de subir. No se sobrescribirá.")
+        return False
 
+    def contenido_valido(contenido):
         # 🛑 Validación: archivo remoto vacío
-        if not nuevo_contenido.strip():
+        if not contenido.strip():
             print("[WARN] El archivo remoto está vacío. No se sobrescribirá localmente.")
             return False
+        return True
 
-        # 🔄 Eliminar archivo local si existe
-        if os.path.exists(RUTA_TRANSACCIONES):
-            try:
-                os.remove(RUTA_TRANSACCIONES)
-                print("[INFO] Archivo transacciones.json eliminado antes de sincronizar.")
-            except Exception as e:
-                print(f"[ERROR] No se pudo eliminar archivo local: {e}")
-                return False
-
-        # 💾 Guardar el nuevo archivo sincronizado
-        with open(RUTA_TRANSACCIONES, "w", encoding="utf-8") as f:
-            f.write(nuevo_contenido)
+    try:
+        # 📡 GET condicional: un 304 evita descargar, reescribir y volver a parsear
+        estado = descargar_si_cambio(url, espacio.ruta, validar=contenido_valido, ruta_destino=espacio.archivo_github)
+        if estado is None:
+            return False
 
-        SINCRONIZADO = True
-        print("[INFO] transacciones.json sincronizado correctamente desde GitHub")
+        if estado == ACTUALIZADO:
+            print("[INFO] transacciones.json sincronizado correctamente desde GitHub")
         return True
 
     except Exception as e:
         print(f"[ERROR] Al intentar sincronizar desde GitHub: {e}")
         return False
 
-def cargar_transacciones(filtrar_activos=True, sincronizar=True):
-    if sincronizar:
-        if not descargar_de_github():
-            print("[ERROR] No se pudo sincronizar transacciones antes de consulta")
-            return []
-
-    if not os.path.exists(RUTA_TRANSACCIONES):
+def leer_archivo_transacciones(ruta=None):
+    ruta = ruta or espacio_actual().ruta
+    if not os.path.exists(ruta):
         return []
 
     try:
-        with open(RUTA_TRANSACCIONES, "r", encoding="utf-8") as f:
+        with open(ruta, "r", encoding="utf-8") as f:
             try:
-                contenido = json.load(f)
-                if not isinstance(contenido, list):
-                    print("[WARN] El contenido del archivo no es una lista. Se ignorará.")
-                    return []
-                return [t for t in contenido if t.get("status", 1) == 1] if filtrar_activos else contenido
+                # Los archivos de versiones anteriores del esquema se migran al leerlos
+                return cargar_documento(json.load(f), "transacciones")
             except json.JSONDecodeError as e:
                 print(f"[ERROR] No se pudo decodificar JSON: {e}")
                 return []
+            except ValueError as e:
+                print(f"[WARN] {e}. Se ignorará.")
+                return []
     except Exception as e:
         print(f"[ERROR] No se pudo leer el archivo local: {e}")
         return []
 
-def guardar_transaccion(transaccion):
-    # 🔄 Paso 1: sincronizar ANTES de leer
-    descargar_de_github()
+# ---------- JOURNAL (JSONL) ----------
+def hay_journal_pendiente() -> bool:
+    espacio = espacio_actual()
+    return any(
+        os.path.exists(ruta) and os.path.getsize(ruta) > 0
+        for ruta in (espacio.ruta_journal, espacio.ruta_journal_rotado)
+    )
+
+def leer_journal(ruta=None) -> List[dict]:
+    ruta = ruta or espacio_actual().ruta_journal
+    if not os.path.exists(ruta):
+        return []
+
+    operaciones = []
+    with open(ruta, "r", encoding="utf-8") as f:
+        for numero, linea in enumerate(f, start=1):
+            linea = linea.strip()
+            if not linea:
+                continue
+            try:
+                operaciones.append(json.loads(linea))
+            except json.JSONDecodeError:
+                # Una línea truncada solo puede venir de una escritura interrumpida
+                print(f"[WARN] Línea {numero} del journal ilegible. Se ignorará.")
+    return operaciones
+
+def aplicar_operaciones(registros: List[dict], operaciones: List[dict]) -> List[dict]:
+    """
+    Reproduce sobre `registros` las operaciones del journal.
+    Es idempotente: una alta ya presente o una baja repetida no alteran el resultado.
+    Las bajas se identifican por `id`; las escritas antes de los ids, por el timestamp (`clave`).
+    """
+    asegurar_ids(registros)
+    por_id = {t["id"]: t for t in registros}
+    por_timestamp = {t.get("timestamp"): t for t in registros}
+    for op in operaciones:
+        if op.get("op") == "alta":
+            registro = op.get("registro", {})
+            # Las altas escritas antes del esquema v2 no vienen normalizadas
+            if "fecha_ord" not in registro:
+                normalizar_transaccion(registro)
+            asegurar_ids([registro])
+            if registro["id"] not in por_id and registro.get("timestamp") not in por_timestamp:
+                registros.append(registro)
+                por_id[registro["id"]] = registro
+                por_timestamp[registro.get("timestamp")] = registro
+        elif op.get("op") == "status":
+            if "id" in op:
+                transaccion = por_id.get(op["id"])
+            else:
+                transaccion = por_timestamp.get(op.get("clave"))
+            if transaccion is not None:
+                transaccion["status"] = op.get("status", 0)
+                transaccion["timestamp_modificacion"] = op.get("timestamp_modificacion")
+    return registros
+
+def _anexar_journal(operaciones: List[dict]):
+    with open(espacio_actual().ruta_journal, "a", encoding="utf-8") as f:
+        for op in operaciones:
+            f.write(json.dumps(op, ensure_ascii=False, default=serializable) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+class TransactionStore:
+    """
+    Copia en memoria de las transacciones ya parseadas.
+
+    Solo se vuelve a llamar a `cargador` cuando cambia la versión local (mtime y tamaño
+    de `rutas`) y solo se consulta GitHub cuando vence la ventana de frescura `ttl`.
+    Junto a los registros mantiene `resumenes`, los totales mensuales de las activas,
+    un índice id → posición (los registros solo se agregan al final, nunca se quitan) y un
+    índice por fecha: las posiciones ordenadas por (fecha_ord, timestamp) junto a sus fechas,
+    de modo que las transacciones de un rango salen con bisect en O(log N + k).
+    Los registros se guardan como `Transaccion` (slots, ver registros.py), que se usan
+    igual que un diccionario. `marco()` da la vista columnar (columnas.py) de esa misma lista.
+    """
+
+    def __init__(self, rutas, ttl: float, cargador, sincronizador=None):
+        self.rutas = tuple(rutas)
+        self.ttl = ttl
+        self._cargador = cargador
+        self._sincronizador = sincronizador
+        self._registros: Optional[List[dict]] = None
+        self.resumenes = ResumenesMensuales()
+        self._posiciones: Dict[str, int] = {}
+        # Arreglos paralelos de enteros de 64 bits (sin un objeto int por registro)
+        self._fechas = array("q")
+        self._por_fecha = array("q")
+        self._marco: Optional[MarcoColumnar] = None
+        self._version = None
+        self._sincronizado_en: Optional[float] = None
+        # Público: las escrituras del journal lo toman para serializarse con las lecturas
+        self.lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+
+    def _version_local(self):
+        version = []
+        for ruta in self.rutas:
+            try:
+                info = os.stat(ruta)
+                version.append((info.st_mtime_ns, info.st_size))
+            except OSError:
+                version.append(None)
+        return tuple(version)
+
+    def vencido(self) -> bool:
+        if self._sincronizado_en is None:
+            return True
+        return time.monotonic() - self._sincronizado_en >= self.ttl
+
+    def obtener(self, sincronizar: bool = True) -> List[dict]:
+        with self.lock:
+            if sincronizar and self.vencido() and self._sincronizador:
+                if not self._sincronizador():
+                    print("[WARN] No se pudo sincronizar transacciones; se usará la copia local")
+                # Aunque falle, no se reintenta hasta que vuelva a vencer la ventana
+                self._sincronizado_en = time.monotonic()
+
+            version = self._version_local()
+            if self._registros is not None and version == self._version:
+                self.hits += 1
+                return self._registros
+
+            self.misses += 1
+            self._registros = compactar(self._cargador())
+            self._indexar()
+            self.resumenes.reconstruir(self._registros)
+            self._version = version
+            return self._registros
+
+    def _indexar(self):
+        asegurar_ids(self._registros)
+        self._posiciones = {t["id"]: posicion for posicion, t in enumerate(self._registros)}
+        registros, clave = self._registros, _clave_orden("fecha")
+        orden = sorted(range(len(registros)), key=lambda p: clave(registros[p]))
+        self._por_fecha = array("q", orden)
+        self._fechas = array("q", (registros[p]["fecha_ord"] or 0 for p in orden))
+
+    def _indexar_fecha(self, t: dict, posicion: int):
+        fecha = t["fecha_ord"] or 0
+        # Una alta fusionada desde GitHub puede ser más antigua que las locales de su misma fecha:
+        # dentro de esa fecha se busca por la clave completa (fecha_ord, timestamp)
+        inicio = bisect_left(self._fechas, fecha)
+        fin = bisect_right(self._fechas, fecha, lo=inicio)
+        registros, clave = self._registros, _clave_orden("fecha")
+        indice = bisect_right(self._por_fecha, clave(t), inicio, fin, key=lambda p: clave(registros[p]))
+        self._fechas.insert(indice, fecha)
+        self._por_fecha.insert(indice, posicion)
+
+    def marco(self, sincronizar: bool = True) -> MarcoColumnar:
+        """Vista columnar de la copia en memoria; se construye al primer uso y luego solo suma las altas."""
+        with self.lock:
+            registros = self.obtener(sincronizar=sincronizar)
+            if self._marco is None or self._marco.registros is not registros:
+                self._marco = MarcoColumnar(registros)
+            else:
+                self._marco.sincronizar()
+            return self._marco
+
+    def posiciones_en_rango(self, desde: int, hasta: int, sincronizar: bool = True) -> np.ndarray:
+        """
+        Posiciones de las transacciones (activas o no) con fecha_ord entre `desde` y `hasta`,
+        ambos inclusive, en orden cronológico: dos búsquedas binarias y una copia de k enteros.
+        """
+        with self.lock:
+            self.obtener(sincronizar=sincronizar)
+            inicio = bisect_left(self._fechas, desde)
+            fin = bisect_right(self._fechas, hasta, lo=inicio)
+            return np.frombuffer(self._por_fecha[inicio:fin], dtype=np.int64)
+
+    def buscar_por_id(self, id_registro: str, sincronizar: bool = False) -> Optional[dict]:
+        """El registro (activo o no) con ese id, en O(1), o None."""
+        with self.lock:
+            registros = self.obtener(sincronizar=sincronizar)
+            posicion = self._posiciones.get(id_registro)
+            return registros[posicion] if posicion is not None else None
+
+    def reemplazar(self, registros: List[dict]):
+        """Actualiza la copia en memoria tras una escritura local, sin volver a parsear el archivo."""
+        with self.lock:
+            self._registros = compactar(registros)
+            self._indexar()
+            self.resumenes.reconstruir(registros)
+            self._version = self._version_local()
+
+    def aplicar_cambios(self, altas=(), bajas=()):
+        """
+        Refleja en memoria altas y bajas lógicas ya persistidas, actualizando los
+        resúmenes de forma incremental en lugar de releer el almacenamiento.
+        Las bajas deben ser los mismos diccionarios de la copia en memoria, ya con status 0.
+        """
+        with self.lock:
+            if self._registros is None:
+                self._version = None
+                return
+            for t in altas:
+                t = Transaccion.desde(t)
+                asegurar_ids([t])
+                self._posiciones[t["id"]] = len(self._registros)
+                self._indexar_fecha(t, len(self._registros))
+                self._registros.append(t)
+                if t.get("status", 1) == 1:
+                    self.resumenes.aplicar(t, 1)
+            for t in bajas:
+                self.resumenes.aplicar(t, -1)
+                if self._marco is not None and t["id"] in self._posiciones:
+                    self._marco.marcar_status(self._posiciones[t["id"]], t["status"])
+            self._version = self._version_local()
+
+    def marcar_vigente(self):
+        """Da por vigente la copia en memoria tras reescribir archivos cuyo contenido ya refleja."""
+        with self.lock:
+            self._version = self._version_local()
+
+    def invalidar(self):
+        with self.lock:
+            self._registros = None
+            self._posiciones = {}
+            self._fechas = array("q")
+            self._por_fecha = array("q")
+            self._marco = None
+            self._version = None
+            self._sincronizado_en = None
+
+    def estadisticas(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 3) if total else 0.0,
+            "registros": len(self._registros or []),
+        }
+
+def _cargar_desde_archivos() -> List[dict]:
+    espacio = espacio_actual()
+    registros = leer_archivo_transacciones(espacio.ruta)
+    if MODO_ALMACENAMIENTO == "journal":
+        for ruta in (espacio.ruta_journal_rotado, espacio.ruta_journal):
+            aplicar_operaciones(registros, leer_journal(ruta))
+    return registros
+
+def _cargar_desde_sqlite() -> List[dict]:
+    # 🆕 Base vacía (primer arranque): se llena con el espejo JSON de GitHub
+    if almacen_sqlite.contar("transacciones") == 0:
+        descargar_de_github()
+        almacen_sqlite.insertar_transacciones(leer_archivo_transacciones(espacio_actual().ruta))
+    return almacen_sqlite.buscar_transacciones(filtrar_activos=False)
+
+class EspacioTransacciones:
+    """
+    Las transacciones de un usuario: sus rutas locales y en GitHub, su copia en memoria y
+    el estado del volcado a transacciones.json. Los cargadores del store leen del usuario
+    actual, que es siempre el dueño del espacio (las lecturas pasan por `espacio_actual()`).
+    """
+
+    def __init__(self, usuario: str):
+        self.usuario = usuario
+        self.ruta = ruta_local(RUTA_TRANSACCIONES, usuario)
+        self.archivo_github = ruta_remota(ARCHIVO_GITHUB, usuario)
+        self.ruta_journal = ruta_local(RUTA_JOURNAL, usuario)
+        self.ruta_journal_rotado = self.ruta_journal + ".compactando"
+        # Volcado pendiente (journal / sqlite): ver _programar_volcado
+        self.temporizador: Optional[threading.Timer] = None
+        self.operaciones_sin_compactar = 0
+        self.compactando = threading.Lock()
+
+        if MODO_ALMACENAMIENTO == "sqlite":
+            # SQLite es la fuente de verdad: no se vuelve a sincronizar desde GitHub en cada lectura
+            self.store = TransactionStore(almacen_sqlite.rutas_version(usuario), TTL_TRANSACCIONES, _cargar_desde_sqlite)
+        elif MODO_ALMACENAMIENTO == "mensual":
+            # Cada escritura reescribe el manifiesto, así que basta con vigilar ese archivo
+            self.store = TransactionStore(
+                (particiones.ruta_manifest(usuario),), TTL_TRANSACCIONES, particiones.cargar_todas,
+                sincronizador=particiones.sincronizar,
+            )
+        elif MODO_ALMACENAMIENTO == "journal":
+            self.store = TransactionStore(
+                (self.ruta, self.ruta_journal_rotado, self.ruta_journal),
+                TTL_TRANSACCIONES,
+                _cargar_desde_archivos,
+                sincronizador=descargar_de_github,
+            )
+        else:
+            self.store = TransactionStore(
+                (self.ruta,), TTL_TRANSACCIONES, _cargar_desde_archivos, sincronizador=descargar_de_github
+            )
+
+_espacios = PorUsuario(EspacioTransacciones)
+
+def espacio_actual() -> EspacioTransacciones:
+    return _espacios.obtener()
+
+def store_transacciones() -> TransactionStore:
+    """La copia en memoria de las transacciones del usuario actual."""
+    return espacio_actual().store
 
-    # 📥 Paso 2: cargar lo que AHORA está en local (ya sincronizado)
+def cargar_transacciones(filtrar_activos=True, sincronizar=True):
+    # Devuelve los `Transaccion` de la copia en memoria: se leen como diccionarios y `dict(t)` da una copia
+    store = store_transacciones()
+    # Bajo el lock: la lista refleja un estado completo, no un lote del escritor a medio aplicar
+    with store.lock:
+        transacciones = store.obtener(sincronizar=sincronizar)
+        if filtrar_activos:
+            return [t for t in transacciones if t["status"] == 1]
+        return list(transacciones)
+
+def _normalizar_texto(valor) -> str:
+    return str(valor or "").strip().lower()
+
+def buscar_transacciones(tipo=None, categoria=None, medio=None, mes=None, año=None, filtrar_activos=True):
+    """
+    Filtra por igualdad (sin distinguir mayúsculas) sobre tipo, categoría, medio, mes y año.
+    En modo sqlite se resuelve con los índices de la base; en los demás, en una sola pasada.
+    """
+    if MODO_ALMACENAMIENTO == "sqlite":
+        return almacen_sqlite.buscar_transacciones(tipo, categoria, medio, mes, año, filtrar_activos)
+
+    filtros = [
+        (campo, _normalizar_texto(valor))
+        for campo, valor in (("tipo", tipo), ("categoria", categoria), ("medio", medio), ("mes", mes))
+        if valor
+    ]
+    año = int(año) if año is not None else None
+    # Los registros ya están normalizados (minúsculas, año entero): se comparan tal cual
+    store = store_transacciones()
+    with store.lock:
+        return [
+            t for t in store.obtener()
+            if (not filtrar_activos or t["status"] == 1)
+            and all(t[campo] == valor for campo, valor in filtros)
+            and (año is None or t["año"] == año)
+        ]
+
+def obtener_resumenes() -> ResumenesMensuales:
+    store = store_transacciones()
+    store.obtener()
+    return store.resumenes
+
+def reconstruir_resumenes() -> int:
+    """
+    Recalcula los resúmenes desde las transacciones en memoria para corregir cualquier
+    desfase. Devuelve cuántas claves tenían un total distinto.
+    """
+    store = store_transacciones()
+    with store.lock:
+        registros = store.obtener(sincronizar=False)
+        anterior = store.resumenes.instantanea()
+        store.resumenes.reconstruir(registros)
+        actual = store.resumenes.instantanea()
+
+    desfasadas = sum(
+        1 for clave in set(anterior) | set(actual)
+        if abs(anterior.get(clave, 0.0) - actual.get(clave, 0.0)) > 1e-6
+    )
+    print(f"[INFO] Resúmenes reconstruidos ({len(actual)} claves, {desfasadas} con desfase)")
+    return desfasadas
+
+# ---------- CONSULTAS ----------
+def _clave_orden(campo: str):
+    if campo == "fecha":
+        # Fecha del movimiento y, a igual fecha, orden de registro
+        return lambda t: (t["fecha_ord"] or 0, t.get("timestamp") or "")
+    if campo == "monto":
+        return lambda t: t["monto"]
+    return lambda t: t.get(campo) or ""
+
+def _acotar_por_fecha(desde: Optional[int], hasta: Optional[int]) -> Optional[np.ndarray]:
+    """Posiciones del rango según el índice por fecha (None sin rango: se evalúan todas las filas)."""
+    if desde is None:
+        return None
+    return store_transacciones().posiciones_en_rango(desde, hasta, sincronizar=False)
+
+def consultar(
+    tipo: Union[str, Sequence[str], None] = None,
+    categoria: Optional[str] = None,
+    medio: Optional[str] = None,
+    periodo: Optional[Tuple[int, Union[int, str, None]]] = None,
+    rango: Optional[Tuple[date, date]] = None,
+    agrupar_por: Optional[Sequence[str]] = None,
+    orden: Optional[str] = None,
+    limite: Optional[int] = None,
+    despues_de: Optional[Tuple[int, str]] = None,
+    parcial: bool = False,
+    filtrar_activos: bool = True,
+) -> List[dict]:
+    """
+    Consulta declarativa sobre las transacciones.
+
+    - `tipo`: un tipo o varios (tupla). `categoria` y `medio`: igualdad sin distinguir
+      mayúsculas, o subcadena con `parcial=True`.
+    - `periodo`: (año, mes) con el mes como nombre o número; mes None = todo el año.
+    - `rango`: (desde, hasta) como `date`, ambos inclusive.
+    - `agrupar_por`: campos de DIMENSIONES. Devuelve agregados
+      `{campo: valor, ..., "total": float, "cantidad": int}` en lugar de transacciones.
+    - `orden`: campo por el que ordenar ("-" delante para descendente): "fecha", "monto",
+      "timestamp", o al agrupar "total", "cantidad" o un campo agrupado.
+    - `despues_de`: (fecha_ord, timestamp) de la última transacción ya mostrada; con
+      `orden="fecha"` devuelve solo las siguientes. Es paginación por clave: una página no
+      se corre aunque entretanto se registren transacciones de fechas anteriores.
+
+    Con `agrupar_por` (sin `rango`) se responde desde los resúmenes incrementales,
+    recorriendo claves y no transacciones. Con `rango`, el índice por fecha del store acota
+    por bisect las filas a evaluar (O(log N + k)). El resto se resuelve sobre la vista columnar
+    (máscaras, suma por grupo y top-k vectorizados), salvo sin agrupar ni rango en modo
+    sqlite, donde los filtros de igualdad usan los índices de la base.
+    """
+    if despues_de is not None and (agrupar_por or orden != "fecha"):
+        raise ValueError("`despues_de` solo se admite sin agrupar y con orden='fecha'")
+
+    tipos = {tipo.lower()} if isinstance(tipo, str) else {t.lower() for t in tipo} if tipo else None
+    categoria = _normalizar_texto(categoria) or None
+    medio = _normalizar_texto(medio) or None
+    año_filtro, mes_filtro = periodo if periodo else (None, None)
+    if isinstance(mes_filtro, int):
+        mes_filtro = nombre_mes(mes_filtro)
+    elif mes_filtro:
+        mes_filtro = nombre_mes(numero_mes(mes_filtro)) if numero_mes(mes_filtro) else _normalizar_texto(mes_filtro)
+    año_filtro = int(año_filtro) if año_filtro else None
+
+    def texto_coincide(valor: str, buscado: Optional[str]) -> bool:
+        return buscado is None or (buscado in valor if parcial else valor == buscado)
+
+    def coincide(clave: Tuple) -> bool:
+        año_c, mes_c, tipo_c, categoria_c, medio_c = clave
+        return (
+            (tipos is None or tipo_c in tipos)
+            and (año_filtro is None or año_c == año_filtro)
+            and (mes_filtro is None or mes_c == mes_filtro)
+            and texto_coincide(categoria_c, categoria)
+            and texto_coincide(medio_c, medio)
+        )
+
+    desde, hasta = (rango[0].toordinal(), rango[1].toordinal()) if rango else (None, None)
+    descendente = bool(orden) and orden.startswith("-")
+    campo_orden = orden.lstrip("-") if orden else None
+    criterios = dict(
+        tipos=tipos, año=año_filtro, mes=mes_filtro, categoria=categoria, medio=medio,
+        parcial=parcial, rango=(desde, hasta) if rango else None, activos=filtrar_activos,
+        despues_de=despues_de,
+    )
+
+    if agrupar_por:
+        agrupar_por = tuple(agrupar_por)
+        posiciones = [DIMENSIONES.index(campo) for campo in agrupar_por]
+        grupos: Dict[Tuple, List] = {}
+
+        def acumular(clave: Tuple, monto: float, cantidad: int):
+            grupo = grupos.setdefault(tuple(clave[i] for i in posiciones), [0.0, 0])
+            grupo[0] += monto
+            grupo[1] += cantidad
+
+        if filtrar_activos and rango is None:
+            # 📊 Plan por resúmenes: se recorren las combinaciones, no las transacciones
+            with store_transacciones().lock:
+                agregados = list(obtener_resumenes().agregados())
+            for clave, total, cantidad in agregados:
+                if coincide(clave):
+                    acumular(clave, total, cantidad)
+        else:
+            # 🧮 Plan columnar: máscara y suma por grupo vectorizadas sobre la vista NumPy
+            store = store_transacciones()
+            with store.lock:
+                marco = store.marco()
+                seleccion = marco.seleccionar(_acotar_por_fecha(desde, hasta), **criterios)
+                for clave, total, cantidad in marco.agrupar(agrupar_por, seleccion):
+                    grupos[clave] = [total, cantidad]
+
+        resultado = [
+            dict(zip(agrupar_por, clave), total=total, cantidad=cantidad)
+            for clave, (total, cantidad) in grupos.items()
+        ]
+        if campo_orden:
+            resultado.sort(key=lambda g: g[campo_orden], reverse=descendente)
+        return resultado[:limite] if limite else resultado
+
+    if MODO_ALMACENAMIENTO == "sqlite" and rango is None:
+        # 🗂️ Los filtros de igualdad van a los índices; el resto se aplica sobre ese subconjunto
+        candidatos = almacen_sqlite.buscar_transacciones(
+            tipo=next(iter(tipos)) if tipos and len(tipos) == 1 else None,
+            categoria=None if parcial else categoria,
+            medio=None if parcial else medio,
+            mes=mes_filtro,
+            anio=año_filtro,
+            filtrar_activos=filtrar_activos,
+        )
+    else:
+        # 🧮 Filtro vectorizado; el orden (o los k primeros) también se resuelve en la vista
+        store = store_transacciones()
+        with store.lock:
+            marco = store.marco()
+            posiciones = marco.seleccionar(_acotar_por_fecha(desde, hasta), **criterios)
+            if campo_orden in CAMPOS_ORDEN:
+                posiciones = marco.ordenar(posiciones, campo_orden, descendente, limite)
+            resultado = marco.filas(posiciones)
+        if campo_orden and campo_orden not in CAMPOS_ORDEN:
+            resultado.sort(key=_clave_orden(campo_orden), reverse=descendente)
+        return resultado[:limite] if limite else resultado
+
+    resultado = []
+    for t in candidatos:
+        if filtrar_activos and t["status"] != 1:
+            continue
+        if not coincide(clave_resumen(t)):
+            continue
+        if despues_de is not None and _clave_orden("fecha")(t) <= tuple(despues_de):
+            continue
+        resultado.append(t)
+
+    if campo_orden:
+        resultado.sort(key=_clave_orden(campo_orden), reverse=descendente)
+    return resultado[:limite] if limite else resultado
+
+# ---------- VOLCADO A transacciones.json (journal / sqlite) ----------
+def _en_segundo_plano(funcion):
+    """`funcion` lista para otro hilo, que la corre como el usuario de quien la programa (ver usuarios.py)."""
+    contexto = contextvars.copy_context()
+    return lambda: contexto.run(funcion)
+
+def _programar_volcado(nuevas_operaciones: int):
+    """Agenda el volcado en segundo plano: inmediato al superar el umbral o diferido por tiempo."""
+    espacio = espacio_actual()
+    with espacio.store.lock:
+        espacio.operaciones_sin_compactar += nuevas_operaciones
+        if espacio.operaciones_sin_compactar >= UMBRAL_COMPACTACION:
+            if espacio.temporizador:
+                espacio.temporizador.cancel()
+            espacio.temporizador = None
+            threading.Thread(target=_en_segundo_plano(volcar_snapshot), daemon=True).start()
+        elif espacio.temporizador is None:
+            espacio.temporizador = threading.Timer(INTERVALO_COMPACTACION, _en_segundo_plano(volcar_snapshot))
+            espacio.temporizador.daemon = True
+            espacio.temporizador.start()
+
+def volcar_snapshot() -> bool:
+    if MODO_ALMACENAMIENTO == "sqlite":
+        return exportar_sqlite()
+    return compactar_journal()
+
+def exportar_sqlite() -> bool:
+    """Exporta la tabla de transacciones a transacciones.json y la sube como espejo a GitHub."""
+    espacio = espacio_actual()
+    with espacio.store.lock:
+        espacio.temporizador = None
+        espacio.operaciones_sin_compactar = 0
     try:
-        transacciones = cargar_transacciones(filtrar_activos=False, sincronizar=False)  # 👈 Esto es CRUCIAL
+        almacen_sqlite.exportar_a_json("transacciones", espacio.ruta)
+    except Exception as e:
+        print(f"[ERROR] Fallo al exportar SQLite a JSON: {e}")
+        return False
+
+    encolar_subida(espacio.ruta, espacio.archivo_github, "Transacciones exportadas automáticamente")
+    return True
+
+def compactar_journal() -> bool:
+    """
+    Pliega el journal en el snapshot transacciones.json y lo sube a GitHub.
+    Las escrituras solo se bloquean mientras se rota el journal; el volcado del
+    snapshot ocurre fuera del lock.
+    """
+    espacio = espacio_actual()
+    store = espacio.store
+    if not espacio.compactando.acquire(blocking=False):
+        return False
+
+    try:
+        with store.lock:
+            espacio.temporizador = None
+            if not hay_journal_pendiente():
+                return False
+            registros = store.obtener(sincronizar=False)
+            snapshot = [dict(t) for t in registros]
+            # Si quedó un journal rotado de un intento previo, se conserva: sus operaciones ya están en `registros`
+            if not os.path.exists(espacio.ruta_journal_rotado) and os.path.exists(espacio.ruta_journal):
+                os.replace(espacio.ruta_journal, espacio.ruta_journal_rotado)
+            espacio.operaciones_sin_compactar = 0
+            store.marcar_vigente()
+
+        ruta_temporal = espacio.ruta + ".tmp"
+        with open(ruta_temporal, "w", encoding="utf-8") as f:
+            f.write(serializar(snapshot))
+            f.flush()
+            os.fsync(f.fileno())
+
+        with store.lock:
+            os.replace(ruta_temporal, espacio.ruta)
+            if os.path.exists(espacio.ruta_journal_rotado):
+                os.remove(espacio.ruta_journal_rotado)
+            store.marcar_vigente()
+
+        print(f"[INFO] Journal compactado en {espacio.ruta} ({len(snapshot)} registros)")
+
+        encolar_subida(espacio.ruta, espacio.archivo_github, "Transacciones compactadas automáticamente")
+        return True
+
     except Exception as e:
-        print(f"[ERROR] No se pudo cargar transacciones previas: {e}")
-        transacciones = []
+        print(f"[ERROR] Fallo al compactar el journal: {e}")
+        return False
+    finally:
+        espacio.compactando.release()
+
+def _persistir_incremental(altas=(), bajas=()):
+    """Escribe solo lo que cambió: líneas del journal o filas de SQLite."""
+    if MODO_ALMACENAMIENTO == "sqlite":
+        if altas:
+            almacen_sqlite.insertar_transacciones(list(altas))
+        if bajas:
+            almacen_sqlite.actualizar_transacciones(list(bajas))
+        return
 
-    # 🧱 Paso 3: Normalizar campos
+    operaciones = [{"op": "alta", "registro": t} for t in altas]
+    operaciones += [
+        {"op": "status", "id": t["id"], "status": t["status"], "timestamp_modificacion": t["timestamp_modificacion"]}
+        for t in bajas
+    ]
+    _anexar_journal(operaciones)
+
+def _persistir_particiones(registros: List[dict], tocadas: List[dict], mensaje_commit: str):
+    """Reescribe solo las particiones mensuales de `tocadas`, con su contenido tomado de `registros`."""
+    claves = {particiones.particion_de(t) for t in tocadas}
+    por_particion = {clave: [] for clave in claves}
+    for t in registros:
+        clave = particiones.particion_de(t)
+        if clave in por_particion:
+            por_particion[clave].append(t)
+    particiones.escribir_particiones(por_particion, mensaje_commit)
+
+def _preparar_transaccion(transaccion) -> dict:
+    """Completa y normaliza los campos de una transacción nueva (una sola vez, al escribir; ver esquema.py)."""
     ahora = datetime.now()
     fecha_str = transaccion.get("fecha") or ahora.strftime("%d/%m/%Y")
 
@@ -134,60 +737,274 @@ def guardar_transaccion(transaccion):
             partes = fecha_str.lower().split(" de ")
             dia = int(partes[0])
             mes = partes[1]
-            año = ahora.year
+            año = int(partes[2]) if len(partes) > 2 else ahora.year
         else:
             dia, mes_num, año = map(int, fecha_str.split("/"))
             mes = MESES[mes_num - 1]
     except:
         dia = ahora.day
-        mes = ahora.strftime("%B").lower()
+        mes = nombre_mes(ahora.month)
         año = ahora.year
 
     transaccion.update({
+        "id": transaccion.get("id") or nuevo_id(ahora),
         "dia": dia,
         "mes": mes,
         "año": año,
         "timestamp": ahora.isoformat(),
         "status": transaccion.get("status", 1)
     })
+    return normalizar_transaccion(transaccion)
+
+def _persistir_altas(altas: List[dict]) -> List[None]:
+    """
+    Persiste un lote de altas del usuario actual (corre en el escritor único, ver escritor.py):
+    una sola escritura para todo el lote y luego la actualización en memoria.
+    """
+    espacio = espacio_actual()
+    store = espacio.store
+
+    if MODO_ALMACENAMIENTO == "mensual":
+        # ➕ Mensual: solo se reescriben y suben los meses de las transacciones
+        with store.lock:
+            registros = store.obtener(sincronizar=False)
+            _persistir_particiones(registros + altas, altas, "Transacción registrada automáticamente")
+            store.aplicar_cambios(altas=altas)
+
+    elif MODO_ALMACENAMIENTO in ("journal", "sqlite"):
+        # 📥 Incremental: escritura durable solo de los registros nuevos, sin releer el historial
+        with store.lock:
+            store.obtener(sincronizar=False)
+            _persistir_incremental(altas=altas)
+            store.aplicar_cambios(altas=altas)
+        _programar_volcado(len(altas))
 
-    # ➕ Paso 4: AGREGAR a la lista de transacciones
-    transacciones.append(transaccion)
-
-    # 💾 Paso 5: guardar localmente
-    with open(RUTA_TRANSACCIONES, "w", encoding="utf-8") as f:
-        json.dump(transacciones, f, ensure_ascii=False, indent=2)
+    else:
+        # 💾 Guardar localmente lo que AHORA está en memoria más el lote (durable antes de responder).
+        # La sincronización con GitHub ya la hizo quien encoló (_sincronizar_antes_de_escribir)
+        with store.lock:
+            try:
+                transacciones = store.obtener(sincronizar=False)  # 👈 Esto es CRUCIAL
+            except Exception as e:
+                print(f"[ERROR] No se pudo cargar transacciones previas: {e}")
+                transacciones = []
+            escribir_atomico(espacio.ruta, serializar(list(transacciones) + altas))
+            store.aplicar_cambios(altas=altas)
+            # ☁️ Encolar la subida a GitHub (bajo el lock: una descarga no pisa lo que aún no se subió)
+            encolar_subida(espacio.ruta, espacio.archivo_github, "Transacción registrada automáticamente")
+
+    return [None] * len(altas)
+
+def _sincronizar_antes_de_escribir():
+    """
+    Trae los cambios de GitHub antes de encolar una escritura, en el hilo de quien escribe: dentro
+    del escritor único solo se lee la copia local, así una respuesta lenta de GitHub no demora las
+    escrituras de los demás usuarios. Con el lock del store, la descarga no se cruza con una
+    escritura del mismo usuario (que encola su subida antes de soltarlo).
+    """
+    store = store_transacciones()
+    with store.lock:
+        if MODO_ALMACENAMIENTO == "json":
+            # En modo json se sincroniza antes de cada escritura, no solo al vencer el TTL
+            descargar_de_github()
+            store.obtener(sincronizar=False)
+        else:
+            store.obtener()
 
-    # ☁️ Paso 6: subir a GitHub
-    from github_sync import subir_log_a_github
-    subir_log_a_github(
-        ruta_archivo_local=RUTA_TRANSACCIONES,
-        ruta_destino_repo=ARCHIVO_GITHUB,
-        mensaje_commit="Transacción registrada automáticamente"
-    )
+def guardar_transaccion(transaccion):
+    _sincronizar_antes_de_escribir()
+    # Las altas que llegan juntas al escritor se persisten en un solo lote
+    escritor.ejecutar_en_lote(_persistir_altas, _preparar_transaccion(transaccion))
+
+def _por_condicion(coincide, limite: Optional[int] = None):
+    return lambda registros: [t for t in registros if t.get("status", 1) == 1 and coincide(t)][:limite]
+
+def _por_ids(ids: Sequence[str]):
+    def seleccionar(registros):
+        encontradas = (store_transacciones().buscar_por_id(id_registro) for id_registro in ids)
+        return [t for t in encontradas if t is not None and t.get("status", 1) == 1]
+    return seleccionar
+
+def desactivar_transacciones(coincide, limite: Optional[int] = None) -> List[dict]:
+    """
+    Marca con status 0 las transacciones activas para las que `coincide(t)` es verdadero
+    (como máximo `limite`) y devuelve las afectadas.
+    """
+    _sincronizar_antes_de_escribir()
+    return escritor.ejecutar(_desactivar, _por_condicion(coincide, limite))
+
+def desactivar_transacciones_por_id(ids: Sequence[str]) -> List[dict]:
+    """Como `desactivar_transacciones`, pero localizando cada transacción por su id en el índice."""
+    _sincronizar_antes_de_escribir()
+    return escritor.ejecutar(_desactivar, _por_ids(ids))
+
+def _desactivar(seleccionar) -> List[dict]:
+    # Corre en el escritor único: la selección y la baja no se intercalan con otras escrituras.
+    # Sin red: quien encoló ya sincronizó (_sincronizar_antes_de_escribir)
+    ahora = datetime.now().isoformat()
+    espacio = espacio_actual()
+    store = espacio.store
+
+    if MODO_ALMACENAMIENTO in ("journal", "sqlite", "mensual"):
+        with store.lock:
+            registros = store.obtener(sincronizar=False)
+            afectadas = seleccionar(registros)
+            if afectadas:
+                for t in afectadas:
+                    t["status"] = 0
+                    t["timestamp_modificacion"] = ahora
+                try:
+                    if MODO_ALMACENAMIENTO == "mensual":
+                        _persistir_particiones(registros, afectadas, "Transacciones desactivadas automáticamente")
+                    else:
+                        _persistir_incremental(bajas=afectadas)
+                except Exception:
+                    # La copia en memoria ya se modificó: se descarta para releerla del disco
+                    store.invalidar()
+                    raise
+                store.aplicar_cambios(bajas=afectadas)
+        if afectadas and MODO_ALMACENAMIENTO != "mensual":
+            _programar_volcado(len(afectadas))
+        return afectadas
+
+    with store.lock:
+        transacciones = store.obtener(sincronizar=False)
+        afectadas = seleccionar(transacciones)
+        if afectadas:
+            for t in afectadas:
+                t["status"] = 0
+                t["timestamp_modificacion"] = ahora
+            escribir_atomico(espacio.ruta, serializar(transacciones))
+            store.aplicar_cambios(bajas=afectadas)
+            encolar_subida(espacio.ruta, espacio.archivo_github, "Transacciones desactivadas automáticamente")
+
+    return afectadas
 
 def eliminar_transaccion_logicamente(condiciones):
-    transacciones = cargar_transacciones(filtrar_activos=False)
-    modificada = False
-
-    for transaccion in transacciones:
-        if transaccion.get("status", 1) == 0:
-            continue
-        if all(transaccion.get(k) == v for k, v in condiciones.items()):
-            transaccion["status"] = 0
-            transaccion["timestamp_modificacion"] = datetime.now().isoformat()
-            modificada = True
-            break
-
-    if modificada:
-        with open(RUTA_TRANSACCIONES, "w", encoding="utf-8") as f:
-            json.dump(transacciones, f, ensure_ascii=False, indent=2)
+    if set(condiciones) == {"id"}:
+        afectadas = desactivar_transacciones_por_id([condiciones["id"]])
+    else:
+        afectadas = desactivar_transacciones(
+            lambda t: all(t.get(k) == v for k, v in condiciones.items()),
+            limite=1
+        )
+    if afectadas:
         print(f"[INFO] Eliminada lógicamente: {condiciones}")
-        if TOKEN:
-            subir_a_github(RUTA_TRANSACCIONES, REPO, ARCHIVO_GITHUB, TOKEN)
     else:
         print(f"[WARN] No encontrada: {condiciones}")
 
-# 🔁 Cargar desde GitHub si no existe en el contenedor (primer arranque)
-if not os.path.exists(RUTA_TRANSACCIONES):
-    descargar_de_github()
+# ---------- FUSIÓN CON GITHUB (varias réplicas) ----------
+def _incorporar_remotas(ruta: str, contenido_remoto: str) -> str:
+    """
+    Incorpora las transacciones de la versión remota de `ruta` (transacciones.json o, en modo
+    mensual, una partición) que faltan o cambiaron localmente, y devuelve el contenido a subir
+    en su lugar. Corre en el escritor único, como cualquier otra escritura.
+    """
+    espacio = espacio_actual()
+    store = espacio.store
+    remotas = compactar(cargar_documento(json.loads(contenido_remoto), "transacciones"))
+    asegurar_ids(remotas)
+
+    with store.lock:
+        registros = store.obtener(sincronizar=False)
+        nuevas, cambios = diferencias_por_id(store.buscar_por_id, remotas)
+        bajas, otros = [], []
+        for local, remota in cambios:
+            # Lo único que cambia en una transacción es su estado (baja lógica)
+            (bajas if local["status"] == 1 and remota["status"] != 1 else otros).append(local)
+            local["status"] = remota["status"]
+            local["timestamp_modificacion"] = remota.get("timestamp_modificacion")
+        tocadas = bajas + otros
+
+        if nuevas or tocadas:
+            mensaje = "Transacciones fusionadas con GitHub"
+            try:
+                if MODO_ALMACENAMIENTO == "mensual":
+                    _persistir_particiones(list(registros) + nuevas, nuevas + tocadas, mensaje)
+                elif MODO_ALMACENAMIENTO in ("journal", "sqlite"):
+                    _persistir_incremental(altas=nuevas, bajas=tocadas)
+                else:
+                    escribir_atomico(espacio.ruta, serializar(list(registros) + nuevas))
+            except Exception:
+                store.invalidar()
+                raise
+            store.aplicar_cambios(altas=nuevas, bajas=bajas)
+            if otros:
+                # Cambios que no son bajas (no los genera el bot): se recalcula todo desde el disco
+                store.invalidar()
+            print(f"[INFO] Fusión con GitHub: {len(nuevas)} transacciones nuevas y {len(tocadas)} actualizadas")
+
+    if MODO_ALMACENAMIENTO in ("journal", "sqlite") and (nuevas or tocadas):
+        # El snapshot es lo que se sube: se vuelca ya para que no quede detrás de lo subido
+        if not volcar_snapshot():
+            _programar_volcado(len(nuevas) + len(tocadas))
+            with store.lock:
+                return serializar(store.obtener(sincronizar=False))
+
+    if MODO_ALMACENAMIENTO == "mensual":
+        ruta_local = particiones.ruta_local(ruta[len(particiones.DIR_REMOTO) + 1:-len(".json")])
+    else:
+        ruta_local = espacio.ruta
+    with open(ruta_local, "r", encoding="utf-8") as f:
+        return f.read()
+
+def _es_archivo_de_transacciones(ruta: str) -> bool:
+    if MODO_ALMACENAMIENTO == "mensual":
+        return ruta.startswith(particiones.DIR_REMOTO + "/") and ruta.endswith(".json") \
+            and not ruta.endswith("/" + particiones.ARCHIVO_MANIFEST)
+    return ruta == ARCHIVO_GITHUB
+
+def _fusionar_con_github(ruta: str, local: str, remoto: str) -> str:
+    return escritor.ejecutar(_incorporar_remotas, ruta, remoto)
+
+registrar_fusionador(_es_archivo_de_transacciones, _fusionar_con_github)
+
+# ---------- VARIANTES ASÍNCRONAS ----------
+# Para acciones `async def run`: disco, SQLite y GitHub se atienden en el pool de hilos
+async def cargar_transacciones_async(filtrar_activos=True, sincronizar=True):
+    return await en_hilo(cargar_transacciones, filtrar_activos, sincronizar)
+
+async def buscar_transacciones_async(**filtros):
+    return await en_hilo(buscar_transacciones, **filtros)
+
+async def obtener_resumenes_async() -> ResumenesMensuales:
+    return await en_hilo(obtener_resumenes)
+
+async def consultar_async(**criterios) -> List[dict]:
+    return await en_hilo(consultar, **criterios)
+
+# Las escrituras esperan al escritor único sin ocupar un hilo del pool
+async def guardar_transaccion_async(transaccion):
+    await en_hilo(_sincronizar_antes_de_escribir)
+    await escritor.ejecutar_en_lote_async(_persistir_altas, _preparar_transaccion(transaccion))
+
+async def desactivar_transacciones_async(coincide, limite: Optional[int] = None) -> List[dict]:
+    await en_hilo(_sincronizar_antes_de_escribir)
+    return await escritor.ejecutar_async(_desactivar, _por_condicion(coincide, limite))
+
+async def desactivar_transacciones_por_id_async(ids: Sequence[str]) -> List[dict]:
+    await en_hilo(_sincronizar_antes_de_escribir)
+    return await escritor.ejecutar_async(_desactivar, _por_ids(ids))
+
+# 🔥 Sin descargas al importar: la primera lectura (o el precalentamiento) sincroniza con GitHub
+def precalentar():
+    """Sincroniza y carga en memoria las transacciones, sus resúmenes y la vista columnar."""
+    inicio = time.monotonic()
+    store = store_transacciones()
+    registros = store.obtener()
+    store.marco(sincronizar=False)
+    print(f"[INFO] Transacciones precargadas ({len(registros)} registros en {time.monotonic() - inicio:.2f}s)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Recalcula los resúmenes mensuales desde las transacciones y muestra los totales por mes."
+    )
+    parser.add_argument("--usuario", help="sender_id cuyas transacciones se revisan (por defecto, las del usuario legado)")
+    args = parser.parse_args()
+    with como_usuario(args.usuario):
+        store_transacciones().obtener()
+        reconstruir_resumenes()
+        resumenes = obtener_resumenes()
+        for tipo in ("ingreso", "gasto"):
+            for (año, mes), total in sorted(resumenes.totales_por_mes(tipo).items(), key=lambda e: (e[0][0], numero_mes(e[0][1]))):
+                print(f"{año} {mes:<10} {tipo:<8} {total:>12.2f}")
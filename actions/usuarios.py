@@ -0,0 +1,123 @@
+# actions/usuarios.py
+# Espacio de datos por usuario, identificado por el `sender_id` de Rasa.
+#
+# Cada usuario tiene sus propios archivos locales (/tmp/usuarios/<usuario>/transacciones.json,
+# alertas.json, el journal, la base SQLite y las particiones mensuales), su propia carpeta en el
+# espejo de GitHub (usuarios/<usuario>/...) y su propia copia en memoria: dos conversaciones no
+# se bloquean entre sí ni reescriben el archivo de la otra.
+#
+# El usuario de la conversación en curso viaja en una ContextVar. Las acciones la fijan con
+# @por_usuario a partir de tracker.sender_id, `en_hilo` la propaga al pool de E/S y los volcados
+# en segundo plano la heredan de quien los programa. El sender "usuario" (el único que enviaba el
+# cliente antes de los ids por sesión) conserva las rutas de siempre: /tmp/transacciones.json y
+# transacciones.json en la raíz del repositorio.
+
+import functools
+import hashlib
+import inspect
+import os
+import re
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Generic, List, Optional, Tuple, TypeVar
+
+USUARIO_LEGADO = os.getenv("USUARIO_LEGADO", "usuario")
+DIR_USUARIOS = os.getenv("USUARIOS_DIR", "/tmp/usuarios")
+# Carpeta equivalente dentro del repositorio de GitHub
+DIR_REMOTO_USUARIOS = "usuarios"
+
+_LONGITUD_MAXIMA = 64
+_NO_PERMITIDOS = re.compile(r"[^A-Za-z0-9_-]")
+
+_usuario_actual: ContextVar[str] = ContextVar("usuario_actual", default=USUARIO_LEGADO)
+
+def normalizar_usuario(sender_id) -> str:
+    """
+    Nombre del usuario apto para rutas locales y de GitHub. Si hubo que recortar o reemplazar
+    caracteres, lleva un hash del sender_id original para que dos ids distintos no colisionen.
+    """
+    texto = str(sender_id or "").strip()
+    if not texto:
+        return USUARIO_LEGADO
+    limpio = _NO_PERMITIDOS.sub("_", texto)
+    if limpio == texto and len(limpio) <= _LONGITUD_MAXIMA:
+        return limpio
+    huella = hashlib.sha1(texto.encode("utf-8")).hexdigest()[:12]
+    return f"{limpio[:_LONGITUD_MAXIMA - len(huella) - 1]}-{huella}"
+
+def usuario_actual() -> str:
+    return _usuario_actual.get()
+
+@contextmanager
+def como_usuario(sender_id):
+    """Dentro del bloque, las lecturas y escrituras van al espacio de `sender_id`."""
+    token = _usuario_actual.set(normalizar_usuario(sender_id))
+    try:
+        yield
+    finally:
+        _usuario_actual.reset(token)
+
+def por_usuario(run):
+    """Decorador para el `run` de las acciones: lo ejecuta como el usuario de `tracker.sender_id`."""
+    if inspect.iscoroutinefunction(run):
+        @functools.wraps(run)
+        async def envoltura(self, dispatcher, tracker, *args, **kwargs):
+            with como_usuario(tracker.sender_id):
+                return await run(self, dispatcher, tracker, *args, **kwargs)
+    else:
+        @functools.wraps(run)
+        def envoltura(self, dispatcher, tracker, *args, **kwargs):
+            with como_usuario(tracker.sender_id):
+                return run(self, dispatcher, tracker, *args, **kwargs)
+    return envoltura
+
+# ---------- RUTAS ----------
+def ruta_local(ruta_legado: str, usuario: Optional[str] = None) -> str:
+    """La ruta de siempre para el usuario legado; para los demás, el mismo nombre dentro de su carpeta."""
+    usuario = usuario or usuario_actual()
+    if usuario == USUARIO_LEGADO:
+        return ruta_legado
+    carpeta = os.path.join(DIR_USUARIOS, usuario)
+    os.makedirs(carpeta, exist_ok=True)
+    return os.path.join(carpeta, os.path.basename(ruta_legado.rstrip("/")))
+
+def ruta_remota(ruta_legado: str, usuario: Optional[str] = None) -> str:
+    """Ruta dentro del repositorio de GitHub: la de siempre o bajo usuarios/<usuario>/."""
+    usuario = usuario or usuario_actual()
+    if usuario == USUARIO_LEGADO:
+        return ruta_legado
+    return f"{DIR_REMOTO_USUARIOS}/{usuario}/{ruta_legado}"
+
+def separar_ruta_remota(ruta: str) -> Tuple[str, str]:
+    """Inversa de `ruta_remota`: (usuario, ruta del usuario legado) de una ruta del repositorio."""
+    prefijo = DIR_REMOTO_USUARIOS + "/"
+    if ruta.startswith(prefijo):
+        usuario, _, resto = ruta[len(prefijo):].partition("/")
+        if usuario and resto:
+            return usuario, resto
+    return USUARIO_LEGADO, ruta
+
+# ---------- OBJETOS POR USUARIO ----------
+T = TypeVar("T")
+
+class PorUsuario(Generic[T]):
+    """Un objeto por usuario (copia en memoria, estado de volcado...), creado con `fabrica(usuario)` al primer uso."""
+
+    def __init__(self, fabrica: Callable[[str], T]):
+        self._fabrica = fabrica
+        self._objetos: Dict[str, T] = {}
+        self._lock = threading.Lock()
+
+    def obtener(self, usuario: Optional[str] = None) -> T:
+        usuario = usuario or usuario_actual()
+        objeto = self._objetos.get(usuario)
+        if objeto is None:
+            with self._lock:
+                objeto = self._objetos.get(usuario)
+                if objeto is None:
+                    objeto = self._objetos[usuario] = self._fabrica(usuario)
+        return objeto
+
+    def usuarios(self) -> List[str]:
+        return list(self._objetos)
@@ -1,5 +1,6 @@
 import streamlit as st
 import requests
+import uuid
 from datetime import datetime
 import pytz
 
@@ -13,6 +14,11 @@ RASA_ENDPOINT = "https://chatbot-financiero.onrender.com/webhooks/rest/webhook"
 st.set_page_config(page_title="Asistente Financiero", page_icon="💰")
 st.title("💬 Chat con tu Asistente Financiero")
 
+# 🔌 Una sola sesión HTTP por proceso: reutiliza la conexión con Rasa entre mensajes y recargas
+@st.cache_resource
+def sesion_rasa():
+    return requests.Session()
+
 # ⏰ Función para mostrar la hora al estilo de WhatsApp
 def hora_estilo_chat():
     lima_tz = pytz.timezone("America/Lima")
@@ -23,6 +29,12 @@ def hora_estilo_chat():
 if "messages" not in st.session_state:
     st.session_state.messages = []
 
+# 🪪 Identificador de la sesión: Rasa lo recibe como sender_id y separa los datos de cada usuario.
+# Se genera en el servidor y vive solo en session_state: nunca se toma de la URL, donde
+# cualquiera podría escribir el id de otra persona.
+if "sender_id" not in st.session_state:
+    st.session_state.sender_id = uuid.uuid4().hex
+
 # 🗂️ Mostrar historial con íconos personalizados y alineación
 for msg in st.session_state.messages:
     es_usuario = msg["role"] == "user"
@@ -52,8 +64,8 @@ for msg in st.session_state.messages:
 # 🔁 Función para enviar mensaje a Rasa
 def enviar_a_rasa(mensaje):
     try:
-        payload = {"sender": "usuario", "message": mensaje}
-        response = requests.post(RASA_ENDPOINT, json=payload, timeout=10)
+        payload = {"sender": st.session_state.sender_id, "message": mensaje}
+        response = sesion_rasa().post(RASA_ENDPOINT, json=payload, timeout=10)
         response.raise_for_status()
         data = response.json()
         print("Respuesta de Rasa:", data)
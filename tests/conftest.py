@@ -0,0 +1,23 @@
+# tests/conftest.py
+# Los módulos de actions/ se importan entre sí por su nombre (como los carga el servidor de
+# acciones de Rasa), así que la carpeta va al sys.path.
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "actions"))
+
+from esquema import normalizar_transaccion  # noqa: E402
+
+def _transaccion(tipo="gasto", monto=10, categoria="comida", medio="yape", dia=1, mes="marzo", año=2025, status=1, **extra):
+    return normalizar_transaccion({
+        "tipo": tipo, "monto": monto, "categoria": categoria, "medio": medio,
+        "dia": dia, "mes": mes, "año": año, "status": status, **extra,
+    })
+
+@pytest.fixture
+def transaccion():
+    """Fábrica de transacciones ya normalizadas, como quedan al escribirse."""
+    return _transaccion
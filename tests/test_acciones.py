@@ -0,0 +1,61 @@
+import asyncio
+import inspect
+import types
+
+import pytest
+
+pytest.importorskip("requests")
+pytest.importorskip("rasa_sdk")
+
+from usuarios import USUARIO_LEGADO
+
+class Despachador:
+    def __init__(self):
+        self.mensajes = []
+
+    def utter_message(self, text=None, **kwargs):
+        self.mensajes.append(text)
+
+@pytest.fixture
+def acciones(monkeypatch):
+    import arranque
+    # Importar las acciones no debe lanzar el precalentamiento real
+    monkeypatch.setattr(arranque, "_precalentamiento_iniciado", True)
+    import actions
+
+    monkeypatch.setattr(actions, "SlotSet", lambda nombre, valor: (nombre, valor))
+    return actions
+
+def tracker(intent="", texto="", **slots):
+    return types.SimpleNamespace(
+        sender_id=USUARIO_LEGADO,
+        latest_message={"text": texto, "intent": {"name": intent}, "entities": []},
+        get_slot=slots.get,
+    )
+
+def test_todas_las_acciones_son_asincronas(acciones):
+    clases = [c for c in vars(acciones).values() if isinstance(c, type) and issubclass(c, acciones.Action) and c is not acciones.Action]
+    sincronas = [c.__name__ for c in clases if not inspect.iscoroutinefunction(c.run)]
+    assert sincronas == []
+
+def test_inicio_de_sesion_da_la_bienvenida(acciones):
+    despachador = Despachador()
+    eventos = asyncio.run(acciones.ActionSessionStart().run(despachador, tracker(), {}))
+    assert len(eventos) == 2
+    assert "Bienvenido" in despachador.mensajes[0]
+
+def test_entrada_no_entendida_se_guarda_sin_bloquear(acciones, monkeypatch):
+    guardadas = []
+    async def guardar(transaccion):
+        guardadas.append(transaccion)
+    monkeypatch.setattr(acciones, "guardar_transaccion_async", guardar)
+
+    despachador = Despachador()
+    eventos = asyncio.run(acciones.ActionEntradaNoEntendida().run(despachador, tracker("nlu_fallback", "xyz"), {}))
+    assert [t["descripcion"] for t in guardadas] == ["xyz"]
+    assert eventos == [("sugerencia_pendiente", "action_ayuda_general")]
+
+def test_negacion_descarta_la_sugerencia(acciones):
+    despachador = Despachador()
+    eventos = asyncio.run(acciones.ActionNegacion().run(despachador, tracker("deny", sugerencia_pendiente="action_ayuda_general"), {}))
+    assert eventos == [("sugerencia_pendiente", None)]
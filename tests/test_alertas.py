@@ -0,0 +1,65 @@
+import json
+
+import pytest
+
+pytest.importorskip("requests")
+
+import alertas_io
+from alertas_io import AlertStore
+from usuarios import usuario_actual
+
+def alerta(categoria, periodo, monto, timestamp, status=1):
+    return {"categoria": categoria, "periodo": periodo, "monto": monto, "timestamp": timestamp, "status": status}
+
+@pytest.fixture
+def ruta(tmp_path):
+    ruta = tmp_path / "alertas.json"
+    ruta.write_text(json.dumps([
+        alerta("Comida", "marzo de 2025", 200, "2025-03-02T00:00:00"),
+        # Desordenada en el archivo: la vigente es la de timestamp más reciente
+        alerta("comida ", "Marzo de 2025", 300, "2025-03-05T00:00:00"),
+        alerta("comida", "marzo de 2025", 250, "2025-03-03T00:00:00"),
+        alerta("transporte", "marzo de 2025", 80, "2025-03-01T00:00:00"),
+        alerta("comida", "abril de 2025", 150, "2025-04-01T00:00:00"),
+        alerta("ocio", "marzo de 2025", 50, "2025-03-04T00:00:00", status=0),
+    ]), encoding="utf-8")
+    return str(ruta)
+
+def test_activa_es_la_mas_reciente_de_la_clave(ruta):
+    store = AlertStore(ruta)
+    assert store.activa("COMIDA", "marzo de 2025")["monto"] == 300
+    assert [a["monto"] for a in store.activas("comida", "marzo de 2025")] == [200, 250, 300]
+    assert store.activa("ocio", "marzo de 2025") is None
+
+def test_ultimas_activas_por_periodo_y_categoria(ruta):
+    store = AlertStore(ruta)
+    assert [a["monto"] for a in store.ultimas_activas(periodo="Marzo de 2025")] == [300, 80]
+    assert [a["monto"] for a in store.ultimas_activas(categoria="comida")] == [150, 300]
+    assert [a["monto"] for a in store.ultimas_activas()] == [150, 300, 80]
+
+def test_modificar_actualiza_los_indices(ruta):
+    store = AlertStore(ruta)
+    vigente = store.activa("comida", "marzo de 2025")
+    store.modificar(vigente, {"status": 0})
+    assert store.activa("comida", "marzo de 2025")["monto"] == 250
+
+    transporte = store.activa("transporte", "marzo de 2025")
+    store.modificar(transporte, {"status": 0})
+    assert [a["monto"] for a in store.ultimas_activas(periodo="marzo de 2025")] == [250]
+    assert store.buscar_por_id(transporte["id"]) is transporte
+
+def test_alta_y_desactivacion_en_modo_json(ruta, monkeypatch):
+    monkeypatch.setattr(alertas_io, "MODO_ALERTAS", "json")
+    monkeypatch.setattr(alertas_io, "RUTA_ALERTAS", ruta)
+    store = AlertStore(ruta)
+    monkeypatch.setattr(alertas_io, "store_alertas", lambda: store)
+    monkeypatch.setattr(alertas_io, "_inicializados", {usuario_actual()})
+    monkeypatch.setattr(alertas_io, "encolar_subida", lambda *args: None)
+
+    alertas_io.guardar_alerta({"categoria": "Comida", "periodo": "marzo de 2025", "monto": 400})
+    assert alertas_io.buscar_alerta_activa("comida", "marzo de 2025")["monto"] == 400
+
+    assert alertas_io.desactivar_alertas("comida", "marzo de 2025") == 4
+    assert alertas_io.buscar_alerta_activa("comida", "marzo de 2025") is None
+    # Lo persistido coincide con la copia en memoria
+    assert [a["monto"] for a in AlertStore(ruta).ultimas_activas()] == [150, 80]
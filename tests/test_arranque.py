@@ -0,0 +1,64 @@
+import os
+import subprocess
+import sys
+import threading
+
+import pytest
+
+import arranque
+
+CARPETA_ACCIONES = os.path.dirname(os.path.abspath(arranque.__file__))
+
+def test_importar_los_modulos_no_usa_la_red(tmp_path):
+    pytest.importorskip("requests")
+    codigo = (
+        "import socket\n"
+        "def sin_red(*args, **kwargs): raise AssertionError('conexión durante la importación')\n"
+        "socket.socket.connect = sin_red\n"
+        "socket.create_connection = sin_red\n"
+        "import transacciones_io, alertas_io\n"
+    )
+    entorno = dict(os.environ, PYTHONPATH=os.pathsep.join([CARPETA_ACCIONES] + sys.path))
+    proceso = subprocess.run([sys.executable, "-c", codigo], cwd=tmp_path, env=entorno, capture_output=True, text=True)
+    assert proceso.returncode == 0, proceso.stderr
+
+def test_precalentar_se_lanza_una_sola_vez(monkeypatch):
+    hilos = []
+    terminado = threading.Event()
+    monkeypatch.setattr(arranque, "_precalentamiento_iniciado", False)
+    monkeypatch.setattr(arranque, "_precalentar", lambda: hilos.append(threading.current_thread()) or terminado.set())
+
+    arranque.precalentar_en_segundo_plano()
+    arranque.precalentar_en_segundo_plano()
+
+    assert terminado.wait(timeout=5)
+    assert len(hilos) == 1
+    assert hilos[0] is not threading.main_thread() and hilos[0].daemon
+
+def test_un_fallo_no_impide_el_resto_del_precalentamiento(monkeypatch):
+    pytest.importorskip("requests")
+    import alertas_io
+    import transacciones_io
+
+    llamadas = []
+    def transacciones_caidas():
+        raise ConnectionError("GitHub no responde")
+
+    monkeypatch.setattr(arranque, "_puerto_abierto", lambda puerto: True)
+    monkeypatch.setattr(transacciones_io, "precalentar", transacciones_caidas)
+    monkeypatch.setattr(alertas_io, "inicializar_alertas", lambda: llamadas.append("alertas"))
+
+    arranque._precalentar()
+    assert llamadas == ["alertas"]
+
+def test_importar_github_sync_no_abre_el_log(tmp_path):
+    pytest.importorskip("requests")
+    codigo = (
+        "import logging\n"
+        "import envio_logs, github_sync\n"
+        "assert envio_logs._manejador is None\n"
+        "assert not logging.getLogger().handlers\n"
+    )
+    entorno = dict(os.environ, PYTHONPATH=os.pathsep.join([CARPETA_ACCIONES] + sys.path))
+    proceso = subprocess.run([sys.executable, "-c", codigo], cwd=tmp_path, env=entorno, capture_output=True, text=True)
+    assert proceso.returncode == 0, proceso.stderr
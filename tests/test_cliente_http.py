@@ -0,0 +1,27 @@
+import pytest
+
+requests = pytest.importorskip("requests")
+
+import cliente_http
+
+@pytest.fixture
+def peticiones(monkeypatch):
+    llamadas = []
+    monkeypatch.setattr(cliente_http, "_sesion", None)
+    monkeypatch.setattr(requests.Session, "request", lambda self, method, url, **kwargs: llamadas.append((method, kwargs)))
+    return llamadas
+
+def test_la_sesion_se_crea_una_sola_vez(peticiones):
+    assert cliente_http.obtener_sesion() is cliente_http.obtener_sesion()
+
+def test_timeout_por_defecto(peticiones):
+    sesion = cliente_http.obtener_sesion()
+    sesion.request("GET", "https://api.github.com/rate_limit")
+    sesion.request("POST", "http://localhost:5005/webhooks/rest/webhook", timeout=10)
+
+    assert peticiones[0][1]["timeout"] == (cliente_http.TIMEOUT_CONEXION, cliente_http.TIMEOUT_LECTURA)
+    # Un timeout explícito del llamador se respeta
+    assert peticiones[1][1]["timeout"] == 10
+
+def test_estadisticas_vacias_sin_sesion(peticiones):
+    assert cliente_http.estadisticas_pool() == {}
@@ -0,0 +1,66 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from columnas import MarcoColumnar
+
+@pytest.fixture
+def fila(transaccion):
+    # Por defecto, registrada al mediodía del día de la transacción
+    def crear(tipo, monto, dia, timestamp=None, **extra):
+        return transaccion(tipo, monto, dia=dia, timestamp=timestamp or f"2025-03-{dia:02d}T12:00:00", **extra)
+    return crear
+
+@pytest.fixture
+def registros(fila):
+    return [
+        fila("gasto", 10, 3),
+        fila("gasto", 30, 1, categoria="transporte"),
+        fila("ingreso", 100, 2, categoria="sueldo", medio="banco"),
+        fila("gasto", 5, 3, timestamp="2025-03-03T08:00:00"),
+        fila("gasto", 50, 4, status=0),
+        fila("gasto", 20, 5, categoria="comida rápida", mes="abril"),
+    ]
+
+def test_agrupar(registros):
+    marco = MarcoColumnar(registros)
+    grupos = marco.agrupar(("tipo", "categoria"), marco.seleccionar())
+    assert sorted(grupos) == [
+        (("gasto", "comida"), 15.0, 2),
+        (("gasto", "comida rápida"), 20.0, 1),
+        (("gasto", "transporte"), 30.0, 1),
+        (("ingreso", "sueldo"), 100.0, 1),
+    ]
+
+def test_agrupar_con_filtros(registros):
+    marco = MarcoColumnar(registros)
+    posiciones = marco.seleccionar(tipos=["gasto"], categoria="comida", parcial=True)
+    assert sorted(marco.agrupar(("mes",), posiciones)) == [(("abril",), 20.0, 1), (("marzo",), 15.0, 2)]
+    assert marco.agrupar(("mes",), marco.seleccionar(categoria="inexistente")) == []
+
+def test_ordenar_por_fecha_desempata_por_timestamp(registros):
+    marco = MarcoColumnar(registros)
+    orden = marco.ordenar(marco.seleccionar(), "fecha")
+    assert orden.tolist() == [1, 2, 3, 0, 5]
+    assert marco.ordenar(marco.seleccionar(), "fecha", descendente=True).tolist() == [5, 0, 3, 2, 1]
+
+def test_ordenar_por_monto_con_limite(registros):
+    marco = MarcoColumnar(registros)
+    posiciones = marco.seleccionar()
+    assert marco.ordenar(posiciones, "monto", descendente=True, limite=2).tolist() == [2, 1]
+    assert marco.ordenar(posiciones, "monto", limite=2).tolist() == [3, 0]
+    assert marco.ordenar(posiciones, "monto").tolist() == [3, 0, 5, 1, 2]
+
+def test_altas_y_bajas_se_reflejan(registros, fila):
+    marco = MarcoColumnar(registros)
+    registros.append(fila("gasto", 7, 6))
+    marco.sincronizar()
+    marco.marcar_status(0, 0)
+    grupos = dict((clave, total) for clave, total, _ in marco.agrupar(("categoria",), marco.seleccionar(tipos=["gasto"])))
+    assert grupos[("comida",)] == 12.0
+
+def test_seleccionar_en_posiciones_acotadas(registros):
+    marco = MarcoColumnar(registros)
+    posiciones = np.array([3, 0, 4], dtype=np.int64)
+    # Respeta el orden de las posiciones dadas y descarta la inactiva
+    assert marco.seleccionar(posiciones, tipos=["gasto"]).tolist() == [3, 0]
@@ -0,0 +1,92 @@
+import types
+
+import pytest
+
+pytest.importorskip("requests")
+
+import github_sync
+
+class GitDataFalsa:
+    """Imita rama → árbol → commit → ref; `rechazos` simula que la rama avanzó (422) N veces."""
+
+    def __init__(self, rechazos=0):
+        self.rechazos = rechazos
+        self.peticiones = []
+        self.arboles = []
+
+    def _respuesta(self, status, datos=None):
+        return types.SimpleNamespace(status_code=status, text="", content=b"", headers={}, json=lambda: datos or {})
+
+    def request(self, metodo, url, **kwargs):
+        return getattr(self, metodo.lower())(url, **kwargs)
+
+    def get(self, url, headers=None, params=None):
+        self.peticiones.append(("GET", url.rsplit("/", 2)[-2]))
+        if "/git/trees/" in url:
+            return self._respuesta(200, {"tree": []})
+        return self._respuesta(200, {"commit": {"sha": "padre", "commit": {"tree": {"sha": "arbol-base"}}}})
+
+    def post(self, url, headers=None, json=None):
+        recurso = url.rsplit("/", 1)[-1]
+        self.peticiones.append(("POST", recurso))
+        if recurso == "trees":
+            self.arboles.append(json["tree"])
+            return self._respuesta(201, {"sha": "arbol"})
+        return self._respuesta(201, {"sha": "commit123456"})
+
+    def patch(self, url, headers=None, json=None):
+        self.peticiones.append(("PATCH", "refs"))
+        if self.rechazos:
+            self.rechazos -= 1
+            return self._respuesta(422)
+        return self._respuesta(200)
+
+@pytest.fixture
+def archivos(tmp_path, monkeypatch):
+    monkeypatch.setattr(github_sync, "GITHUB_TOKEN", "token")
+    monkeypatch.setattr(github_sync, "RUTA_BASES", str(tmp_path / "bases.json"))
+    monkeypatch.setattr(github_sync, "_bases", None)
+    monkeypatch.setattr(github_sync, "_esperar_reintento", lambda intento: None)
+    monkeypatch.setattr(github_sync, "INTERVALO_ESCRITURAS", 0.0)
+    rutas = []
+    for nombre in ("transacciones.json", "alertas.json"):
+        ruta = tmp_path / nombre
+        ruta.write_text("[]", encoding="utf-8")
+        rutas.append((str(ruta), nombre))
+    return rutas
+
+def test_varios_archivos_en_cinco_peticiones(archivos, monkeypatch):
+    api = GitDataFalsa()
+    monkeypatch.setattr(github_sync, "obtener_sesion", lambda: api)
+
+    assert github_sync.subir_commit_unico(archivos, "sync")
+    assert api.peticiones == [("GET", "branches"), ("GET", "trees"), ("POST", "trees"), ("POST", "commits"), ("PATCH", "refs")]
+    assert [a["path"] for a in api.arboles[0]] == ["transacciones.json", "alertas.json"]
+
+def test_rama_movida_se_rehace_sobre_el_nuevo_head(archivos, monkeypatch):
+    api = GitDataFalsa(rechazos=1)
+    monkeypatch.setattr(github_sync, "obtener_sesion", lambda: api)
+
+    assert github_sync.subir_commit_unico(archivos, "sync")
+    assert len(api.peticiones) == 10
+
+def test_se_rinde_tras_agotar_los_intentos(archivos, monkeypatch):
+    api = GitDataFalsa(rechazos=5)
+    monkeypatch.setattr(github_sync, "obtener_sesion", lambda: api)
+
+    assert not github_sync.subir_commit_unico(archivos, "sync", intentos=2)
+    assert len(api.peticiones) == 10
+
+def test_el_outbox_en_modo_git_sube_todo_en_un_commit(archivos, tmp_path, monkeypatch):
+    commits = []
+    monkeypatch.setattr(github_sync, "MODO_SUBIDA", "git")
+    monkeypatch.setattr(github_sync, "OUTBOX_DIR", str(tmp_path / "outbox"))
+    monkeypatch.setattr(github_sync, "_iniciar_flusher", lambda: None)
+    monkeypatch.setattr(github_sync, "subir_commit_unico", lambda archivos, mensaje: commits.append((archivos, mensaje)) or True)
+    for ruta_local, destino in archivos:
+        github_sync.encolar_subida(ruta_local, destino, f"actualiza {destino}")
+
+    assert github_sync.vaciar_outbox() == 2
+    assert len(commits) == 1
+    assert [destino for _, destino in commits[0][0]] == ["transacciones.json", "alertas.json"]
+    assert github_sync.subidas_pendientes() == []
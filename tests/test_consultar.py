@@ -0,0 +1,54 @@
+from datetime import date
+
+import pytest
+
+pytest.importorskip("requests")
+
+import transacciones_io
+from transacciones_io import consultar
+
+@pytest.fixture(autouse=True)
+def registros(tmp_path, monkeypatch, transaccion):
+    registros = [
+        transaccion("gasto", 30, dia=5),
+        transaccion("gasto", 12, dia=20, categoria="comida rápida", medio="efectivo"),
+        transaccion("gasto", 50, dia=2, mes="abril", categoria="transporte"),
+        transaccion("ingreso", 1000, categoria="sueldo", medio="banco"),
+        transaccion("gasto", 80, dia=3, status=0),
+    ]
+    store = transacciones_io.TransactionStore((str(tmp_path / "vacio"),), 60, lambda: registros)
+    monkeypatch.setattr(transacciones_io, "MODO_ALMACENAMIENTO", "json")
+    monkeypatch.setattr(transacciones_io, "store_transacciones", lambda: store)
+    return registros
+
+def test_filtros_orden_y_limite():
+    resultado = consultar(tipo="gasto", periodo=(2025, "marzo"), orden="-monto", limite=1)
+    assert [t["monto"] for t in resultado] == [30]
+    # El mes también puede venir como número
+    assert len(consultar(tipo="gasto", periodo=(2025, 3))) == 2
+
+def test_categoria_exacta_o_parcial():
+    assert [t["monto"] for t in consultar(categoria="Comida")] == [30]
+    assert [t["monto"] for t in consultar(categoria="comida", parcial=True, orden="fecha")] == [30, 12]
+
+def test_rango_de_fechas_inclusivo():
+    resultado = consultar(tipo=("gasto", "ingreso"), rango=(date(2025, 3, 5), date(2025, 4, 2)), orden="fecha")
+    assert [t["monto"] for t in resultado] == [30, 12, 50]
+
+def test_inactivas_solo_a_pedido():
+    assert 80 not in [t["monto"] for t in consultar(tipo="gasto")]
+    assert 80 in [t["monto"] for t in consultar(tipo="gasto", filtrar_activos=False)]
+
+def test_agrupado_desde_resumenes():
+    grupos = consultar(tipo="gasto", agrupar_por=("mes",), orden="-total")
+    assert grupos == [
+        {"mes": "abril", "total": pytest.approx(50), "cantidad": 1},
+        {"mes": "marzo", "total": pytest.approx(42), "cantidad": 2},
+    ]
+
+def test_agrupado_con_rango_recorre_las_transacciones():
+    grupos = consultar(tipo="gasto", agrupar_por=("categoria",), rango=(date(2025, 3, 1), date(2025, 3, 31)), orden="categoria")
+    assert grupos == [
+        {"categoria": "comida", "total": pytest.approx(30), "cantidad": 1},
+        {"categoria": "comida rápida", "total": pytest.approx(12), "cantidad": 1},
+    ]
@@ -0,0 +1,77 @@
+import json
+import types
+
+import pytest
+
+pytest.importorskip("requests")
+
+import github_sync
+from github_sync import ACTUALIZADO, SIN_CAMBIOS, descargar_si_cambio
+
+URL = "https://raw.githubusercontent.com/usuario/repo/main/transacciones.json"
+
+class GitHubFalso:
+    """Responde 304 cuando el If-None-Match coincide con el ETag vigente."""
+
+    def __init__(self, contenido, etag):
+        self.contenido = contenido
+        self.etag = etag
+        self.peticiones = []
+
+    def request(self, metodo, url, headers=None, timeout=None):
+        self.peticiones.append(dict(headers or {}))
+        if (headers or {}).get("If-None-Match") == self.etag:
+            return types.SimpleNamespace(status_code=304, text="", content=b"", headers={})
+        return types.SimpleNamespace(
+            status_code=200, text=self.contenido, content=self.contenido.encode("utf-8"), headers={"ETag": self.etag}
+        )
+
+@pytest.fixture
+def github(tmp_path, monkeypatch):
+    falso = GitHubFalso('[{"monto": 10}]', '"v1"')
+    monkeypatch.setattr(github_sync, "obtener_sesion", lambda: falso)
+    monkeypatch.setattr(github_sync, "RUTA_ETAGS", str(tmp_path / "etags.json"))
+    monkeypatch.setattr(github_sync, "_etags", None)
+    return falso
+
+def test_304_no_reescribe_el_archivo_local(github, tmp_path):
+    ruta = tmp_path / "transacciones.json"
+
+    assert descargar_si_cambio(URL, str(ruta)) == ACTUALIZADO
+    mtime = ruta.stat().st_mtime_ns
+    assert descargar_si_cambio(URL, str(ruta)) == SIN_CAMBIOS
+
+    assert ruta.stat().st_mtime_ns == mtime
+    assert "If-None-Match" not in github.peticiones[0]
+    assert github.peticiones[1]["If-None-Match"] == '"v1"'
+    assert "gzip" in github.peticiones[1]["Accept-Encoding"]
+
+def test_un_cambio_remoto_reemplaza_el_archivo(github, tmp_path):
+    ruta = tmp_path / "transacciones.json"
+    descargar_si_cambio(URL, str(ruta))
+
+    github.contenido, github.etag = '[{"monto": 20}]', '"v2"'
+    assert descargar_si_cambio(URL, str(ruta)) == ACTUALIZADO
+    assert json.loads(ruta.read_text(encoding="utf-8")) == [{"monto": 20}]
+
+def test_el_etag_sobrevive_a_un_reinicio(github, tmp_path, monkeypatch):
+    ruta = tmp_path / "transacciones.json"
+    descargar_si_cambio(URL, str(ruta))
+
+    # Un proceso nuevo vuelve a leer los ETag desde disco
+    monkeypatch.setattr(github_sync, "_etags", None)
+    assert descargar_si_cambio(URL, str(ruta)) == SIN_CAMBIOS
+
+def test_sin_copia_local_no_se_envia_el_etag(github, tmp_path):
+    ruta = tmp_path / "transacciones.json"
+    descargar_si_cambio(URL, str(ruta))
+    ruta.unlink()
+
+    assert descargar_si_cambio(URL, str(ruta)) == ACTUALIZADO
+    assert "If-None-Match" not in github.peticiones[-1]
+
+def test_contenido_rechazado_no_toca_el_archivo(github, tmp_path):
+    ruta = tmp_path / "transacciones.json"
+    github.contenido = "  "
+    assert descargar_si_cambio(URL, str(ruta), validar=lambda c: bool(c.strip())) is None
+    assert not ruta.exists()
@@ -0,0 +1,69 @@
+import gzip
+import logging
+import os
+
+import pytest
+
+pytest.importorskip("requests")
+
+import envio_logs
+import github_sync
+from envio_logs import ManejadorSegmentos
+
+@pytest.fixture
+def logs(tmp_path, monkeypatch):
+    directorio = tmp_path / "logs"
+    monkeypatch.setattr(envio_logs, "LOGS_DIR", str(directorio))
+    monkeypatch.setattr(envio_logs, "REPLICA", "replica1")
+    manejador = ManejadorSegmentos(str(directorio / "github_sync.log"), tamano_maximo=100)
+    manejador.setFormatter(logging.Formatter("%(message)s"))
+    monkeypatch.setattr(envio_logs, "_manejador", manejador)
+    yield directorio
+    manejador.close()
+
+def escribir(manejador, mensaje):
+    manejador.emit(logging.LogRecord("prueba", logging.INFO, __file__, 0, mensaje, None, None))
+
+def test_el_segmento_se_cierra_al_superar_el_tamano(logs):
+    for i in range(3):
+        escribir(envio_logs._manejador, f"{i}" * 60)
+
+    cerrados = envio_logs._segmentos(comprimidos=False)
+    assert len(cerrados) == 1
+    # Cerrar es solo renombrar: el contenido queda completo y sin comprimir
+    with open(cerrados[0], encoding="utf-8") as f:
+        assert f.read() == "0" * 60 + "\n" + "1" * 60 + "\n"
+    assert os.path.getsize(logs / "github_sync.log") == 61
+
+def test_enviar_comprime_y_sube_cada_segmento_una_vez(logs, monkeypatch):
+    subidos = []
+    def subir(ruta, destino, mensaje):
+        with gzip.open(ruta, "rt", encoding="utf-8") as f:
+            subidos.append((destino, f.read()))
+        return True
+
+    monkeypatch.setattr(github_sync, "GITHUB_TOKEN", "token")
+    monkeypatch.setattr(github_sync, "MODO_SUBIDA", "contents")
+    monkeypatch.setattr(github_sync, "subir_archivo", subir)
+    for i in range(5):
+        escribir(envio_logs._manejador, f"{i}" * 60)
+
+    # Se suben los dos segmentos cerrados; el activo sigue abierto
+    assert envio_logs.enviar_logs() == 2
+    assert [contenido[:1] for _, contenido in subidos] == ["0", "2"]
+    assert all(destino.startswith("logs/") and "/replica1_" in destino and destino.endswith(".log.gz") for destino, _ in subidos)
+    # Lo subido se borra: el siguiente envío no repite nada
+    assert envio_logs._segmentos(comprimidos=True) == []
+    assert envio_logs.enviar_logs() == 0
+    assert len(subidos) == 2
+
+def test_una_subida_fallida_conserva_el_segmento(logs, monkeypatch):
+    monkeypatch.setattr(github_sync, "GITHUB_TOKEN", "token")
+    monkeypatch.setattr(github_sync, "MODO_SUBIDA", "contents")
+    monkeypatch.setattr(github_sync, "subir_archivo", lambda *args: False)
+    envio_logs._manejador.rotar()
+    escribir(envio_logs._manejador, "x" * 10)
+    envio_logs._manejador.rotar()
+
+    assert envio_logs.enviar_logs() == 0
+    assert len(envio_logs._segmentos(comprimidos=True)) == 1
@@ -0,0 +1,105 @@
+import asyncio
+import threading
+
+import pytest
+
+from escritor import Escritor
+from usuarios import como_usuario, usuario_actual
+
+@pytest.fixture
+def escritor():
+    return Escritor(max_cola=100, max_lote=4)
+
+def bloquear(escritor):
+    """Ocupa el escritor hasta que se libere el evento devuelto, para que las tareas se acumulen."""
+    ocupado, liberar = threading.Event(), threading.Event()
+
+    def esperar():
+        ocupado.set()
+        liberar.wait(5)
+
+    escritor.enviar(esperar)
+    assert ocupado.wait(5)
+    return liberar
+
+def test_tareas_de_lote_contiguas_se_juntan(escritor):
+    llamadas = []
+
+    def persistir(elementos):
+        llamadas.append(list(elementos))
+        return [e * 10 for e in elementos]
+
+    liberar = bloquear(escritor)
+    futuros = [escritor.enviar_a_lote(persistir, i) for i in range(6)]
+    liberar.set()
+
+    assert [f.result(5) for f in futuros] == [0, 10, 20, 30, 40, 50]
+    # Una sola llamada por vuelta, con hasta max_lote elementos
+    assert llamadas == [[0, 1, 2, 3], [4, 5]]
+
+def test_no_se_juntan_tareas_de_otros_usuarios_ni_otras_funciones(escritor):
+    llamadas = []
+
+    def persistir(elementos):
+        llamadas.append((usuario_actual(), list(elementos)))
+        return elementos
+
+    liberar = bloquear(escritor)
+    with como_usuario("ana"):
+        futuros = [escritor.enviar_a_lote(persistir, 1)]
+    with como_usuario("beto"):
+        futuros.append(escritor.enviar_a_lote(persistir, 2))
+    futuros.append(escritor.enviar(lambda: "suelta"))
+    with como_usuario("beto"):
+        futuros.append(escritor.enviar_a_lote(persistir, 3))
+    liberar.set()
+
+    assert [f.result(5) for f in futuros] == [1, 2, "suelta", 3]
+    assert llamadas == [("ana", [1]), ("beto", [2]), ("beto", [3])]
+
+def test_error_llega_a_todas_las_tareas_del_lote(escritor):
+    def fallar(elementos):
+        raise RuntimeError("disco lleno")
+
+    liberar = bloquear(escritor)
+    futuros = [escritor.enviar_a_lote(fallar, i) for i in range(2)]
+    liberar.set()
+    for futuro in futuros:
+        with pytest.raises(RuntimeError, match="disco lleno"):
+            futuro.result(5)
+    # El escritor sigue atendiendo
+    assert escritor.ejecutar(lambda: "ok") == "ok"
+
+def test_ejecutar_desde_el_escritor_no_se_bloquea(escritor):
+    assert escritor.ejecutar(lambda: escritor.ejecutar(lambda: escritor.en_escritor())) is True
+
+def test_variantes_async(escritor):
+    async def principal():
+        with como_usuario("ana"):
+            return await asyncio.gather(
+                escritor.ejecutar_async(usuario_actual),
+                escritor.ejecutar_en_lote_async(lambda elementos: [e + 1 for e in elementos], 1),
+            )
+
+    assert asyncio.run(principal()) == ["ana", 2]
+
+def test_estadisticas(escritor):
+    for i in range(3):
+        escritor.ejecutar(lambda: None)
+    estadisticas = escritor.estadisticas()
+    assert estadisticas["tareas"] == 3
+    assert estadisticas["pendientes"] == 0
+
+def test_mutacion_corre_antes_en_el_hilo_de_quien_llama():
+    import escritor as modulo
+
+    hilos = []
+    @modulo.mutacion(antes=lambda: hilos.append(("antes", threading.current_thread())))
+    def mutar(valor):
+        hilos.append(("mutar", threading.current_thread()))
+        return valor * 2
+
+    assert mutar(4) == 8
+    assert [paso for paso, _ in hilos] == ["antes", "mutar"]
+    assert hilos[0][1] is threading.current_thread() is not hilos[1][1]
+    assert modulo.mutacion(lambda: modulo.escritor.en_escritor())() is True
@@ -0,0 +1,67 @@
+import json
+from datetime import date
+
+import pytest
+
+from esquema import VERSION_ESQUEMA, cargar_documento, leer_archivo, leer_documento, migrar, serializar
+
+def test_lista_suelta_es_v1():
+    assert leer_documento([{"monto": "1"}]) == (1, [{"monto": "1"}])
+    assert leer_documento({"version": 2, "registros": []}) == (2, [])
+    with pytest.raises(ValueError):
+        leer_documento({"otra": "cosa"})
+
+def test_migra_transacciones_v1_a_v2():
+    v1 = [{
+        "tipo": " Gasto ", "monto": "1,250.50", "categoria": "Comida", "medio": "YAPE",
+        "dia": "5", "mes": "Abril", "año": "2025", "status": "0",
+    }]
+    t, = cargar_documento(v1, "transacciones")
+    assert t["tipo"] == "gasto"
+    assert t["monto"] == 1250.5
+    assert (t["categoria"], t["medio"]) == ("comida", "yape")
+    assert (t["dia"], t["mes"], t["mes_num"], t["año"]) == (5, "abril", 4, 2025)
+    assert t["fecha_ord"] is not None
+    assert t["status"] == 0
+
+def test_migra_transaccion_incompleta():
+    t, = cargar_documento([{"tipo": "ingreso", "monto": None, "mes": "setiembre"}], "transacciones")
+    assert t["monto"] == 0.0
+    assert t["mes"] == "septiembre"
+    assert t["fecha_ord"] is None
+    assert t["status"] == 1
+
+def test_migra_alertas_v1_a_v2():
+    a, = cargar_documento([{"categoria": "Ocio", "monto": "300", "periodo": "Abril de 2025"}], "alertas")
+    assert (a["categoria"], a["monto"], a["periodo"]) == ("ocio", 300.0, "abril de 2025")
+    assert (a["mes"], a["mes_num"], a["año"], a["status"]) == ("abril", 4, 2025, 1)
+
+def test_version_actual_no_se_migra():
+    registros = [{"monto": "sin normalizar"}]
+    assert migrar(registros, VERSION_ESQUEMA, "transacciones") == [{"monto": "sin normalizar"}]
+
+def test_version_futura_se_rechaza():
+    with pytest.raises(ValueError):
+        migrar([], VERSION_ESQUEMA + 1, "transacciones")
+
+def test_archivo_v1_se_lee_y_reescribe_en_v2(tmp_path):
+    ruta = tmp_path / "transacciones.json"
+    ruta.write_text(json.dumps([{"tipo": "gasto", "monto": "10", "dia": 1, "mes": "marzo", "año": 2025}]), encoding="utf-8")
+    registros = leer_archivo(str(ruta), "transacciones")
+    documento = json.loads(serializar(registros))
+    assert documento["version"] == VERSION_ESQUEMA
+    assert documento["registros"][0]["monto"] == 10.0
+    # Releer un documento ya migrado da lo mismo
+    assert cargar_documento(documento, "transacciones") == documento["registros"]
+
+def test_año_de_dos_cifras_se_completa(transaccion):
+    t = transaccion(año="25", mes="abril", dia=5)
+    assert t["año"] == 2025
+    assert t["fecha_ord"] == date(2025, 4, 5).toordinal()
+
+def test_fecha_dd_mm_aa_al_registrar():
+    pytest.importorskip("requests")
+    from transacciones_io import _preparar_transaccion
+
+    t = _preparar_transaccion({"tipo": "gasto", "monto": 10, "categoria": "comida", "medio": "yape", "fecha": "05/04/25"})
+    assert (t["dia"], t["mes"], t["año"]) == (5, "abril", 2025)
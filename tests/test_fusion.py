@@ -0,0 +1,73 @@
+import pytest
+
+pytest.importorskip("requests")
+
+import github_sync
+from transacciones_io import TransactionStore, _clave_orden
+
+@pytest.fixture
+def store(transaccion):
+    base = [
+        transaccion(dia=1, timestamp="2025-03-01T10:00:00"),
+        transaccion(dia=1, timestamp="2025-03-01T12:00:00"),
+        transaccion(dia=5, timestamp="2025-03-05T10:00:00"),
+    ]
+    store = TransactionStore([], ttl=3600, cargador=lambda: [dict(t) for t in base])
+    store.obtener(sincronizar=False)
+    return store
+
+def orden_por_fecha(store):
+    registros = store.obtener(sincronizar=False)
+    return [registros[p]["timestamp"] for p in store._por_fecha]
+
+def test_alta_local_va_al_final_de_su_fecha(store, transaccion):
+    store.aplicar_cambios(altas=[transaccion(dia=1, timestamp="2025-03-01T13:00:00")])
+    assert orden_por_fecha(store)[:3] == ["2025-03-01T10:00:00", "2025-03-01T12:00:00", "2025-03-01T13:00:00"]
+
+def test_alta_fusionada_mas_antigua_respeta_el_orden(store, transaccion):
+    # Llegan desde GitHub: registradas en otra réplica antes que las locales de su misma fecha
+    store.aplicar_cambios(altas=[
+        transaccion(dia=1, timestamp="2025-03-01T11:00:00"),
+        transaccion(dia=5, timestamp="2025-03-05T09:00:00"),
+        transaccion(dia=3, timestamp="2025-03-03T00:00:00"),
+        transaccion(dia=1, timestamp="2025-03-01T09:00:00"),
+    ])
+    registros = store.obtener(sincronizar=False)
+    clave = _clave_orden("fecha")
+    assert [clave(registros[p]) for p in store._por_fecha] == sorted(clave(t) for t in registros)
+
+    inicio = registros[0]["fecha_ord"]
+    posiciones = store.posiciones_en_rango(inicio, inicio, sincronizar=False)
+    assert [registros[p]["timestamp"][11:] for p in posiciones] == ["09:00:00", "10:00:00", "11:00:00", "12:00:00"]
+
+def test_alta_fusionada_se_encuentra_por_id(store, transaccion):
+    remota = transaccion(dia=2, timestamp="2025-03-02T08:00:00")
+    remota["id"] = "01JNZ0000000000000000000AA"
+    store.aplicar_cambios(altas=[remota])
+    assert store.buscar_por_id("01JNZ0000000000000000000AA")["timestamp"] == "2025-03-02T08:00:00"
+
+# ---------- CONFLICTOS AL SUBIR ----------
+@pytest.fixture
+def bases(monkeypatch):
+    bases = {}
+    monkeypatch.setattr(github_sync, "_obtener_bases", lambda: bases)
+    return bases
+
+github_sync.registrar_fusionador(lambda ruta: ruta == "prueba_fusion.txt", lambda ruta, local, remoto: remoto + local)
+
+def test_sin_cambios_remotos_se_sube_lo_local(bases):
+    bases["prueba_fusion.txt"] = "sha-base"
+    leer_remoto = pytest.fail  # no debe leerse la versión remota
+    assert github_sync._resolver_conflicto("prueba_fusion.txt", b"local", "sha-base", leer_remoto) == b"local"
+    assert github_sync._resolver_conflicto("prueba_fusion.txt", b"local", None, leer_remoto) == b"local"
+
+def test_cambio_remoto_se_fusiona(bases):
+    bases["prueba_fusion.txt"] = "sha-base"
+    fusionado = github_sync._resolver_conflicto("prueba_fusion.txt", b"local", "sha-otro", lambda: b"remoto+")
+    assert fusionado == b"remoto+local"
+
+def test_remoto_ilegible_no_se_sube(bases):
+    assert github_sync._resolver_conflicto("prueba_fusion.txt", b"local", "sha-otro", lambda: None) is None
+
+def test_archivo_sin_fusionador_se_sobrescribe(bases):
+    assert github_sync._resolver_conflicto("otro.bin", b"local", "sha-otro", pytest.fail) == b"local"
@@ -0,0 +1,91 @@
+import asyncio
+import json
+import types
+
+import pytest
+
+pytest.importorskip("requests")
+
+import transacciones_io
+from transacciones_io import consultar
+from usuarios import USUARIO_LEGADO
+
+@pytest.fixture
+def registros(tmp_path, monkeypatch, transaccion):
+    # Cinco movimientos en marzo, dos de ellos el mismo día
+    registros = [
+        transaccion(monto=monto, dia=dia, timestamp=f"2025-03-{dia:02d}T{hora}:00:00")
+        for monto, dia, hora in ((1, 3, 10), (2, 1, 10), (3, 3, 9), (4, 2, 10), (5, 7, 10))
+    ]
+    store = transacciones_io.TransactionStore((str(tmp_path / "vacio"),), 60, lambda: registros)
+    monkeypatch.setattr(transacciones_io, "MODO_ALMACENAMIENTO", "json")
+    monkeypatch.setattr(transacciones_io, "store_transacciones", lambda: store)
+    return store
+
+def paginas(tamaño):
+    despues_de = None
+    while True:
+        pagina = consultar(orden="fecha", despues_de=despues_de, limite=tamaño)
+        if not pagina:
+            return
+        yield [t["monto"] for t in pagina]
+        despues_de = (pagina[-1]["fecha_ord"], pagina[-1]["timestamp"])
+
+def test_paginas_por_clave_en_orden_cronologico(registros):
+    assert list(paginas(2)) == [[2, 4], [3, 1], [5]]
+
+def test_una_alta_antigua_no_corre_la_pagina_siguiente(registros, transaccion):
+    primera = consultar(orden="fecha", limite=2)
+    registros.aplicar_cambios(altas=[transaccion(monto=9, dia=1, timestamp="2025-03-20T00:00:00")])
+
+    despues_de = (primera[-1]["fecha_ord"], primera[-1]["timestamp"])
+    assert [t["monto"] for t in consultar(orden="fecha", despues_de=despues_de, limite=2)] == [3, 1]
+
+def test_despues_de_exige_orden_por_fecha(registros):
+    with pytest.raises(ValueError):
+        consultar(orden="monto", despues_de=(0, ""))
+    with pytest.raises(ValueError):
+        consultar(orden="fecha", agrupar_por=("mes",), despues_de=(0, ""))
+
+# ---------- ACCIONES: "ver más" continúa desde el cursor ----------
+class Despachador:
+    def __init__(self):
+        self.mensajes = []
+
+    def utter_message(self, text=None, **kwargs):
+        self.mensajes.append(text)
+
+@pytest.fixture
+def acciones(registros, monkeypatch):
+    pytest.importorskip("rasa_sdk")
+    import arranque
+    # Importar las acciones no debe lanzar el precalentamiento real
+    monkeypatch.setattr(arranque, "_precalentamiento_iniciado", True)
+    import actions
+
+    monkeypatch.setattr(actions, "TAMAÑO_PAGINA_HISTORIAL", 2)
+    monkeypatch.setattr(actions, "SlotSet", lambda nombre, valor: (nombre, valor))
+    return actions
+
+def test_ver_mas_recorre_el_historial_completo(acciones):
+    despachador = Despachador()
+    criterios = {"tipo": ["ingreso", "gasto"], "parcial": True}
+    eventos = asyncio.run(acciones.enviar_pagina_historial(despachador, criterios))
+
+    vistos = []
+    while dict(eventos).get("historial_cursor"):
+        vistos.append(json.loads(dict(eventos)["historial_cursor"])["pagina"])
+        tracker = types.SimpleNamespace(sender_id=USUARIO_LEGADO, get_slot=dict(eventos).get)
+        eventos = asyncio.run(acciones.ActionVerMasHistorial().run(despachador, tracker, {}))
+
+    assert vistos == [1, 2]
+    assert dict(eventos) == {"historial_cursor": None, "sugerencia_pendiente": "action_consultar_resumen_mensual"}
+    lineas = [linea for mensaje in despachador.mensajes for linea in mensaje.split("\n\n") if linea.startswith("🔸")]
+    assert [linea.split("*")[3] for linea in lineas] == ["2.00 soles", "4.00 soles", "3.00 soles", "1.00 soles", "5.00 soles"]
+    assert "página 3" in despachador.mensajes[-1]
+
+def test_ver_mas_sin_cursor(acciones):
+    despachador = Despachador()
+    tracker = types.SimpleNamespace(sender_id=USUARIO_LEGADO, get_slot=lambda nombre: None)
+    assert asyncio.run(acciones.ActionVerMasHistorial().run(despachador, tracker, {})) == []
+    assert "No hay más movimientos" in despachador.mensajes[0]
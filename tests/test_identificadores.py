@@ -0,0 +1,124 @@
+import json
+import sqlite3
+
+import pytest
+
+import almacen_sqlite
+from identificadores import asegurar_ids, diferencias_por_id, es_id_valido, id_derivado, nuevo_id
+
+def test_nuevo_id_creciente():
+    ids = [nuevo_id() for _ in range(1000)]
+    assert all(es_id_valido(i) for i in ids)
+    assert ids == sorted(ids)
+    assert len(set(ids)) == len(ids)
+
+def test_id_derivado_ignora_campos_mutables():
+    registro = {"timestamp": "2025-03-01T10:00:00", "monto": 10.0, "status": 1}
+    modificado = dict(registro, status=0, timestamp_modificacion="2025-03-02T09:00:00")
+    assert id_derivado(registro) == id_derivado(modificado)
+    assert id_derivado(registro) != id_derivado(dict(registro, monto=11.0))
+
+def test_asegurar_ids_no_repite_en_registros_identicos():
+    registros = [{"timestamp": "2025-03-01T10:00:00", "monto": 10.0} for _ in range(3)]
+    assert asegurar_ids(registros) == 3
+    assert len({r["id"] for r in registros}) == 3
+    # Con id ya asignado no se toca
+    assert asegurar_ids(registros) == 0
+
+def test_indice_por_id_del_store(tmp_path, transaccion):
+    pytest.importorskip("requests")
+    from transacciones_io import TransactionStore
+
+    registros = [transaccion(timestamp="2025-03-01T10:00:00"), transaccion(monto=5, id=nuevo_id())]
+    store = TransactionStore((str(tmp_path / "vacio"),), 60, lambda: registros)
+    store.obtener()
+
+    legado = store.buscar_por_id(id_derivado(registros[0]))
+    assert legado["timestamp"] == "2025-03-01T10:00:00"
+    nueva = transaccion(monto=1, id=nuevo_id())
+    store.aplicar_cambios(altas=[nueva])
+    assert store.buscar_por_id(nueva["id"])["monto"] == 1
+    assert store.buscar_por_id("NO-EXISTE") is None
+
+def test_journal_localiza_bajas_por_id_y_por_timestamp_legado():
+    pytest.importorskip("requests")
+    from transacciones_io import aplicar_operaciones
+
+    registros = [
+        {"id": "A" * 26, "timestamp": "2025-03-01T10:00:00", "status": 1},
+        {"timestamp": "2025-03-01T11:00:00", "status": 1},
+    ]
+    aplicar_operaciones(registros, [
+        {"op": "status", "id": "A" * 26, "status": 0},
+        {"op": "status", "clave": "2025-03-01T11:00:00", "status": 0},
+    ])
+    assert [t["status"] for t in registros] == [0, 0]
+    assert all(es_id_valido(t["id"]) for t in registros)
+
+def test_diferencias_por_id():
+    locales = {
+        "A": {"id": "A", "timestamp": "2025-03-01T10:00:00", "status": 1},
+        "B": {"id": "B", "timestamp": "2025-03-01T11:00:00", "status": 1,
+              "timestamp_modificacion": "2025-03-05T00:00:00"},
+    }
+    remotos = [
+        # Dada de baja en la otra copia después del alta local: gana la remota
+        {"id": "A", "timestamp": "2025-03-01T10:00:00", "status": 0, "timestamp_modificacion": "2025-03-02T00:00:00"},
+        # Modificada antes que la local: gana la local
+        {"id": "B", "timestamp": "2025-03-01T11:00:00", "status": 0, "timestamp_modificacion": "2025-03-04T00:00:00"},
+        # Solo existe en la otra copia: es un alta, aunque comparta timestamp con una local
+        {"id": "C", "timestamp": "2025-03-01T10:00:00", "status": 1},
+    ]
+    faltantes, cambios = diferencias_por_id(locales.get, remotos)
+    assert [r["id"] for r in faltantes] == ["C"]
+    assert [(local["id"], remoto["status"]) for local, remoto in cambios] == [("A", 0)]
+
+# ---------- SQLITE: transacciones identificadas por id ----------
+@pytest.fixture
+def fila(transaccion):
+    return lambda monto, timestamp="2025-03-01T10:00:00", **extra: transaccion(monto=monto, timestamp=timestamp, **extra)
+
+@pytest.fixture
+def base(tmp_path, monkeypatch):
+    ruta = str(tmp_path / "finanzas.db")
+    monkeypatch.setattr(almacen_sqlite, "RUTA_SQLITE", ruta)
+    return ruta
+
+def test_sqlite_no_descarta_registros_con_el_mismo_timestamp(base, fila):
+    assert almacen_sqlite.insertar_transacciones([fila(10)]) == 1
+    # Otra réplica registró en el mismo instante: es otra transacción
+    assert almacen_sqlite.insertar_transacciones([fila(5, descripcion="otra réplica")]) == 1
+    assert almacen_sqlite.contar("transacciones") == 2
+
+def test_sqlite_inserta_una_sola_vez_por_id(base, fila):
+    t = fila(10)
+    almacen_sqlite.insertar_transacciones([t])
+    assert almacen_sqlite.insertar_transacciones([dict(t)]) == 0
+
+def test_sqlite_actualiza_por_id(base, fila):
+    a, b = fila(10), fila(5, descripcion="otra")
+    almacen_sqlite.insertar_transacciones([a, b])
+    almacen_sqlite.actualizar_transacciones([dict(b, status=0)])
+    estados = {t["id"]: t["status"] for t in almacen_sqlite.buscar_transacciones(filtrar_activos=False)}
+    assert estados == {a["id"]: 1, b["id"]: 0}
+
+def test_sqlite_migra_bases_con_clave_por_timestamp(base, fila):
+    conn = sqlite3.connect(base)
+    conn.execute(
+        "CREATE TABLE transacciones (id INTEGER PRIMARY KEY AUTOINCREMENT, clave TEXT UNIQUE, tipo TEXT, "
+        "categoria TEXT, medio TEXT, mes TEXT, anio INTEGER, monto REAL, status INTEGER NOT NULL DEFAULT 1, "
+        "datos TEXT NOT NULL)"
+    )
+    for i in range(2):
+        t = fila(10 + i, timestamp=f"2025-03-01T10:00:0{i}")
+        conn.execute("INSERT INTO transacciones (clave, datos) VALUES (?, ?)", (t["timestamp"], json.dumps(t)))
+    conn.commit()
+    conn.close()
+
+    registros = almacen_sqlite.buscar_transacciones(filtrar_activos=False)
+    assert all(es_id_valido(t["id"]) for t in registros)
+    uids = [fila[0] for fila in almacen_sqlite.conectar().execute("SELECT uid FROM transacciones ORDER BY id")]
+    assert uids == [t["id"] for t in registros]
+
+    # La clave antigua ya no impide registrar otra transacción con un timestamp existente
+    assert almacen_sqlite.insertar_transacciones([fila(3, timestamp="2025-03-01T10:00:00", descripcion="x")]) == 1
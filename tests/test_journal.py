@@ -0,0 +1,79 @@
+import json
+import types
+
+import pytest
+
+pytest.importorskip("requests")
+
+import transacciones_io
+from esquema import leer_archivo
+from transacciones_io import aplicar_operaciones, leer_journal
+from usuarios import PorUsuario
+
+def alta(timestamp, monto=10):
+    return {"op": "alta", "registro": {"tipo": "gasto", "monto": monto, "timestamp": timestamp, "status": 1}}
+
+def baja(timestamp):
+    return {"op": "status", "clave": timestamp, "status": 0, "timestamp_modificacion": "2025-05-02T00:00:00"}
+
+def anexar(ruta, operaciones):
+    with open(ruta, "a", encoding="utf-8") as f:
+        for op in operaciones:
+            f.write(json.dumps(op) + "\n")
+
+@pytest.fixture
+def rutas(tmp_path, monkeypatch):
+    snapshot = str(tmp_path / "transacciones.json")
+    journal = str(tmp_path / "transacciones.jsonl")
+    with open(snapshot, "w", encoding="utf-8") as f:
+        json.dump([alta("t1")["registro"]], f)
+
+    monkeypatch.setattr(transacciones_io, "RUTA_TRANSACCIONES", snapshot)
+    monkeypatch.setattr(transacciones_io, "RUTA_JOURNAL", journal)
+    monkeypatch.setattr(transacciones_io, "MODO_ALMACENAMIENTO", "journal")
+    # Espacios nuevos: el del usuario legado toma las rutas de arriba
+    monkeypatch.setattr(transacciones_io, "_espacios", PorUsuario(transacciones_io.EspacioTransacciones))
+    monkeypatch.setattr(transacciones_io, "descargar_de_github", lambda: False)
+    subidas = []
+    monkeypatch.setattr(transacciones_io, "encolar_subida", lambda local, destino, mensaje: subidas.append(local))
+    return types.SimpleNamespace(snapshot=snapshot, journal=journal, subidas=subidas)
+
+def test_aplicar_operaciones_es_idempotente():
+    registros = aplicar_operaciones([], [alta("t1"), alta("t2"), baja("t1")])
+    repetidos = aplicar_operaciones([dict(t) for t in registros], [alta("t1"), alta("t2"), baja("t1")])
+    assert repetidos == registros
+    assert [(t["timestamp"], t["status"]) for t in registros] == [("t1", 0), ("t2", 1)]
+
+def test_leer_journal_ignora_una_linea_truncada(tmp_path):
+    ruta = tmp_path / "transacciones.jsonl"
+    ruta.write_text(json.dumps(alta("t1")) + "\n" + '{"op": "alta", "regis', encoding="utf-8")
+    assert leer_journal(str(ruta)) == [alta("t1")]
+
+def test_el_store_reproduce_el_journal_sobre_el_snapshot(rutas):
+    anexar(rutas.journal, [alta("t2", monto=5), baja("t1")])
+    registros = transacciones_io.store_transacciones().obtener(sincronizar=False)
+    assert [(t["timestamp"], t["status"]) for t in registros] == [("t1", 0), ("t2", 1)]
+    assert transacciones_io.hay_journal_pendiente()
+
+def test_compactar_pliega_el_journal_en_el_snapshot(rutas):
+    anexar(rutas.journal, [alta("t2", monto=5), baja("t1")])
+
+    assert transacciones_io.compactar_journal()
+
+    snapshot = leer_archivo(rutas.snapshot, "transacciones")
+    assert [(t["timestamp"], t["status"]) for t in snapshot] == [("t1", 0), ("t2", 1)]
+    assert not transacciones_io.hay_journal_pendiente()
+    assert rutas.subidas == [rutas.snapshot]
+    # Sin operaciones pendientes no hay nada que compactar ni subir
+    assert not transacciones_io.compactar_journal()
+    assert len(rutas.subidas) == 1
+
+def test_compactar_conserva_un_journal_rotado_de_un_intento_previo(rutas):
+    anexar(rutas.journal + ".compactando", [alta("t2")])
+    anexar(rutas.journal, [alta("t3")])
+
+    assert transacciones_io.compactar_journal()
+
+    assert [t["timestamp"] for t in leer_archivo(rutas.snapshot, "transacciones")] == ["t1", "t2", "t3"]
+    # El journal vivo no se rota mientras quede uno rotado: sus operaciones siguen pendientes
+    assert leer_journal(rutas.journal) == [alta("t3")]
@@ -0,0 +1,67 @@
+import pytest
+
+pytest.importorskip("requests")
+
+import github_sync
+
+@pytest.fixture
+def outbox(tmp_path, monkeypatch):
+    subidas = []
+    monkeypatch.setattr(github_sync, "OUTBOX_DIR", str(tmp_path / "outbox"))
+    monkeypatch.setattr(github_sync, "OUTBOX_MAX_PENDIENTES", 3)
+    monkeypatch.setattr(github_sync, "GITHUB_TOKEN", "token")
+    # El flusher se ejercita llamando a vaciar_outbox() a mano
+    monkeypatch.setattr(github_sync, "_iniciar_flusher", lambda: None)
+    monkeypatch.setattr(github_sync, "subir_archivo", lambda local, destino, mensaje: subidas.append((destino, mensaje)) or True)
+    github_sync._evento_flush.clear()
+    yield subidas
+    github_sync._evento_flush.clear()
+
+def test_escrituras_al_mismo_destino_se_funden(outbox):
+    github_sync.encolar_subida("/tmp/transacciones.json", "transacciones.json", "primera")
+    github_sync.encolar_subida("/tmp/transacciones.json", "transacciones.json", "segunda")
+    github_sync.encolar_subida("/tmp/alertas.json", "alertas.json", "alerta")
+
+    pendientes = github_sync.subidas_pendientes()
+    assert [(e["ruta_destino"], e["mensaje"]) for e in pendientes] == [
+        ("transacciones.json", "segunda"), ("alertas.json", "alerta"),
+    ]
+    assert github_sync.hay_subida_pendiente("transacciones.json")
+
+def test_vaciar_sube_una_vez_por_archivo(outbox):
+    for mensaje in ("a", "b", "c"):
+        github_sync.encolar_subida("/tmp/transacciones.json", "transacciones.json", mensaje)
+    github_sync.encolar_subida("/tmp/alertas.json", "alertas.json", "alerta")
+
+    assert github_sync.vaciar_outbox() == 2
+    assert outbox == [("transacciones.json", "c"), ("alertas.json", "alerta")]
+    assert github_sync.subidas_pendientes() == []
+    # Sin pendientes no se vuelve a subir nada
+    assert github_sync.vaciar_outbox() == 0
+    assert len(outbox) == 2
+
+def test_una_subida_fallida_queda_para_el_siguiente_ciclo(outbox, monkeypatch):
+    github_sync.encolar_subida("/tmp/alertas.json", "alertas.json", "alerta")
+    monkeypatch.setattr(github_sync, "subir_archivo", lambda *args: False)
+
+    assert github_sync.vaciar_outbox() == 0
+    assert github_sync.hay_subida_pendiente("alertas.json")
+    assert outbox == []
+
+def test_un_reencolado_durante_la_subida_sobrevive(outbox, monkeypatch):
+    github_sync.encolar_subida("/tmp/alertas.json", "alertas.json", "vieja")
+
+    def subir_y_reencolar(local, destino, mensaje):
+        github_sync.encolar_subida(local, destino, "nueva")
+        return True
+
+    monkeypatch.setattr(github_sync, "subir_archivo", subir_y_reencolar)
+    assert github_sync.vaciar_outbox() == 1
+    assert [e["mensaje"] for e in github_sync.subidas_pendientes()] == ["nueva"]
+
+def test_el_umbral_de_pendientes_despierta_al_flusher(outbox):
+    github_sync.encolar_subida("/tmp/a.json", "a.json", "a")
+    github_sync.encolar_subida("/tmp/b.json", "b.json", "b")
+    assert not github_sync._evento_flush.is_set()
+    github_sync.encolar_subida("/tmp/c.json", "c.json", "c")
+    assert github_sync._evento_flush.is_set()
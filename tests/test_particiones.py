@@ -0,0 +1,87 @@
+import json
+import os
+
+import pytest
+
+pytest.importorskip("requests")
+
+import particiones
+from github_sync import ACTUALIZADO, SIN_CAMBIOS
+
+@pytest.fixture
+def subidas(tmp_path, monkeypatch):
+    directorio = str(tmp_path / "transacciones")
+    monkeypatch.setattr(particiones, "DIR_PARTICIONES", directorio)
+    monkeypatch.setattr(particiones, "hay_subida_pendiente", lambda destino: False)
+    encoladas = []
+    monkeypatch.setattr(particiones, "encolar_subida", lambda local, destino, mensaje: encoladas.append(destino))
+    return encoladas
+
+def test_clave_particion():
+    assert particiones.clave_particion(2025, "Abril") == "2025/04"
+    assert particiones.clave_particion("2,025", "diciembre") == "2025/12"
+    assert particiones.clave_particion(None, "abril") == particiones.SIN_FECHA
+    assert particiones.clave_particion(2025, "abr") == particiones.SIN_FECHA
+
+def test_escribir_actualiza_el_manifiesto_y_encola_solo_lo_tocado(subidas, transaccion):
+    particiones.escribir_particiones(particiones.agrupar([
+        transaccion(monto=10, mes="abril"), transaccion(monto=5, status=0, mes="abril"), transaccion(monto=7, mes="mayo"),
+    ]), "alta")
+
+    manifest = particiones.leer_manifest()["particiones"]
+    assert {clave: (info["registros"], info["activos"]) for clave, info in manifest.items()} == {
+        "2025/04": (2, 1), "2025/05": (1, 1),
+    }
+    assert subidas == ["transacciones/2025/04.json", "transacciones/2025/05.json", "transacciones/manifest.json"]
+
+    subidas.clear()
+    mayo = particiones.ruta_local("2025/05")
+    mtime_mayo = os.stat(mayo).st_mtime_ns
+    particiones.escribir_particiones({"2025/04": [transaccion(monto=10, mes="abril")]}, "baja")
+
+    assert os.stat(mayo).st_mtime_ns == mtime_mayo
+    assert subidas == ["transacciones/2025/04.json", "transacciones/manifest.json"]
+    assert [t["monto"] for t in particiones.cargar_todas()] == [10, 7]
+
+def test_migrar_desde_json(subidas, tmp_path, transaccion):
+    origen = tmp_path / "transacciones.json"
+    origen.write_text(json.dumps([transaccion(monto=1, mes="abril"), transaccion(monto=2, mes="enero", año=2024), transaccion(monto=3, año="", mes="abril")]))
+
+    assert particiones.migrar_desde_json(str(origen)) == {"2024/01": 1, "2025/04": 1, particiones.SIN_FECHA: 1}
+    assert len(particiones.cargar_todas()) == 3
+
+def test_sincronizar_solo_descarga_las_particiones_que_cambiaron(subidas, monkeypatch, transaccion):
+    particiones.escribir_particiones(particiones.agrupar([transaccion(monto=10, mes="abril"), transaccion(monto=7, mes="mayo")]), "alta")
+    local = particiones.leer_manifest()
+    # En GitHub, abril cambió y mayo sigue igual
+    remoto = json.loads(json.dumps(local))
+    remoto["particiones"]["2025/04"]["hash"] = "otro"
+    contenido_remoto = {
+        "transacciones/manifest.json": json.dumps(remoto),
+        "transacciones/2025/04.json": json.dumps([transaccion(monto=99, mes="abril")]),
+    }
+
+    descargas = []
+    def descargar(url, ruta_local, headers=None, validar=None, ruta_destino=None):
+        destino = url.replace(particiones.GITHUB_RAW_URL, "")
+        descargas.append(destino)
+        with open(ruta_local, "w", encoding="utf-8") as f:
+            f.write(contenido_remoto[destino])
+        return ACTUALIZADO
+
+    monkeypatch.setattr(particiones, "descargar_si_cambio", descargar)
+    assert particiones.sincronizar()
+    assert descargas == ["transacciones/manifest.json", "transacciones/2025/04.json"]
+    assert [t["monto"] for t in particiones.cargar_todas()] == [99, 7]
+    assert particiones.leer_manifest()["particiones"]["2025/04"]["hash"] == "otro"
+
+    # Un 304 del manifiesto evita revisar las particiones
+    descargas.clear()
+    monkeypatch.setattr(particiones, "descargar_si_cambio", lambda url, *args, **kwargs: descargas.append(url) or SIN_CAMBIOS)
+    assert particiones.sincronizar()
+    assert len(descargas) == 1
+
+def test_sincronizar_respeta_las_particiones_pendientes_de_subir(subidas, monkeypatch):
+    monkeypatch.setattr(particiones, "hay_subida_pendiente", lambda destino: destino.endswith("manifest.json"))
+    monkeypatch.setattr(particiones, "descargar_si_cambio", lambda *args, **kwargs: pytest.fail("no debía descargar"))
+    assert not particiones.sincronizar()
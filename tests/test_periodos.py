@@ -0,0 +1,77 @@
+from datetime import date
+
+import pytest
+
+from periodos import extraer_periodos, formatear_fecha, parse_periodo, parse_rango
+
+HOY = date(2026, 5, 20)
+
+@pytest.mark.parametrize("texto, esperado", [
+    ("abril de 2025", (2025, 4)),
+    ("gastos de setiembre del 2024", (2024, 9)),
+    ("en marzo", (2026, 3)),
+    ("este mes", (2026, 5)),
+    ("el mes pasado", (2026, 4)),
+    ("", None),
+    ("nada que ver", None),
+])
+def test_parse_periodo(texto, esperado):
+    assert parse_periodo(texto, HOY) == esperado
+
+def test_parse_periodo_mes_pasado_en_enero():
+    assert parse_periodo("mes anterior", date(2026, 1, 10)) == (2025, 12)
+
+def test_parse_periodo_requiere_año():
+    assert parse_periodo("marzo", HOY, requiere_año=True) is None
+    assert parse_periodo("marzo de 2024", HOY, requiere_año=True) == (2024, 3)
+
+@pytest.mark.parametrize("texto, esperado", [
+    ("del 1 al 15 de abril", (date(2026, 4, 1), date(2026, 4, 15))),
+    ("desde el 28 de marzo hasta el 3 de abril de 2025", (date(2025, 3, 28), date(2025, 4, 3))),
+    ("del 20 de diciembre al 5 de enero de 2025", (date(2024, 12, 20), date(2025, 1, 5))),
+    ("entre el 15/04/2025 y el 01/04/2025", (date(2025, 4, 1), date(2025, 4, 15))),
+    ("últimos 30 días", (date(2026, 4, 21), HOY)),
+    ("ultimas 2 semanas", (date(2026, 5, 7), HOY)),
+    ("últimos 3 meses", (date(2026, 2, 21), HOY)),
+    ("la semana pasada", (date(2026, 5, 14), HOY)),
+    ("esta semana", (date(2026, 5, 18), HOY)),
+    ("del 31 al 35 de abril", None),
+    ("abril de 2025", None),
+])
+def test_parse_rango(texto, esperado):
+    assert parse_rango(texto, HOY) == esperado
+
+@pytest.mark.parametrize("texto, esperado", [
+    ("cuánto gasté hoy", (HOY, HOY)),
+    ("gastos de ayer", (date(2026, 5, 19), date(2026, 5, 19))),
+])
+def test_hoy_y_ayer_sin_periodo(texto, esperado):
+    assert parse_rango(texto, HOY) == esperado
+
+@pytest.mark.parametrize("texto, periodo", [
+    ("¿cuánto gasté en comida hasta hoy en marzo?", (2026, 3)),
+    ("lo que registré ayer de abril", (2026, 4)),
+    ("gastos de este mes hasta hoy", (2026, 5)),
+])
+def test_hoy_y_ayer_no_pisan_el_mes(texto, periodo):
+    assert parse_rango(texto, HOY) is None
+    assert parse_periodo(texto, HOY) == periodo
+
+def test_rango_explicito_gana_a_hoy():
+    assert parse_rango("del 1 al 5 de marzo hasta hoy", HOY) == (date(2026, 3, 1), date(2026, 3, 5))
+
+def test_extraer_periodos_es_inmutable():
+    periodos = extraer_periodos("marzo de 2024 y abril del 2025")
+    assert periodos == ((2024, 3), (2025, 4))
+    # El resultado sale del caché: nadie puede modificarlo para las llamadas siguientes
+    assert isinstance(periodos, tuple)
+    assert extraer_periodos("marzo de 2024 y abril del 2025") is periodos
+
+@pytest.mark.parametrize("fecha, esperado", [
+    ("05/04/2025", "5 de abril de 2025"),
+    ("05/04/25", "5 de abril de 2025"),
+    ("5/4", "5/4"),
+    ("31/13/25", "31/13/25"),
+])
+def test_formatear_fecha(fecha, esperado):
+    assert formatear_fecha(fecha) == esperado
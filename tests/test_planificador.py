@@ -0,0 +1,128 @@
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("requests")
+
+import github_sync
+from github_sync import GITHUB_API_BASE, LimiteDeGitHub, PlanificadorGitHub
+
+URL = GITHUB_API_BASE + "repos/dueño/repo/contents/transacciones.json"
+
+class Respuesta:
+    def __init__(self, status_code=200, headers=None, text=""):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.text = text
+        self.content = text.encode("utf-8")
+
+class Sesion:
+    """Devuelve las respuestas en orden (la última se repite) y cuenta las peticiones."""
+
+    def __init__(self, *respuestas, antes=None):
+        self.respuestas = list(respuestas)
+        self.antes = antes
+        self.peticiones = 0
+
+    def request(self, metodo, url, **kwargs):
+        self.peticiones += 1
+        if self.antes:
+            self.antes()
+        return self.respuestas.pop(0) if len(self.respuestas) > 1 else self.respuestas[0]
+
+@pytest.fixture
+def planificador(monkeypatch):
+    planificador = PlanificadorGitHub()
+    planificador.esperas = []
+    # Se anotan las esperas en lugar de dormir (las de 0 s, turnos sin espera, no cuentan)
+    monkeypatch.setattr(planificador, "_dormir", lambda segundos: segundos > 0 and planificador.esperas.append(segundos))
+    monkeypatch.setattr(github_sync.random, "uniform", lambda a, b: 1.0)
+    # Sin espaciado entre escrituras: solo se miden las esperas de los reintentos
+    monkeypatch.setattr(github_sync, "INTERVALO_ESCRITURAS", 0.0)
+    return planificador
+
+def usar(monkeypatch, sesion):
+    monkeypatch.setattr(github_sync, "obtener_sesion", lambda: sesion)
+    return sesion
+
+def test_lecturas_identicas_simultaneas_se_colapsan(planificador, monkeypatch):
+    liberar = threading.Event()
+    sesion = usar(monkeypatch, Sesion(Respuesta(text="contenido"), antes=lambda: liberar.wait(5)))
+    resultados = []
+    hilos = [threading.Thread(target=lambda: resultados.append(planificador.get(URL, headers={"A": "1"}))) for _ in range(5)]
+    for hilo in hilos:
+        hilo.start()
+    limite = time.monotonic() + 5
+    while planificador.colapsadas < 4 and time.monotonic() < limite:
+        time.sleep(0.01)
+    liberar.set()
+    for hilo in hilos:
+        hilo.join(5)
+
+    assert sesion.peticiones == 1
+    assert planificador.colapsadas == 4
+    assert len(resultados) == 5 and all(r is resultados[0] for r in resultados)
+
+def test_lecturas_distintas_no_se_colapsan(planificador, monkeypatch):
+    sesion = usar(monkeypatch, Sesion(Respuesta()))
+    planificador.get(URL, headers={"If-None-Match": "a"})
+    planificador.get(URL, headers={"If-None-Match": "b"})
+    assert sesion.peticiones == 2
+    assert planificador.colapsadas == 0
+
+def test_backoff_exponencial_ante_5xx(planificador, monkeypatch):
+    monkeypatch.setattr(github_sync, "ESPERA_REINTENTO", 0.25)
+    sesion = usar(monkeypatch, Sesion(Respuesta(502), Respuesta(503), Respuesta(200)))
+    assert planificador.put(URL).status_code == 200
+    assert sesion.peticiones == 3
+    assert planificador.esperas == [0.25, 0.5]
+    assert planificador.reintentos == 2
+
+def test_backoff_con_tope_propio(planificador, monkeypatch):
+    monkeypatch.setattr(github_sync, "ESPERA_REINTENTO", 1.0)
+    monkeypatch.setattr(github_sync, "ESPERA_MAXIMA_REINTENTO", 1.5)
+    # El tope de los conflictos no interviene en los reintentos del planificador
+    monkeypatch.setattr(github_sync, "ESPERA_MAXIMA_CONFLICTO", 0.01)
+    monkeypatch.setattr(github_sync, "REINTENTOS", 4)
+    usar(monkeypatch, Sesion(Respuesta(500)))
+    assert planificador.put(URL).status_code == 500
+    assert planificador.esperas == [1.0, 1.5, 1.5, 1.5]
+
+def test_respeta_retry_after_y_pausa_a_las_demas(planificador, monkeypatch):
+    sesion = usar(monkeypatch, Sesion(Respuesta(429, {"Retry-After": "1"}), Respuesta(200)))
+    assert planificador.put(URL).status_code == 200
+    assert sesion.peticiones == 2
+    assert 1.0 in planificador.esperas
+    assert planificador.pausa_restante() > 0
+
+def test_lectura_no_espera_mas_de_lo_admitido(planificador, monkeypatch):
+    sesion = usar(monkeypatch, Sesion(Respuesta(429, {"Retry-After": "30"})))
+    assert planificador.get(URL).status_code == 429
+    assert sesion.peticiones == 1
+    # El presupuesto está en pausa: la siguiente lectura desiste en vez de esperar
+    with pytest.raises(LimiteDeGitHub):
+        planificador.get(URL + "?otra=1")
+
+def test_escrituras_espaciadas(planificador, monkeypatch):
+    monkeypatch.setattr(github_sync, "INTERVALO_ESCRITURAS", 1.0)
+    usar(monkeypatch, Sesion(Respuesta(201)))
+    planificador.put(URL)
+    planificador.put(URL)
+    assert len(planificador.esperas) == 1 and 0.9 < planificador.esperas[0] <= 1.0
+
+def test_errores_no_reintentables(planificador, monkeypatch):
+    sesion = usar(monkeypatch, Sesion(Respuesta(404), Respuesta(403, text="forbidden")))
+    assert planificador.get(URL).status_code == 404
+    assert planificador.get(URL).status_code == 403
+    assert sesion.peticiones == 2
+    assert planificador.esperas == []
+
+def test_presupuesto_en_reserva_espacia_las_peticiones(planificador, monkeypatch):
+    reinicio = int(time.time()) + 100
+    cabeceras = {"X-RateLimit-Remaining": "10", "X-RateLimit-Limit": "5000", "X-RateLimit-Reset": str(reinicio)}
+    usar(monkeypatch, Sesion(Respuesta(200, cabeceras)))
+    planificador.get(URL)
+    assert planificador.estadisticas()["restantes"] == 10
+    # Quedan 10 peticiones para ~100 s: una cada ~10 s
+    assert planificador._intervalo() == pytest.approx(10, abs=0.5)
@@ -0,0 +1,43 @@
+import json
+import sys
+
+import pytest
+
+from registros import Alerta, Transaccion, compactar, serializable
+
+def test_se_comporta_como_diccionario(transaccion):
+    original = transaccion(monto=12.5, timestamp="2025-03-01T10:00:00", nota="extra")
+    t = Transaccion(original)
+
+    assert dict(t) == original
+    assert t["monto"] == 12.5 and t.get("nota") == "extra"
+    assert t.get("timestamp_modificacion", "no") == "no"
+    assert "nota" in t and "timestamp_modificacion" not in t
+
+    t.update({"status": 0, "timestamp_modificacion": "2025-03-02T00:00:00"})
+    assert t["status"] == 0 and len(t) == len(original) + 1
+    del t["nota"]
+    with pytest.raises(KeyError):
+        t["nota"]
+
+def test_sin_dict_por_registro():
+    t = Transaccion({"tipo": "gasto"})
+    assert not hasattr(t, "__dict__")
+    with pytest.raises(KeyError):
+        t["monto"]
+
+def test_categoricos_internados():
+    a = Transaccion({"categoria": "".join(["com", "ida"])})
+    b = Transaccion({"categoria": "".join(["co", "mida"])})
+    assert a["categoria"] is b["categoria"] is sys.intern("comida")
+
+def test_compactar_reutiliza_los_ya_compactos():
+    ya = Alerta({"categoria": "ocio"})
+    alertas = compactar([ya, {"categoria": "ropa"}], Alerta)
+    assert alertas[0] is ya and isinstance(alertas[1], Alerta)
+
+def test_se_serializa_como_diccionario(transaccion):
+    t = Transaccion(transaccion(monto=3))
+    assert json.loads(json.dumps([t], default=serializable)) == [dict(t)]
+    with pytest.raises(TypeError):
+        json.dumps(object(), default=serializable)
@@ -0,0 +1,69 @@
+import pytest
+
+from resumenes import ResumenesMensuales
+
+@pytest.fixture
+def resumenes(transaccion):
+    r = ResumenesMensuales()
+    r.reconstruir([
+        transaccion("gasto", 10),
+        transaccion("gasto", 5.5, categoria="transporte", medio="efectivo"),
+        transaccion("gasto", 20, mes="abril"),
+        transaccion("ingreso", 100, categoria="sueldo", medio="banco"),
+        transaccion("gasto", 999, status=0),
+    ])
+    return r
+
+def test_totales_por_proyeccion(resumenes):
+    assert resumenes.total(tipo="gasto") == pytest.approx(35.5)
+    assert resumenes.total(tipo="gasto", medio="yape") == pytest.approx(30)
+    assert resumenes.total(año=2025, mes="marzo", tipo="gasto") == pytest.approx(15.5)
+    assert resumenes.total(año=2025, mes="marzo", tipo="gasto", categoria="comida") == pytest.approx(10)
+
+def test_total_sin_proyeccion_propia(resumenes):
+    # (categoria,) no tiene tabla: se suma desde la clave completa
+    assert resumenes.total(categoria="comida") == pytest.approx(30)
+    assert resumenes.total(tipo="gasto", categoria="transporte", medio="efectivo") == pytest.approx(5.5)
+
+def test_filtros_se_normalizan(resumenes):
+    assert resumenes.total(año="2025", mes=" Marzo ", tipo="GASTO") == pytest.approx(15.5)
+    assert resumenes.total(tipo="gasto", medio=None, categoria="") == pytest.approx(35.5)
+
+def test_inactivas_no_cuentan(resumenes):
+    assert resumenes.total(tipo="gasto", categoria="comida", mes="marzo", año=2025) == pytest.approx(10)
+
+def test_alta_y_baja_incrementales(resumenes, transaccion):
+    nueva = transaccion("gasto", 7, mes="abril")
+    resumenes.aplicar(nueva, 1)
+    assert resumenes.totales_por_mes("gasto") == {(2025, "marzo"): pytest.approx(15.5), (2025, "abril"): pytest.approx(27)}
+
+    resumenes.aplicar(nueva, -1)
+    resumenes.aplicar(transaccion("gasto", 20, mes="abril"), -1)
+    # La clave que quedó en cero desaparece, en vez de arrastrar un total 0.0
+    assert resumenes.totales_por_mes("gasto") == {(2025, "marzo"): pytest.approx(15.5)}
+    assert (2025, "abril", "gasto", "comida", "yape") not in resumenes.instantanea()
+
+def test_totales_por_mes_filtra_año(resumenes, transaccion):
+    resumenes.aplicar(transaccion("gasto", 3, año=2024), 1)
+    assert resumenes.totales_por_mes("gasto", año=2024) == {(2024, "marzo"): pytest.approx(3)}
+
+def test_reconstruir_resumenes_corrige_el_desfase(tmp_path, monkeypatch, transaccion):
+    pytest.importorskip("requests")
+    import transacciones_io
+
+    registros = [transaccion("gasto", 10), transaccion("gasto", 4, mes="abril")]
+    store = transacciones_io.TransactionStore((str(tmp_path / "vacio"),), 60, lambda: registros)
+    monkeypatch.setattr(transacciones_io, "store_transacciones", lambda: store)
+    en_memoria = store.obtener(sincronizar=False)
+
+    assert transacciones_io.reconstruir_resumenes() == 0
+    # Una baja que no pasó por aplicar_cambios deja los totales desfasados
+    en_memoria[0]["status"] = 0
+    assert transacciones_io.reconstruir_resumenes() == 1
+    assert transacciones_io.obtener_resumenes().total(tipo="gasto") == pytest.approx(4)
+
+def test_agregados_con_cantidades(resumenes, transaccion):
+    resumenes.aplicar(transaccion("gasto", 2), 1)
+    agregados = {clave: (total, cantidad) for clave, total, cantidad in resumenes.agregados()}
+    assert agregados[(2025, "marzo", "gasto", "comida", "yape")] == (pytest.approx(12), 2)
+    assert agregados[(2025, "marzo", "ingreso", "sueldo", "banco")] == (pytest.approx(100), 1)
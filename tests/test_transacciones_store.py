@@ -0,0 +1,88 @@
+import json
+import os
+from datetime import date
+
+import pytest
+
+pytest.importorskip("requests")
+
+from transacciones_io import TransactionStore, leer_archivo_transacciones
+
+def escribir(ruta, registros):
+    with open(ruta, "w", encoding="utf-8") as f:
+        json.dump(registros, f)
+    # Otra versión local: el mtime puede no cambiar entre dos escrituras seguidas
+    info = os.stat(ruta)
+    os.utime(ruta, ns=(info.st_atime_ns, info.st_mtime_ns + 1_000_000))
+
+def nuevo_store(ruta, ttl, sincronizador=None):
+    return TransactionStore((ruta,), ttl, lambda: leer_archivo_transacciones(ruta), sincronizador)
+
+@pytest.fixture
+def ruta(tmp_path):
+    ruta = str(tmp_path / "transacciones.json")
+    escribir(ruta, [{"tipo": "gasto", "monto": 10}])
+    return ruta
+
+def test_reutiliza_la_copia_mientras_no_cambie_el_archivo(ruta):
+    store = nuevo_store(ruta, ttl=60)
+    primera = store.obtener()
+    assert store.obtener() is primera
+    assert (store.hits, store.misses) == (1, 1)
+
+def test_relee_cuando_cambia_el_archivo(ruta):
+    store = nuevo_store(ruta, ttl=60)
+    store.obtener()
+    escribir(ruta, [{"tipo": "gasto", "monto": 10}, {"tipo": "ingreso", "monto": 5}])
+    assert len(store.obtener()) == 2
+    assert store.misses == 2
+
+def test_sincroniza_solo_al_vencer_la_ventana(ruta):
+    llamadas = []
+    store = nuevo_store(ruta, ttl=60, sincronizador=lambda: llamadas.append(1) or True)
+    store.obtener()
+    store.obtener()
+    assert len(llamadas) == 1
+    store.obtener(sincronizar=False)
+    assert len(llamadas) == 1
+
+    store.invalidar()
+    store.obtener()
+    assert len(llamadas) == 2
+
+def test_sincronizacion_fallida_no_se_reintenta_en_cada_lectura(ruta):
+    llamadas = []
+    store = nuevo_store(ruta, ttl=60, sincronizador=lambda: llamadas.append(1) and False)
+    assert [t["monto"] for t in store.obtener()] == [10]
+    store.obtener()
+    assert len(llamadas) == 1
+
+def test_ttl_cero_sincroniza_siempre(ruta):
+    llamadas = []
+    store = nuevo_store(ruta, ttl=0, sincronizador=lambda: llamadas.append(1) or True)
+    store.obtener()
+    store.obtener()
+    assert len(llamadas) == 2
+
+def test_reemplazar_evita_releer(ruta, transaccion):
+    store = nuevo_store(ruta, ttl=60)
+    store.obtener()
+    nuevos = [transaccion(monto=1)]
+    escribir(ruta, nuevos)
+    store.reemplazar(nuevos)
+    assert [t["monto"] for t in store.obtener()] == [1]
+    assert store.estadisticas() == {"hits": 1, "misses": 1, "hit_ratio": 0.5, "registros": 1}
+
+def test_archivo_inexistente_da_lista_vacia(tmp_path):
+    assert nuevo_store(str(tmp_path / "no_existe.json"), ttl=60).obtener() == []
+
+def test_indice_por_fecha_sigue_a_altas_y_bajas(tmp_path, transaccion):
+    registros = [transaccion(monto=1, dia=10), transaccion(monto=2, dia=3), transaccion(monto=3, dia=20)]
+    store = TransactionStore((str(tmp_path / "vacio"),), 60, lambda: registros)
+    montos = lambda posiciones: [store.obtener(sincronizar=False)[p]["monto"] for p in posiciones]
+    marzo = lambda dia: date(2025, 3, dia).toordinal()
+
+    assert montos(store.posiciones_en_rango(marzo(1), marzo(10), sincronizar=False)) == [2, 1]
+    store.aplicar_cambios(altas=[transaccion(monto=4, dia=5)])
+    assert montos(store.posiciones_en_rango(marzo(4), marzo(31), sincronizar=False)) == [4, 1, 3]
+    assert store.posiciones_en_rango(marzo(11), marzo(19), sincronizar=False).tolist() == []
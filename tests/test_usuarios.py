@@ -0,0 +1,60 @@
+import asyncio
+
+import pytest
+
+import usuarios
+from asincrono import en_hilo
+from usuarios import como_usuario, normalizar_usuario, ruta_local, ruta_remota, usuario_actual
+
+@pytest.fixture(autouse=True)
+def carpeta(tmp_path, monkeypatch):
+    monkeypatch.setattr(usuarios, "DIR_USUARIOS", str(tmp_path / "usuarios"))
+    return tmp_path / "usuarios"
+
+def test_normalizar_usuario():
+    assert normalizar_usuario("ana_01") == "ana_01"
+    assert normalizar_usuario("") == normalizar_usuario(None) == usuarios.USUARIO_LEGADO
+    # Dos ids que se limpian igual no comparten carpeta
+    assert normalizar_usuario("ana/01") != normalizar_usuario("ana:01")
+    assert normalizar_usuario("ana/01").startswith("ana_01-")
+    assert len(normalizar_usuario("x" * 200)) == 64
+
+def test_el_usuario_legado_conserva_las_rutas(carpeta):
+    assert ruta_local("/tmp/transacciones.json") == "/tmp/transacciones.json"
+    assert ruta_remota("alertas.json") == "alertas.json"
+    assert not carpeta.exists()
+
+def test_cada_usuario_tiene_sus_rutas(carpeta):
+    with como_usuario("ana"):
+        assert ruta_local("/tmp/transacciones.json") == str(carpeta / "ana" / "transacciones.json")
+        assert ruta_remota("transacciones/manifest.json") == "usuarios/ana/transacciones/manifest.json"
+        with como_usuario("luis"):
+            assert usuario_actual() == "luis"
+        assert usuario_actual() == "ana"
+    assert usuario_actual() == usuarios.USUARIO_LEGADO
+
+def test_el_usuario_viaja_al_pool_de_hilos():
+    async def consultar_en_hilo():
+        with como_usuario("ana"):
+            return await en_hilo(usuario_actual)
+    assert asyncio.run(consultar_en_hilo()) == "ana"
+
+def test_los_espacios_no_se_mezclan(tmp_path, monkeypatch, transaccion):
+    pytest.importorskip("requests")
+    import transacciones_io
+
+    monkeypatch.setattr(transacciones_io, "MODO_ALMACENAMIENTO", "journal")
+    monkeypatch.setattr(transacciones_io, "RUTA_TRANSACCIONES", str(tmp_path / "transacciones.json"))
+    monkeypatch.setattr(transacciones_io, "RUTA_JOURNAL", str(tmp_path / "transacciones.jsonl"))
+    monkeypatch.setattr(transacciones_io, "_espacios", usuarios.PorUsuario(transacciones_io.EspacioTransacciones))
+    monkeypatch.setattr(transacciones_io, "_programar_volcado", lambda operaciones: None)
+
+    with como_usuario("ana"):
+        transacciones_io.guardar_transaccion(transaccion(monto=10))
+    with como_usuario("luis"):
+        transacciones_io.guardar_transaccion(transaccion(monto=7))
+        assert [t["monto"] for t in transacciones_io.cargar_transacciones(sincronizar=False)] == [7]
+    with como_usuario("ana"):
+        assert [t["monto"] for t in transacciones_io.cargar_transacciones(sincronizar=False)] == [10]
+        assert transacciones_io.espacio_actual().archivo_github == "usuarios/ana/transacciones.json"
+    assert transacciones_io.cargar_transacciones(sincronizar=False) == []